@@ -0,0 +1,85 @@
+"""Per-call overhead of the type dispatch used by construct, deconstruct,
+new_frame and Equality.
+
+The type-keyed tables are timed against the multipledispatch Dispatchers
+they replaced, which are rebuilt here when multipledispatch is installed,
+on arguments where resolving the implementation is all the work there is.
+
+    python -m benchmarks.dispatch
+"""
+import timeit
+
+from inference_logic import Variable
+from inference_logic.data_structures import (
+    ImmutableDict,
+    PrologList,
+    PrologListNull,
+    construct,
+    deconstruct,
+    new_frame,
+)
+from inference_logic.equality import Equality
+
+try:
+    from multipledispatch import Dispatcher
+except ImportError:
+    Dispatcher = None
+
+NUMBER = 100_000
+
+X = Variable("X")
+
+# dispatch dominates on these, as there is no work to do once it is resolved
+TERMS = {"int": 1, "str": "a", "None": None, "Variable": X}
+
+
+def _multipledispatch():
+    """the leaf implementations as they were, registered the same way"""
+    old_construct = Dispatcher("construct")
+    old_construct.add(
+        ((bool, int, float, str, Variable, ImmutableDict, PrologList),), lambda obj: obj
+    )
+    old_construct.add((object,), lambda obj: obj)
+
+    old_deconstruct = Dispatcher("deconstruct")
+    old_deconstruct.add((ImmutableDict,), deconstruct)
+    old_deconstruct.add((PrologList,), deconstruct)
+    old_deconstruct.add((PrologListNull,), lambda obj: [])
+    old_deconstruct.add((object,), lambda obj: obj)
+
+    old_new_frame = Dispatcher("new_frame")
+    old_new_frame.add(
+        (Variable, int),
+        lambda obj, frame: Variable(obj.name, frame=frame, many=obj.many),
+    )
+    old_new_frame.add((object, int), lambda obj, frame: obj)
+
+    return {
+        "construct": old_construct,
+        "deconstruct": old_deconstruct,
+        "new_frame": old_new_frame,
+    }
+
+
+def _time(function, *args) -> float:
+    """nanoseconds per call"""
+    return timeit.timeit(lambda: function(*args), number=NUMBER) / NUMBER * 1e9
+
+
+def main() -> None:
+    after = {"construct": construct, "deconstruct": deconstruct, "new_frame": new_frame}
+    before = _multipledispatch() if Dispatcher is not None else {}
+
+    print(f"{'function':<16}{'argument':<12}{'before ns':>12}{'after ns':>12}")
+    for name, function in after.items():
+        for kind, term in TERMS.items():
+            args = (term, 1) if name == "new_frame" else (term,)
+            old = f"{_time(before[name], *args):.0f}" if before else "-"
+            print(f"{name:<16}{kind:<12}{old:>12}{_time(function, *args):>12.0f}")
+
+    equality = Equality(fixed={1: {X}})
+    print(f"{'Equality.get_deep':<28}{'-':>12}{_time(equality.get_deep, X):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
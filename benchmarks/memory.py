@@ -0,0 +1,91 @@
+"""Memory taken by terms: the bytes each fact in a KnowledgeBase takes, the
+bytes each frame, a clause renamed apart for one resolution step, takes, and
+the size of a single instance of each of the core classes.
+
+    python -m benchmarks.memory --size 10000
+
+Facts and frames are measured with tracemalloc, while they are all kept
+alive, and the strings they hold are made beforehand so they are not counted.
+"""
+import argparse
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.programs import length
+from inference_logic import KnowledgeBase, Rule, Variable
+from inference_logic.data_structures import (
+    Assert,
+    Assign,
+    ImmutableDict,
+    PrologList,
+    PrologListNull,
+)
+from inference_logic.equality import Equality
+
+X, Y = Variable.factory("X", "Y")
+
+
+def _traced(build: Callable[[], Any]) -> int:
+    """the bytes still allocated by build once it has returned"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def bytes_per_fact(size: int) -> float:
+    names = [f"p{i}" for i in range(size + 1)]
+    facts = [
+        dict(parent=names[i], child=names[i + 1], list=[names[i], i])
+        for i in range(size)
+    ]
+    return _traced(lambda: KnowledgeBase(facts)) / size
+
+
+def bytes_per_frame(size: int) -> float:
+    db, _ = length(0)
+    clause = KnowledgeBase(db).clauses[1]
+    return _traced(lambda: [clause.rename(frame) for frame in range(size)]) / size
+
+
+def instance_sizes() -> Dict[str, int]:
+    """the size of an instance, and of its __dict__ when it has one"""
+    instances = {
+        "Variable": X,
+        "PrologList": PrologList(X, PrologListNull()),
+        "PrologListNull": PrologListNull(),
+        "ImmutableDict": ImmutableDict(a=X),
+        "Rule": Rule(dict(a=X), dict(b=X)),
+        "Assign": Assign(X, lambda Y: Y),
+        "Assert": Assert(lambda X: X),
+        "Equality": Equality(fixed={1: {X}}),
+    }
+    return {
+        name: sys.getsizeof(instance)
+        + (sys.getsizeof(vars(instance)) if hasattr(instance, "__dict__") else 0)
+        for name, instance in instances.items()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    per_fact, per_frame = bytes_per_fact(args.size), bytes_per_frame(args.size)
+    sizes = instance_sizes()
+    print(f"{'bytes per fact':<20}{per_fact:>10.0f}")
+    print(f"{'bytes per frame':<20}{per_frame:>10.0f}")
+    for name, size in sizes.items():
+        print(f"{name:<20}{size:>10}")
+    return dict(
+        bytes_per_fact=per_fact, bytes_per_frame=per_frame, instance_bytes=sizes
+    )
+
+
+if __name__ == "__main__":
+    main()
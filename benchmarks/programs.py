@@ -0,0 +1,102 @@
+"""Programs from the 99 problems, and the README ancestry query, that can be
+built at any size.
+
+Each program takes a size and returns a database along with the queries to
+answer against it.
+"""
+from typing import Callable, Dict, List, Tuple
+
+from inference_logic import Rule, Variable
+from inference_logic.data_structures import Assert, Assign
+
+Program = Callable[[int], Tuple[List, List[Dict]]]
+
+A, C, L, L2, N, N1, P, Q, X, Xs, Y, Z = Variable.factory(
+    "A", "C", "L", "L2", "N", "N1", "P", "Q", "X", "Xs", "Y", "Z"
+)
+_W = Variable("_W")
+
+
+def ancestry(size: int) -> Tuple[List, List[Dict]]:
+    """the README ancestry query over a family tree of `size` people, where
+    person i is the child of person (i - 1) // 2"""
+    db: List = [dict(parent=f"p{(i - 1) // 2}", child=f"p{i}") for i in range(1, size)]
+    db += [
+        Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+        Rule(
+            dict(ancestor=X, descendant=Z),
+            dict(parent=X, child=Y),
+            dict(ancestor=Y, descendant=Z),
+        ),
+    ]
+    return db, [dict(ancestor=P, descendant=C)]
+
+
+def length(size: int) -> Tuple[List, List[Dict]]:
+    """P04: the number of elements in a list of `size` elements"""
+    db = [
+        dict(my_length=0, list=[]),
+        Rule(
+            dict(my_length=N, list=[_W, *L]),
+            dict(my_length=N1, list=L),
+            Assign(N, lambda N1: N1 + 1),
+        ),
+    ]
+    return db, [dict(my_length=Q, list=list(range(size)))]
+
+
+def reverse(size: int) -> Tuple[List, List[Dict]]:
+    """P05: reversing a list of `size` elements with an accumulator"""
+    db = [
+        dict(my_rev=[], list_in=L2, list_out=L2),
+        Rule(
+            dict(my_rev=[X, *Xs], list_in=L2, list_out=A),
+            dict(my_rev=Xs, list_in=L2, list_out=[X, *A]),
+        ),
+    ]
+    return db, [dict(my_rev=list(range(size)), list_in=Z, list_out=[])]
+
+
+def primes(size: int) -> Tuple[List, List[Dict]]:
+    """P31: testing whether each number below `size` is prime"""
+    db = [
+        dict(is_prime=2),
+        dict(is_prime=3),
+        Rule(
+            dict(is_prime=P),
+            Assert(lambda P: isinstance(P, int)),
+            Assert(lambda P: P > 3),
+            Assert(lambda P: P % 2 != 0),
+            dict(has_factor=P, x=3),
+        ),
+        Rule(dict(has_factor=N, x=L), Assert(lambda N, L: N % L != 0)),
+        Rule(
+            dict(has_factor=N, x=L),
+            Assert(lambda L, N: L * L < N),
+            Assign(L2, lambda L: L + 2),
+            dict(has_factor=N, x=L2),
+        ),
+    ]
+    return db, [dict(is_prime=i) for i in range(2, size)]
+
+
+def prime_list(size: int) -> Tuple[List, List[Dict]]:
+    """P39: all the prime numbers below `size`, as a single query"""
+    db, _ = primes(size)
+    db += [dict(number=i) for i in range(2, size)]
+    db += [Rule(dict(prime=P), dict(number=P), dict(is_prime=P))]
+    return db, [dict(prime=Q)]
+
+
+# each program, the sizes it is run at by default and the engines it supports
+PROGRAMS: Dict[str, Tuple[Program, List[int], List[str]]] = {
+    "ancestry": (
+        ancestry,
+        [15, 63, 255],
+        ["top_down", "tabled", "bottom_up", "trail", "parallel"],
+    ),
+    "length": (length, [10, 50, 100], ["top_down", "tabled", "trail"]),
+    "reverse": (reverse, [10, 50, 100], ["top_down", "tabled", "trail"]),
+    "primes": (primes, [100, 300, 1000], ["top_down", "tabled", "trail"]),
+    "prime_list": (prime_list, [1000, 3000, 10000], ["trail", "parallel"]),
+}
@@ -0,0 +1,94 @@
+"""End to end benchmarks: runs each program at each of its sizes with each
+engine, and records the wall time, peak memory and solutions per second.
+
+    python -m benchmarks.suite --output benchmarks/results.json
+    python -m benchmarks.suite --program ancestry --engine trail --size 1023
+
+Every run is timed without tracemalloc, which slows Python down, and then
+repeated under it to measure the peak memory.
+"""
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from benchmarks.programs import PROGRAMS
+from inference_logic import KnowledgeBase, search
+from inference_logic.data_structures import construct
+
+
+def run(program: str, size: int, engine: str) -> Dict:
+    build, _, _ = PROGRAMS[program]
+    db, json_queries = build(size)
+    queries = [construct(query) for query in json_queries]
+
+    result = dict(program=program, size=size, engine=engine)
+    start = time.perf_counter()
+    try:
+        kb = KnowledgeBase(db)
+        solutions = sum(
+            len(list(search(kb, query, engine=engine))) for query in queries
+        )
+    except RecursionError as error:
+        return dict(result, error=repr(error))
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    kb = KnowledgeBase(db)
+    for query in queries:
+        for _ in search(kb, query, engine=engine):
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(
+        result,
+        seconds=seconds,
+        peak_bytes=peak,
+        solutions=solutions,
+        solutions_per_second=solutions / seconds if seconds else None,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--program", action="append", choices=sorted(PROGRAMS))
+    parser.add_argument("--engine", action="append")
+    parser.add_argument("--size", action="append", type=int)
+    parser.add_argument("--output", help="where to write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for program in args.program or PROGRAMS:
+        _, sizes, engines = PROGRAMS[program]
+        for size in args.size or sizes:
+            for engine in engines:
+                if args.engine and engine not in args.engine:
+                    continue
+                result = run(program, size, engine)
+                results.append(result)
+                if "error" in result:
+                    print(f"{program:<10}{size:>8} {engine:<10}{result['error']}")
+                    continue
+                print(
+                    f"{program:<10}{size:>8} {engine:<10}"
+                    f"{result['seconds']:>10.4f}s"
+                    f"{result['peak_bytes'] / 2 ** 20:>10.2f}MiB"
+                    f"{result['solutions']:>8} solutions"
+                )
+
+    report = dict(
+        python=platform.python_version(),
+        platform=platform.platform(),
+        results=results,
+    )
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,12 @@
 __version__ = "0.1.0"
 
 from inference_logic.algorithms import search  # noqa: F401
+from inference_logic.asynchronous import async_search  # noqa: F401
+from inference_logic.budget import Budget, BudgetExceededError  # noqa: F401
+from inference_logic.cache import QueryCache  # noqa: F401
 from inference_logic.data_structures import Rule, Variable  # noqa: F401
+from inference_logic.knowledge_base import KnowledgeBase  # noqa: F401
+from inference_logic.sources import FactSource, JsonLines, Shards  # noqa: F401
+from inference_logic.statistics import Statistics  # noqa: F401
+from inference_logic.store import MappedKnowledgeBase, write_facts  # noqa: F401
+from inference_logic.views import materialise  # noqa: F401
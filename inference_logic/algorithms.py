@@ -1,6 +1,9 @@
 from itertools import product
-from typing import Any, Dict, Iterator, List, Tuple
+from time import perf_counter
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Set, Union
 
+from inference_logic.bottom_up import bottom_up_search
+from inference_logic.budget import Budget
 from inference_logic.data_structures import (
     Assert,
     Assign,
@@ -10,37 +13,99 @@ from inference_logic.data_structures import (
     Variable,
     construct,
     get_variables,
-    new_frame,
 )
 from inference_logic.equality import Equality
+from inference_logic.knowledge_base import KnowledgeBase
+from inference_logic.parallel import parallel_search
+from inference_logic.statistics import Statistics
+from inference_logic.strategies import Frontier, Strategy, get_strategy
+from inference_logic.tabling import tabled_search
+from inference_logic.trail import trail_search
 
 
-def search(db: List, query: ImmutableDict) -> Iterator[Dict[Variable, Any]]:
+def top_down_search(
+    db: KnowledgeBase,
+    query: ImmutableDict,
+    budget: Optional[Budget] = None,
+    strategy: Union[str, Strategy] = "depth_first",
+    statistics: Optional[Statistics] = None,
+) -> Iterator[Dict[Variable, Any]]:
     query = construct(query)
-
-    i = 0
+    strategy = get_strategy(strategy)
     to_solve_for = get_variables(query)
+    if budget is not None:
+        budget.start()
+
+    floor = -1
+    for bound in strategy.bounds():
+        frontier = strategy.frontier()
+        frontier.push((Rule(query), Equality(), 0))
+        pruned = yield from _top_down(
+            db, frontier, to_solve_for, budget, statistics, bound, floor
+        )
+        if not pruned or bound is None:
+            return
+        floor = bound
 
-    stack: List[Tuple[Rule, Equality]] = [(Rule(query), Equality())]
 
-    while stack:
-        goal, equality = stack.pop()
+def _evaluate(
+    term: Any, equality: Equality, statistics: Optional[Statistics]
+) -> Optional[Equality]:
+    """the Equality once an Assign or Assert has been evaluated under it, or
+    None if it does not hold"""
+    try:
+        equality = equality.evaluate(term)
+    except UnificationError:
+        if statistics is not None:
+            statistics.evaluated(False)
+        return None
+    if statistics is not None:
+        statistics.evaluated(True)
+    return equality
+
+
+def _top_down(
+    db: KnowledgeBase,
+    frontier: Frontier,
+    to_solve_for: Set[Variable],
+    budget: Optional[Budget],
+    statistics: Optional[Statistics],
+    bound: Optional[int],
+    floor: int,
+) -> Generator[Dict[Variable, Any], None, bool]:
+    """one pass of a top down search, that does not expand goals deeper than
+    bound, and only yields the solutions of goals deeper than floor. Whether
+    any goals were left unexpanded is returned."""
+    i = 0
+    pruned = False
+
+    while frontier:
+        goal, equality, depth = frontier.pop()
+        if budget is not None and not budget.step(depth, len(frontier)):
+            return False
+        if bound is not None and depth > bound:
+            pruned = True
+            continue
+        if statistics is not None:
+            statistics.expanded(len(frontier) + 1)
 
         if isinstance(goal.predicate, (Assign, Assert)):
-            try:
-                equality = equality.evaluate(goal.predicate)
-                if goal.body:
-                    stack.append((Rule(*goal.body), equality))
-                else:
-                    yield equality.solutions(to_solve_for)
-            except UnificationError:
-                pass
+            evaluated = _evaluate(goal.predicate, equality, statistics)
+            if evaluated is None:
+                continue
+            equality = evaluated
+            if goal.body:
+                frontier.push((Rule(*goal.body), equality, depth))
+            elif depth > floor:
+                if statistics is not None:
+                    statistics.solutions += 1
+                yield equality.solutions(to_solve_for)
         else:
-            for rule in db:
-                if not isinstance(rule, Rule):
-                    rule = Rule(rule)
+            for clause in db.candidates(goal.predicate):
                 i += 1
-                rule = new_frame(rule, i)
+                started = perf_counter() if statistics is not None else 0.0
+                rule = clause.rename(i)
+                found = None
 
                 try:
                     new_known = equality.unify(goal.predicate, rule.predicate)
@@ -56,16 +121,78 @@ def search(db: List, query: ImmutableDict) -> Iterator[Dict[Variable, Any]]:
                     )
 
                     for terms in new_terms:
-                        stack.append((Rule(*terms), new_known))
+                        frontier.push((Rule(*terms), new_known, depth + 1))
 
                     solutions = new_known.solutions(to_solve_for)
 
                     if (
                         not goal.body
                         and not rule.body
+                        and depth > floor
                         and set(solutions) == to_solve_for
                     ):
-                        yield solutions
+                        found = solutions
 
                 except UnificationError:
-                    pass
+                    failed = True
+                else:
+                    failed = False
+
+                if statistics is not None:
+                    seconds = perf_counter() - started
+                    statistics.attempted(clause.position, seconds, failed)
+                    statistics.solutions += found is not None
+                if found is not None:
+                    yield found
+
+    return pruned
+
+
+ENGINES: Dict[str, Callable[..., Iterator[Dict[Variable, Any]]]] = {
+    "top_down": top_down_search,
+    "tabled": tabled_search,
+    "bottom_up": bottom_up_search,
+    "trail": trail_search,
+    "parallel": parallel_search,
+}
+
+
+def search(
+    db: Union[List, KnowledgeBase],
+    query: ImmutableDict,
+    engine: str = "top_down",
+    **options: Any,
+) -> Iterator[Dict[Variable, Any]]:
+    """Finds all the values of the Variables in the query for which it is true.
+
+    :param db: a list of facts and Rules, or a KnowledgeBase
+    :param query: the statement to be proven
+    :param engine: how the query is answered:
+
+        * ``"top_down"``, depth first resolution (the default)
+        * ``"tabled"``, resolution that memoizes the answers to every call so
+          that repeated sub-goals are only solved once and left recursion
+          terminates. Each distinct solution is yielded once.
+        * ``"bottom_up"``, semi-naive evaluation of every fact that follows
+          from the database, which the query is then looked up in. This only
+          supports ground facts and Rules without Assign or Assert.
+        * ``"trail"``, depth first resolution in database order over a single
+          mutable store of bindings that is undone on backtracking, rather
+          than a new Equality per step.
+        * ``"parallel"``, the trail engine with the alternative branches of
+          the search shared out between a pool of processes, see
+          :func:`inference_logic.parallel.parallel_search`.
+
+    :param options: passed on to the engine, e.g. ``workers`` and
+        ``granularity`` for the parallel engine, or a
+        :class:`inference_logic.budget.Budget` as ``budget`` for the top down
+        and trail engines, or the ``strategy`` the top down engine searches
+        with, see :mod:`inference_logic.strategies`, or
+        :class:`inference_logic.statistics.Statistics` to fill in as
+        ``statistics`` for the top down and trail engines
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine: {engine}")
+    if not isinstance(db, KnowledgeBase):
+        db = KnowledgeBase(db)
+    return ENGINES[engine](db, query, **options)
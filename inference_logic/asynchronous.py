@@ -0,0 +1,118 @@
+import asyncio
+import inspect
+from itertools import count
+from typing import Any, AsyncIterator, Dict, List, Set, Union
+
+from inference_logic.data_structures import (
+    ImmutableDict,
+    UnificationError,
+    Variable,
+    construct,
+    get_variables,
+)
+from inference_logic.knowledge_base import KnowledgeBase
+from inference_logic.parallel import Branch, Solution, expansion
+from inference_logic.trail import Bindings
+
+
+async def evaluate(bindings: Bindings, term: Any) -> bool:
+    """runs an Assert, or an Assign, awaiting its expression if it returns
+    an awaitable, e.g. if it is an `async def` function"""
+    try:
+        value = term.expression(*bindings.arguments(term.variables))
+        if inspect.isawaitable(value):
+            value = await value
+    except UnificationError:
+        return False
+    return bindings.conclude(term, value)
+
+
+async def expand(
+    db: KnowledgeBase, branch: Branch, to_solve_for: Any, yield_every: int
+) -> List[Union[Branch, Solution]]:
+    """the expansion of a branch, awaiting every Assign and Assert and
+    handing control back to the event loop after every `yield_every` of
+    them that did not await anything"""
+    steps = expansion(db, branch, to_solve_for)
+    evaluated = 0
+    try:
+        bindings, goal = next(steps)
+        while True:
+            holds = await evaluate(bindings, goal)
+            evaluated += 1
+            if evaluated % yield_every == 0:
+                await asyncio.sleep(0)
+            bindings, goal = steps.send(holds)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def async_search(
+    db: Union[List, KnowledgeBase],
+    query: ImmutableDict,
+    concurrency: int = 16,
+    yield_every: int = 100,
+) -> AsyncIterator[Dict[Variable, Any]]:
+    """Finds all the values of the Variables in the query for which it is
+    true, like the trail engine, while letting other tasks run.
+
+    The expressions of Asserts and Assigns may be `async def` functions, or
+    return awaitables, which are awaited. The alternative branches of the
+    search are expanded as separate tasks, so that up to `concurrency` of
+    them await their expressions at the same time, and solutions are yielded
+    as they are found, which need not be in database order.
+
+    >>> from inference_logic.data_structures import Assign, Rule
+    >>> X, Y, Z = Variable.factory("X", "Y", "Z")
+    >>> async def double(X):
+    ...     await asyncio.sleep(0)
+    ...     return X * 2
+    >>> db = [dict(a=1), dict(a=2), Rule(dict(b=Y), dict(a=X), Assign(Y, double))]
+    >>> async def main():
+    ...     return [solution async for solution in async_search(db, dict(b=Z))]
+    >>> sorted(solution[Z] for solution in asyncio.run(main()))
+    [2, 4]
+
+    :param db: a list of facts and Rules, or a KnowledgeBase
+    :param query: the statement to be proven
+    :param concurrency: the most branches that are expanded at once
+    :param yield_every: how many expressions a branch evaluates without
+        awaiting anything before it lets other tasks run
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, not {concurrency}")
+    if yield_every < 1:
+        raise ValueError(f"yield_every must be positive, not {yield_every}")
+    if not isinstance(db, KnowledgeBase):
+        db = KnowledgeBase(db)
+    query = construct(query)
+    to_solve_for = frozenset(get_variables(query))
+
+    stack: List[Branch] = [Branch((query,), (), 0)]
+    pending: Set[asyncio.Future] = set()
+    order: Dict[asyncio.Future, int] = {}
+    started = count()
+    try:
+        while stack or pending:
+            while stack and len(pending) < concurrency:
+                task = asyncio.ensure_future(
+                    expand(db, stack.pop(), to_solve_for, yield_every)
+                )
+                order[task] = next(started)
+                pending.add(task)
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for finished in sorted(done, key=order.pop):
+                items = finished.result()
+                stack.extend(
+                    item for item in reversed(items) if isinstance(item, Branch)
+                )
+                for item in items:
+                    if not isinstance(item, Branch):
+                        yield item
+    finally:
+        for running in pending:
+            running.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
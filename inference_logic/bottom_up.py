@@ -0,0 +1,283 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from inference_logic.data_structures import (
+    ImmutableDict,
+    PrologList,
+    PrologListNull,
+    Rule,
+    Variable,
+    construct,
+    deconstruct,
+    from_spine,
+    get_variables,
+    spine,
+)
+from inference_logic.knowledge_base import INDEXABLE, Clause, KnowledgeBase, Signature
+
+Bindings = Dict[Variable, Any]
+
+Index = Dict[Tuple, List[Tuple[ImmutableDict, int]]]
+
+
+def _same(left: Any, right: Any) -> bool:
+    if isinstance(left, INDEXABLE) or isinstance(right, INDEXABLE):
+        return (
+            isinstance(left, INDEXABLE)
+            and isinstance(right, INDEXABLE)
+            and left == right
+        )
+    return type(left) is type(right) and left == right
+
+
+def match(pattern: Any, fact: Any, bindings: Bindings) -> Optional[Bindings]:
+    """one way unification of a pattern against a ground fact
+
+    :examples:
+        >>> X, Y = Variable.factory("X", "Y")
+        >>> match(construct(dict(a=X, b=[1, *Y])), construct(dict(a=1, b=[1, 2])), {})
+        {X: 1, *Y: [2]}
+        >>> match(construct(dict(a=X, b=X)), construct(dict(a=1, b=2)), {}) is None
+        True
+    """
+    if isinstance(pattern, Variable):
+        if pattern in bindings:
+            return bindings if _same(bindings[pattern], fact) else None
+        return {**bindings, pattern: fact}
+
+    if isinstance(pattern, ImmutableDict):
+        if not isinstance(fact, ImmutableDict) or pattern.keys() != fact.keys():
+            return None
+        for key, value in pattern.items():
+            out = match(value, fact[key], bindings)
+            if out is None:
+                return None
+            bindings = out
+        return bindings
+
+    if isinstance(pattern, PrologList):
+        while isinstance(pattern, PrologList):
+            if not isinstance(fact, PrologList):
+                return None
+            out = match(pattern.head, fact.head, bindings)
+            if out is None:
+                return None
+            pattern, fact, bindings = pattern.tail, fact.tail, out
+        return match(pattern, fact, bindings)
+
+    if isinstance(pattern, PrologListNull):
+        return bindings if isinstance(fact, PrologListNull) else None
+
+    return bindings if _same(pattern, fact) else None
+
+
+def instantiate(term: Any, bindings: Bindings) -> Any:
+    """replaces every Variable in a term by the value it is bound to"""
+    if isinstance(term, Variable):
+        return bindings[term]
+    if isinstance(term, ImmutableDict):
+        return ImmutableDict(
+            {key: instantiate(value, bindings) for key, value in term.items()}
+        )
+    if isinstance(term, PrologList):
+        items, end = spine(term)
+        return from_spine(
+            [instantiate(item, bindings) for item in items], instantiate(end, bindings)
+        )
+    return term
+
+
+def _file(index: Index, keys: Tuple[str, ...], fact: ImmutableDict, round: int) -> None:
+    values = tuple(fact[key] for key in keys)
+    if all(isinstance(value, INDEXABLE) for value in values):
+        index.setdefault(values, []).append((fact, round))
+
+
+def _unfile(
+    index: Index, keys: Tuple[str, ...], fact: ImmutableDict, round: int
+) -> None:
+    values = tuple(fact[key] for key in keys)
+    if all(isinstance(value, INDEXABLE) for value in values):
+        bucket = index[values]
+        bucket.remove((fact, round))
+        if not bucket:
+            del index[values]
+
+
+class Model:
+    """A set of ground facts, each tagged with the round of evaluation that
+    derived it, along with hash indexes over their ground values that are
+    built the first time a combination of keys is looked up.
+
+    >>> X = Variable("X")
+    >>> model = Model([dict(parent="A", child="B"), dict(parent="B", child="C")])
+    >>> list(model.query(dict(parent="B", child=X)))
+    [{X: 'C'}]
+    """
+
+    def __init__(self, facts: Iterable = ()) -> None:
+        self.facts: Dict[Signature, Dict[ImmutableDict, int]] = {}
+        self._indexes: Dict[Signature, Dict[Tuple[str, ...], Index]] = {}
+        for fact in facts:
+            self.add(construct(fact))
+
+    def __len__(self) -> int:
+        return sum(map(len, self.facts.values()))
+
+    def __iter__(self) -> Iterator[ImmutableDict]:
+        for facts in self.facts.values():
+            yield from facts
+
+    def __contains__(self, fact: ImmutableDict) -> bool:
+        return fact in self.facts.get(frozenset(fact.keys()), {})
+
+    def add(self, fact: ImmutableDict, round: int = 0) -> bool:
+        """adds a ground fact, returning False if it was already known"""
+        signature = frozenset(fact.keys())
+        facts = self.facts.setdefault(signature, {})
+        if fact in facts:
+            return False
+        facts[fact] = round
+        for keys, index in self._indexes.get(signature, {}).items():
+            _file(index, keys, fact, round)
+        return True
+
+    def discard(self, fact: ImmutableDict) -> None:
+        """removes a fact, which must be known"""
+        signature = frozenset(fact.keys())
+        round = self.facts[signature].pop(fact)
+        for keys, index in self._indexes.get(signature, {}).items():
+            _unfile(index, keys, fact, round)
+
+    def _index(self, signature: Signature, keys: Tuple[str, ...]) -> Index:
+        indexes = self._indexes.setdefault(signature, {})
+        if keys not in indexes:
+            index: Index = {}
+            for fact, round in self.facts.get(signature, {}).items():
+                _file(index, keys, fact, round)
+            indexes[keys] = index
+        return indexes[keys]
+
+    def lookup(
+        self, pattern: ImmutableDict, bindings: Bindings
+    ) -> Iterable[Tuple[ImmutableDict, int]]:
+        """the facts, and their rounds, that agree with every primitive value
+        the pattern is bound to"""
+        signature = frozenset(pattern.keys())
+        keys, values = [], []
+        for key in sorted(pattern.keys()):
+            value = pattern[key]
+            if isinstance(value, Variable):
+                value = bindings.get(value, value)
+            if isinstance(value, INDEXABLE):
+                keys.append(key)
+                values.append(value)
+
+        if not keys:
+            return self.facts.get(signature, {}).items()
+        return self._index(signature, tuple(keys)).get(tuple(values), [])
+
+    def query(self, query: ImmutableDict) -> Iterator[Dict[Variable, Any]]:
+        """answers a query by looking it up among the facts"""
+        query = construct(query)
+        to_solve_for = get_variables(query)
+        for fact, _ in self.lookup(query, {}):
+            bindings = match(query, fact, {})
+            if bindings is not None:
+                yield {
+                    variable: deconstruct(bindings[variable])
+                    for variable in to_solve_for
+                }
+
+
+def _check(clause: Clause) -> None:
+    rule = clause.rule
+    if not isinstance(rule.predicate, ImmutableDict) or not all(
+        isinstance(term, ImmutableDict) for term in rule.body
+    ):
+        raise ValueError(
+            f"{rule} cannot be evaluated bottom up: only dicts are supported"
+        )
+    if clause.is_fact and not clause.is_ground:
+        raise ValueError(f"{rule} cannot be evaluated bottom up: facts must be ground")
+    if not get_variables(rule.predicate) <= set().union(*map(get_variables, rule.body)):
+        raise ValueError(
+            f"{rule} cannot be evaluated bottom up: "
+            "every Variable in the head must appear in the body"
+        )
+
+
+def _join(
+    model: Model,
+    body: Tuple[ImmutableDict, ...],
+    delta: int,
+    round: int,
+    bindings: Bindings,
+    position: int = 0,
+) -> Iterator[Bindings]:
+    """all the bindings that satisfy a body, where the literal at position
+    `delta` only matches facts derived in the latest round and those before
+    it only match older facts"""
+    if position == len(body):
+        yield bindings
+        return
+
+    literal = body[position]
+    for fact, fact_round in model.lookup(literal, bindings):
+        if position == delta and fact_round != round:
+            continue
+        if position < delta and fact_round >= round:
+            continue
+        matched = match(literal, fact, bindings)
+        if matched is not None:
+            yield from _join(model, body, delta, round, matched, position + 1)
+
+
+def evaluate_fixpoint(db: Union[List, KnowledgeBase]) -> Model:
+    """Computes every fact that follows from a database of ground facts and
+    Rules, by semi-naive iteration: each round only fires the Rules that can
+    use at least one fact derived in the previous round.
+
+    >>> X, Y, Z = Variable.factory("X", "Y", "Z")
+    >>> model = evaluate_fixpoint([
+    ...     dict(edge=1, to=2),
+    ...     dict(edge=2, to=3),
+    ...     Rule(dict(path=X, to=Y), dict(edge=X, to=Y)),
+    ...     Rule(dict(path=X, to=Z), dict(edge=X, to=Y), dict(path=Y, to=Z)),
+    ... ])
+    >>> sorted(solution[Z] for solution in model.query(dict(path=1, to=Z)))
+    [2, 3]
+    """
+    if not isinstance(db, KnowledgeBase):
+        db = KnowledgeBase(db)
+
+    model = Model()
+    rules: List[Rule] = []
+    for clause in db:
+        _check(clause)
+        if clause.is_fact:
+            model.add(clause.rule.predicate)
+        else:
+            rules.append(clause.rule)
+
+    round = 0
+    while True:
+        new: Dict[ImmutableDict, None] = {}
+        for rule in rules:
+            for delta in range(len(rule.body)):
+                for bindings in _join(model, rule.body, delta, round, {}):
+                    fact = instantiate(rule.predicate, bindings)
+                    if fact not in model:
+                        new[fact] = None
+        if not new:
+            return model
+        round += 1
+        for fact in new:
+            model.add(fact, round)
+
+
+def bottom_up_search(
+    db: KnowledgeBase, query: ImmutableDict
+) -> Iterator[Dict[Variable, Any]]:
+    """Answers a query by computing the model of the database bottom up and
+    then looking the query up in it."""
+    yield from evaluate_fixpoint(db).query(query)
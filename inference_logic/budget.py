@@ -0,0 +1,99 @@
+import time
+from typing import Optional
+
+# how many steps are taken between looking at the clock
+_CLOCK_EVERY = 64
+
+
+class BudgetExceededError(RuntimeError):
+    """raised when a search uses up one of the limits of its Budget"""
+
+    def __init__(self, limit: str, value: float) -> None:
+        super().__init__(f"search exceeded its budget of {value} {limit}")
+        self.limit = limit
+        self.value = value
+
+
+class Budget:
+    """Limits on the resources a single search may use, which are checked at
+    every resolution step of the top down and trail engines.
+
+    A Budget records how much of it the last search it was passed to used,
+    so a new one should be made for each search.
+
+    >>> from inference_logic import Rule, Variable, search
+    >>> X, Y = Variable.factory("X", "Y")
+    >>> db = [dict(nat=0), Rule(dict(nat=[X]), dict(nat=X))]
+    >>> budget = Budget(steps=3, truncate=True)
+    >>> list(search(db, dict(nat=Y), budget=budget))
+    [{Y: 0}, {Y: [0]}, {Y: [[0]]}]
+    >>> budget.exceeded
+    'steps'
+
+    :param steps: the most resolution steps to take
+    :param depth: the most resolution steps between the query and any goal
+    :param seconds: the most wall clock time to take, which is checked every
+        few steps
+    :param stack: the most goals, or choice points, to keep at once
+    :param truncate: whether to stop the search quietly when a limit is
+        reached, rather than raising a BudgetExceededError
+    """
+
+    __slots__ = (
+        "steps",
+        "depth",
+        "seconds",
+        "stack",
+        "truncate",
+        "used",
+        "exceeded",
+        "_deadline",
+    )
+
+    def __init__(
+        self,
+        steps: Optional[int] = None,
+        depth: Optional[int] = None,
+        seconds: Optional[float] = None,
+        stack: Optional[int] = None,
+        truncate: bool = False,
+    ) -> None:
+        self.steps = steps
+        self.depth = depth
+        self.seconds = seconds
+        self.stack = stack
+        self.truncate = truncate
+        self.used = 0
+        self.exceeded: Optional[str] = None
+        self._deadline: Optional[float] = None
+
+    def start(self) -> None:
+        """resets the Budget at the start of a search"""
+        self.used = 0
+        self.exceeded = None
+        if self.seconds is not None:
+            self._deadline = time.monotonic() + self.seconds
+
+    def step(self, depth: int, stack: int) -> bool:
+        """counts a resolution step, of a goal at some depth with some other
+        goals waiting, and returns whether the search can carry on"""
+        self.used += 1
+        if self.steps is not None and self.used > self.steps:
+            return self._exceed("steps", self.steps)
+        if self.depth is not None and depth > self.depth:
+            return self._exceed("depth", self.depth)
+        if self.stack is not None and stack > self.stack:
+            return self._exceed("stack", self.stack)
+        if (
+            self._deadline is not None
+            and self.used % _CLOCK_EVERY == 0
+            and time.monotonic() > self._deadline
+        ):
+            return self._exceed("seconds", self.seconds)  # type: ignore
+        return True
+
+    def _exceed(self, limit: str, value: float) -> bool:
+        self.exceeded = limit
+        if not self.truncate:
+            raise BudgetExceededError(limit, value)
+        return False
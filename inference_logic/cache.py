@@ -0,0 +1,176 @@
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from inference_logic.algorithms import search
+from inference_logic.data_structures import (
+    ImmutableDict,
+    PrologList,
+    Variable,
+    canonical,
+    construct,
+    deconstruct,
+    spine,
+)
+from inference_logic.knowledge_base import KnowledgeBase
+
+# the values each solution of a query binds, keyed by the position of their
+# Variable in the query, in the order of :func:`variables`
+Solutions = List[Tuple[Tuple[int, Any], ...]]
+
+
+def variables(term: Any, sort: bool = True) -> List[Variable]:
+    """The Variables of a term, in the order that :func:`canonical` numbers
+    them, so that a Variable of one variant of a term can be matched up with
+    the one in the same place in another, or in the order they are written.
+
+    >>> X, Y, P, C = Variable.factory("X", "Y", "P", "C")
+    >>> variables(construct(dict(descendant=C, ancestor=P)))
+    [P, C]
+    >>> variables(construct(dict(descendant=C, ancestor=P)), sort=False)
+    [C, P]
+    >>> variables(construct(dict(a=X, b=[Y, X, *Y])))
+    [X, Y]
+    """
+    found: Dict[Variable, None] = {}
+
+    def _variables(obj):
+        if isinstance(obj, Variable):
+            found.setdefault(obj, None)
+        elif isinstance(obj, ImmutableDict):
+            for key in sorted(obj.keys()) if sort else obj.keys():
+                _variables(obj[key])
+        elif isinstance(obj, PrologList):
+            items, end = spine(obj)
+            for item in items:
+                _variables(item)
+            _variables(end)
+
+    _variables(term)
+    return list(found)
+
+
+def _size(obj: Any) -> int:
+    """an estimate of the bytes taken by the solutions of a query"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        size += sum(map(_size, obj))
+    elif isinstance(obj, ImmutableDict):
+        size += sum(_size(key) + _size(value) for key, value in obj.data.items())
+    elif isinstance(obj, PrologList):
+        items, end = spine(obj)
+        size += sum(map(_size, items)) + _size(end)
+    return size
+
+
+class QueryCache:
+    """A cache of the solutions to the queries searched for in a
+    KnowledgeBase, keyed by the :func:`canonical` form of the query, so that
+    ``dict(ancestor=P, descendant=C)`` and ``dict(ancestor=X, descendant=Y)``
+    share an entry.
+
+    It holds at most `maxsize` queries, and the solutions of at most
+    `maxbytes` bytes as estimated from their size as Python objects, evicting
+    the least recently used query first. The whole cache is cleared whenever
+    the version of the KnowledgeBase changes.
+
+    The solutions of a query are only stored once every one of them has been
+    found, and are copied each time they are returned.
+
+    >>> X, Y, P, C = Variable.factory("X", "Y", "P", "C")
+    >>> kb = KnowledgeBase([dict(parent="A", child="B")])
+    >>> cache = QueryCache(kb)
+    >>> list(cache.search(dict(parent=P, child=C)))
+    [{P: 'A', C: 'B'}]
+    >>> list(cache.search(dict(parent=X, child=Y)))
+    [{X: 'A', Y: 'B'}]
+    >>> cache.hits, cache.misses
+    (1, 1)
+    >>> _ = kb.assert_fact(dict(parent="B", child="C"))
+    >>> len(list(cache.search(dict(parent=P, child=C)))), cache.misses
+    (2, 2)
+    """
+
+    def __init__(
+        self,
+        db: Union[List, KnowledgeBase],
+        maxsize: Optional[int] = 1024,
+        maxbytes: Optional[int] = None,
+    ) -> None:
+        self.kb = db if isinstance(db, KnowledgeBase) else KnowledgeBase(db)
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._version = self.kb.version
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def _store(self, key: Tuple[Any, str], solutions: Solutions) -> None:
+        size = _size(solutions)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        self._entries[key] = (solutions, size)
+        self.bytes += size
+        while (self.maxsize is not None and len(self._entries) > self.maxsize) or (
+            self.maxbytes is not None and self.bytes > self.maxbytes
+        ):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+
+    def search(
+        self, query: ImmutableDict, engine: str = "top_down"
+    ) -> Iterator[Dict[Variable, Any]]:
+        """the solutions to a query, as :func:`inference_logic.search` finds
+        them with an engine, from the cache if it has them"""
+        if self.kb.version != self._version:
+            self.clear()
+            self._version = self.kb.version
+
+        query = construct(query)
+        key = (canonical(query), engine)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._replay(self._entries[key][0], query)
+        self.misses += 1
+        return self._record(key, query, engine)
+
+    @staticmethod
+    def _replay(solutions: Solutions, query: Any) -> Iterator[Dict[Variable, Any]]:
+        """copies of the solutions to a query, with their Variables in the
+        order the query is written in, as a search would yield them"""
+        names = variables(query)
+        positions = [names.index(name) for name in variables(query, sort=False)]
+        for values in solutions:
+            bound = dict(values)
+            yield {
+                names[position]: deconstruct(bound[position])
+                for position in positions
+                if position in bound
+            }
+
+    def _record(
+        self, key: Tuple[Any, str], query: Any, engine: str
+    ) -> Iterator[Dict[Variable, Any]]:
+        version = self.kb.version
+        names = variables(query)
+        solutions: Solutions = []
+        for solution in search(self.kb, query, engine=engine):
+            solutions.append(
+                tuple(
+                    (position, construct(solution[name]))
+                    for position, name in enumerate(names)
+                    if name in solution
+                )
+            )
+            yield solution
+        if self.kb.version == version == self._version:
+            self._store(key, solutions)
@@ -1,12 +1,34 @@
 from __future__ import annotations
 
-from collections import UserDict
-from typing import Any, Dict, List, Optional, Set, Union
-
-from multipledispatch import dispatch
+from collections.abc import Mapping
+from itertools import count
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
+from weakref import WeakValueDictionary
 
 
 class Variable:
+    """A logic variable, identified by its name and frame.
+
+    Variables are interned: constructing a Variable that already exists
+    returns that same object, and every Variable gets a dense integer id when
+    it is first created. A `many` Variable keeps its plain twin alive and
+    shares its id. Hashing and comparing Variables only ever looks at the id.
+
+    >>> Variable("A", 1) is Variable("A", 1)
+    True
+    >>> A = Variable("A", 1)
+    >>> A.id == Variable("A", 1, many=True).id
+    True
+    """
+
+    __slots__ = ("name", "frame", "many", "id", "_plain", "__weakref__")
+
+    name: str
+    frame: Optional[int]
+    many: bool
+    id: int
+    _plain: Optional[Variable]
+
     @classmethod
     def factory(cls, *names: str) -> List[Variable]:
         """
@@ -18,14 +40,30 @@ class Variable:
         """
         return list(map(cls, names))
 
+    def __new__(
+        cls, name: str, frame: Optional[int] = None, many: bool = False
+    ) -> Variable:
+        if not isinstance(name, str):
+            raise ValueError("name must be a string")
+        key = (name, frame, many)
+        out = _VARIABLES.get(key)
+        if out is None:
+            out = super().__new__(cls)
+            out.name = name
+            out.frame = frame
+            out.many = many
+            out._plain = Variable(name, frame) if many else None
+            out.id = next(_IDS) if out._plain is None else out._plain.id
+            _VARIABLES[key] = out
+        return out
+
     def __init__(
         self, name: str, frame: Optional[int] = None, many: bool = False
     ) -> None:
-        if not isinstance(name, str):
-            raise ValueError("name must be a string")
-        self.name = name
-        self.frame = frame
-        self.many = many
+        """a Variable is built entirely by __new__"""
+
+    def __reduce__(self):
+        return Variable, (self.name, self.frame, self.many)
 
     def __repr__(self) -> str:
         many = "*" if self.many else ""
@@ -33,7 +71,7 @@ class Variable:
         return f"{many}{self.name}{frame}"
 
     def __hash__(self) -> int:
-        return hash((self.name, self.frame))
+        return self.id
 
     def __eq__(self, other) -> bool:
         """
@@ -53,7 +91,7 @@ class Variable:
         """
         if not isinstance(other, Variable):
             raise TypeError(f"{other} must be a Variable")
-        return hash(self) == hash(other)
+        return self.id == other.id
 
     @staticmethod
     def hash_set(variables: Set[Variable]) -> int:
@@ -63,10 +101,36 @@ class Variable:
         yield Variable(self.name, frame=self.frame, many=True)
 
 
+_VARIABLES: WeakValueDictionary = WeakValueDictionary()
+_IDS = count()
+_INTERNED: WeakValueDictionary = WeakValueDictionary()
+
+
+def _term_key(term: Any) -> Hashable:
+    """identifies a term when interning the terms that contain it: terms that
+    are interned are identified by their identity, everything else by its type
+    and value, so that e.g. 1, 1.0 and True are told apart"""
+    kind = type(term)
+    if kind is ImmutableDict or kind is PrologList or kind is Variable:
+        return kind, id(term)
+    if kind is PrologListNull:
+        return (kind,)
+    return kind, term
+
+
 class PrologListNull:
     """This is an Object that signifies the end of a PrologList
     """
 
+    __slots__ = ()
+
+    _instance: Optional[PrologListNull] = None
+
+    def __new__(cls) -> PrologListNull:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __len__(self):
         return 0
 
@@ -81,31 +145,69 @@ class PrologListNull:
     def __iter__(self):
         yield from iter([])
 
+    def __reduce__(self):
+        return PrologListNull, ()
+
 
 class PrologList:
     """A list in Prolog is build recursively out of the first, head, element
     and everything else, the tail.
+
+    PrologLists are interned: constructing a PrologList equal to one that
+    already exists returns that same object, so its hash is only computed
+    once and equality is identity.
+
+    >>> PrologList(1, PrologListNull()) is PrologList(1, PrologListNull())
+    True
     """
 
+    __slots__ = ("head", "tail", "_hash", "_length", "__weakref__")
+
+    head: Any
+    tail: Any
+    _hash: int
+    _length: Optional[int]
+
     def __len__(self):
-        return 1 + len(self.tail)
+        if self._length is None:
+            raise TypeError(f"{self} has no len() because its tail is not a list")
+        return self._length
+
+    def __new__(cls, head, tail) -> PrologList:
+        key = (cls, _term_key(head), _term_key(tail))
+        out = _INTERNED.get(key)
+        if out is None:
+            out = super().__new__(cls)
+            out.head = head
+            out.tail = tail
+            out._hash = hash((head, tail))
+            if isinstance(tail, PrologList):
+                out._length = None if tail._length is None else tail._length + 1
+            else:
+                out._length = 1 if isinstance(tail, PrologListNull) else None
+            _INTERNED[key] = out
+        return out
 
     def __init__(self, head, tail):
-        self.head = head
-        self.tail = tail
+        """a PrologList is built entirely by __new__"""
+
+    def __reduce__(self):
+        return PrologList, (self.head, self.tail)
 
     def __hash__(self) -> int:
-        return hash((self.head, self.tail))
+        return self._hash
 
     def __eq__(self, other) -> bool:
         if not isinstance(other, PrologList):
             raise UnificationError(f"{other} must be a PrologList")
-        return hash(self) == hash(other)
+        return self is other
 
     def __repr__(self) -> str:
-        if isinstance(self.tail, PrologListNull):
-            return f"[{self.head}]"
-        return f"[{self.head}, {repr(self.tail)[1:-1]}]"
+        items, end = spine(self)
+        text = ", ".join(map(str, items))
+        if isinstance(end, PrologListNull):
+            return f"[{text}]"
+        return f"[{text}, {repr(end)[1:-1]}]"
 
     def __add__(self, other):
         if not isinstance(other, PrologList):
@@ -117,32 +219,89 @@ class PrologList:
         return construct(c)
 
     def __iter__(self):
-        yield self.head
-        yield from iter(self.tail)
+        items, end = spine(self)
+        yield from items
+        yield from iter(end)
+
+
+def spine(term: Any) -> Tuple[List[Any], Any]:
+    """the elements of a PrologList, found by walking along its tails rather
+    than recursing into them, and whatever the last tail is
+
+    :examples:
+        >>> X = Variable("X")
+        >>> spine(construct([1, 2, *X]))
+        ([1, 2], *X)
+    """
+    items = []
+    while isinstance(term, PrologList):
+        items.append(term.head)
+        term = term.tail
+    return items, term
+
+
+def from_spine(items: List[Any], end: Any) -> Any:
+    """the PrologList of some elements followed by end, the inverse of spine"""
+    for item in reversed(items):
+        end = PrologList(item, end)
+    return end
+
+
+def check_cycle(seen: Set[Variable], tail: Variable) -> None:
+    """records a Variable that a list is continued by while walking along it,
+    and raises a RecursionError if it has been met before, as the list is then
+    bound into its own tail and walking it would never end
+
+    :examples:
+        >>> X = Variable("X")
+        >>> seen = set()
+        >>> check_cycle(seen, X)
+        >>> check_cycle(seen, X)
+        Traceback (most recent call last):
+        ...
+        RecursionError: maximum recursion depth exceeded, X is in a cycle
+    """
+    if tail in seen:
+        raise RecursionError(f"maximum recursion depth exceeded, {tail} is in a cycle")
+    seen.add(tail)
 
 
-class ImmutableDict(UserDict):
+class ImmutableDict:
     """https://www.python.org/dev/peps/pep-0351/
+
+    ImmutableDicts are interned like PrologLists: equal ImmutableDicts, with
+    their keys in the same order, are the same object.
+
+    An ImmutableDict is registered as a Mapping rather than inheriting from
+    one, and reads go straight to the dict it wraps.
+
+    >>> ImmutableDict(a=1, b=[2]) is ImmutableDict({"a": 1, "b": [2]})
+    True
     """
 
+    __slots__ = ("data", "_hash", "__weakref__")
+
+    data: Dict[str, Any]
+    _hash: int
+
     def _immutable(self, *args, **kws):
         raise TypeError("object is immutable")
 
     __setitem__ = _immutable
     __delitem__ = _immutable
     clear = _immutable
-    update = _immutable  # type: ignore
+    update = _immutable
     setdefault = _immutable
-    pop = _immutable  # type: ignore
+    pop = _immutable
     popitem = _immutable
 
-    def __init__(self, *args, **kwargs):
+    def __new__(cls, *args, **kwargs) -> ImmutableDict:
         if len(args) > 1:
             raise TypeError("expected at most 1 arguments, got %d" % len(args))
         if args:
-            self.data = args[0]
+            data = dict(args[0])
         elif "dict" in kwargs:
-            self.data = kwargs.pop("dict")
+            data = dict(kwargs.pop("dict"))
             import warnings
 
             warnings.warn(
@@ -151,27 +310,78 @@ class ImmutableDict(UserDict):
                 stacklevel=2,
             )
         else:
-            self.data = {}
+            data = {}
 
         if kwargs:
-            self.data.update(kwargs)
+            data.update(kwargs)
 
-        for key in self.data:
+        for key in data:
             if not isinstance(key, str):
                 raise TypeError(f"{key} must be a string")
 
-        self.data = {key: construct(value) for key, value in self.data.items()}
+        return cls.from_terms({key: construct(value) for key, value in data.items()})
+
+    def __init__(self, *args, **kwargs):
+        """an ImmutableDict is built entirely by __new__"""
+
+    @classmethod
+    def from_terms(cls, data: Dict[str, Any]) -> ImmutableDict:
+        """wraps a dict whose keys are strings and whose values are already
+        constructed, without checking or constructing them again
+
+        :examples:
+            >>> ImmutableDict.from_terms({"a": construct([1, 2])})
+            {'a': [1, 2]}
+        """
+        key = (cls, tuple((name, _term_key(value)) for name, value in data.items()))
+        out = _INTERNED.get(key)
+        if out is None:
+            out = super().__new__(cls)
+            out.data = data
+            out._hash = hash(tuple(data.items()))
+            _INTERNED[key] = out
+        return out
+
+    def __reduce__(self):
+        return ImmutableDict, (self.data,)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return repr(self.data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
 
     def keys(self):
         return self.data.keys()
 
+    def values(self):
+        return self.data.values()
+
+    def items(self):
+        return self.data.items()
+
     def __hash__(self) -> int:
-        return hash(tuple(self.items()))
+        return self._hash
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, ImmutableDict):
             raise TypeError(f"{other} must be an ImmutableDict")
-        return hash(self) == hash(other)
+        return self is other
+
+
+Mapping.register(ImmutableDict)
 
 
 def get_variables(immutable_dict: ImmutableDict) -> Set[Variable]:
@@ -182,8 +392,9 @@ def get_variables(immutable_dict: ImmutableDict) -> Set[Variable]:
             for value in obj.values():
                 _get_variables(value)
         if isinstance(obj, PrologList):
-            _get_variables(obj.head)
-            _get_variables(obj.tail)
+            items, obj = spine(obj)
+            for item in items:
+                _get_variables(item)
         if isinstance(obj, Variable):
             _variables.add(obj)
 
@@ -191,20 +402,237 @@ def get_variables(immutable_dict: ImmutableDict) -> Set[Variable]:
     return _variables
 
 
+def canonical(term: Any) -> Hashable:
+    """A hashable key that is shared by all variants of a term, i.e. terms
+    that only differ by a consistent renaming of their Variables.
+
+    :examples:
+        >>> X, Y = Variable.factory("X", "Y")
+        >>> a = canonical(construct(dict(a=X, b=[Y, X])))
+        >>> a == canonical(construct(dict(b=[X, Y], a=Y)))
+        True
+        >>> a == canonical(construct(dict(a=X, b=[X, X])))
+        False
+    """
+    names: Dict[Variable, int] = {}
+
+    def _canonical(obj):
+        if isinstance(obj, Variable):
+            return Variable, names.setdefault(obj, len(names))
+        if isinstance(obj, ImmutableDict):
+            return (
+                ImmutableDict,
+                tuple((key, _canonical(obj[key])) for key in sorted(obj.keys())),
+            )
+        if isinstance(obj, PrologList):
+            items, end = spine(obj)
+            return PrologList, tuple(map(_canonical, items)), _canonical(end)
+        if isinstance(obj, PrologListNull):
+            return (PrologListNull,)
+        return type(obj), obj
+
+    return _canonical(term)
+
+
+def standardise(term: Any) -> Any:
+    """renames the Variables in a term apart from any other term, so that it
+    can be stored and later unified without clashing with live Variables
+
+    :examples:
+        >>> X, Y = Variable.factory("X", "Y")
+        >>> standardise(construct(dict(a=X, b=[Y, X])))
+        {'a': _0, 'b': [_1, _0]}
+    """
+    names: Dict[Variable, Variable] = {}
+
+    def _standardise(obj):
+        if isinstance(obj, Variable):
+            if obj not in names:
+                names[obj] = Variable(f"_{len(names)}")
+            return names[obj]
+        if isinstance(obj, ImmutableDict):
+            return ImmutableDict({key: _standardise(obj[key]) for key in obj.keys()})
+        if isinstance(obj, PrologList):
+            items, end = spine(obj)
+            return from_spine(list(map(_standardise, items)), _standardise(end))
+        return obj
+
+    return _standardise(term)
+
+
 class UnificationError(ValueError):
     pass
 
 
+def _same_key(left: Any, right: Any) -> bool:
+    if left is right:
+        return True
+    try:
+        return bool(left == right)
+    except (TypeError, UnificationError):
+        return False
+
+
+class PersistentMap:
+    """An immutable hash array mapped trie.
+
+    Setting a key returns a new PersistentMap that shares every node with the
+    old one except the O(log n) nodes on the path to that key, so many
+    versions of a map can be kept alive cheaply.
+
+    :examples:
+        >>> a = PersistentMap().set("x", 1)
+        >>> b = a.set("y", 2)
+        >>> a.get("y"), b.get("y"), len(b)
+        (None, 2, 2)
+    """
+
+    __slots__ = ("_root", "_size")
+
+    _BITS = 5
+    _MASK = (1 << _BITS) - 1
+    _DEPTH = 64
+
+    def __init__(self, root: Optional[Dict] = None, size: int = 0) -> None:
+        self._root: Dict = root or {}
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def items(self):
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                yield from node
+            else:
+                yield node[1], node[2]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        node: Any = self._root
+        code = hash(key) & 0xFFFFFFFFFFFFFFFF
+        shift = 0
+        while isinstance(node, dict):
+            node = node.get((code >> shift) & self._MASK)
+            shift += self._BITS
+        if node is None:
+            return default
+        if isinstance(node, list):
+            for _key, value in node:
+                if _same_key(_key, key):
+                    return value
+            return default
+        if node[0] == code and _same_key(node[1], key):
+            return node[2]
+        return default
+
+    def set(self, key: Any, value: Any) -> PersistentMap:
+        code = hash(key) & 0xFFFFFFFFFFFFFFFF
+        root, added = self._set(self._root, code, 0, key, value)
+        return PersistentMap(root, self._size + added)
+
+    def update(self, items: Any) -> PersistentMap:
+        """sets many keys at once, copying each node on their paths only the
+        first time it is changed rather than once for every key
+
+        :examples:
+            >>> a = PersistentMap().set("x", 1)
+            >>> b = a.update([("x", 2), ("y", 3)])
+            >>> a.get("x"), b.get("x"), b.get("y"), len(b)
+            (1, 2, 3, 2)
+        """
+        root, size = self._root, self._size
+        owned: Set[int] = set()
+        for key, value in items:
+            code = hash(key) & 0xFFFFFFFFFFFFFFFF
+            root, added = self._set(root, code, 0, key, value, owned)
+            size += added
+        return PersistentMap(root, size)
+
+    def _set(
+        self,
+        node: Dict,
+        code: int,
+        shift: int,
+        key: Any,
+        value: Any,
+        owned: Optional[Set[int]] = None,
+    ):
+        index = (code >> shift) & self._MASK
+        entry = node.get(index)
+        if owned is None:
+            out = dict(node)
+        elif id(node) in owned:
+            out = node
+        else:
+            out = dict(node)
+            owned.add(id(out))
+
+        if entry is None:
+            out[index] = (code, key, value)
+            return out, True
+
+        if isinstance(entry, dict):
+            out[index], added = self._set(
+                entry, code, shift + self._BITS, key, value, owned
+            )
+            return out, added
+
+        if isinstance(entry, list):
+            bucket = [(k, v) for k, v in entry if not _same_key(k, key)]
+            out[index] = bucket + [(key, value)]
+            return out, len(bucket) == len(entry)
+
+        if entry[0] == code and _same_key(entry[1], key):
+            out[index] = (code, key, value)
+            return out, False
+
+        if shift + self._BITS >= self._DEPTH:
+            out[index] = [(entry[1], entry[2]), (key, value)]
+            return out, True
+
+        child, _ = self._set(
+            {}, entry[0], shift + self._BITS, entry[1], entry[2], owned
+        )
+        out[index], added = self._set(
+            child, code, shift + self._BITS, key, value, owned
+        )
+        return out, added
+
+
+_MISSING = object()
+
+
 class Rule:
+    __slots__ = ("predicate", "body")
+
     def __init__(
         self,
         predicate: Union[ImmutableDict, Dict],
-        *body: Union[ImmutableDict, Dict, Assert],
+        *body: Union[ImmutableDict, Dict, Assert, Assign],
     ) -> None:
 
         self.predicate = construct(predicate)
         self.body = tuple(map(construct, body))
 
+    @classmethod
+    def from_terms(cls, predicate: Any, body: tuple) -> Rule:
+        """a Rule from a predicate and body that are already constructed"""
+        out = cls.__new__(cls)
+        out.predicate = predicate
+        out.body = body
+        return out
+
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Rule):
             raise TypeError(f"{other} must be a Rule")
@@ -218,12 +646,21 @@ class Rule:
             return f"{self.predicate}."
 
 
+def _parameters(expression: Callable) -> Tuple[str, ...]:
+    """the names of the arguments of an expression, leaving out any local
+    variables, e.g. of an `async def` function"""
+    code = expression.__code__
+    return code.co_varnames[: code.co_argcount]
+
+
 class Assign:
+    __slots__ = ("variable", "expression", "frame", "variables")
+
     def __init__(self, variable: Variable, expression, frame=None, is_injected=False):
         self.variable = variable
         self.expression = expression
         self.frame = frame
-        self.variables = Variable.factory(*self.expression.__code__.co_varnames)
+        self.variables = Variable.factory(*_parameters(self.expression))
         if self.frame is not None:
             if not is_injected:
                 self.variable = new_frame(self.variable, self.frame)
@@ -233,43 +670,91 @@ class Assign:
 
 
 class Assert:
+    __slots__ = ("expression", "frame", "variables")
+
     def __init__(self, expression, frame=None):
         self.expression = expression
         self.frame = frame
-        self.variables = [Variable(arg) for arg in self.expression.__code__.co_varnames]
+        self.variables = [Variable(arg) for arg in _parameters(self.expression)]
         if self.frame is not None:
             self.variables = [
                 new_frame(variable, self.frame) for variable in self.variables
             ]
 
 
-@dispatch(ImmutableDict)
-def deconstruct(obj):
+Table = Dict[type, Callable[..., Any]]
+
+
+def _resolve(table: Table, kind: type) -> Callable[..., Any]:
+    """the implementation for a type that is not in a dispatch table yet,
+    taken from its nearest base class that is, and cached for next time"""
+    base = next(base for base in kind.__mro__ if base in table)
+    table[kind] = table[base]
+    return table[kind]
+
+
+def deconstruct(obj: Any) -> Any:
+    """turns a term back into the json-like object it was constructed from
+
+    :examples:
+        >>> deconstruct(construct(dict(a=[1, dict(b=2)])))
+        {'a': [1, {'b': 2}]}
+    """
+    kind = type(obj)
+    return (_DECONSTRUCT.get(kind) or _resolve(_DECONSTRUCT, kind))(obj)
+
+
+def _deconstruct_dict(obj: ImmutableDict) -> Dict[str, Any]:
     return {key: deconstruct(value) for key, value in obj.items()}
 
 
-@dispatch(PrologList)  # type: ignore
-def deconstruct(obj):
-    if isinstance(obj.tail, PrologListNull):
-        return [deconstruct(obj.head)]
-    if isinstance(obj.head, PrologListNull):
-        return []
+def _deconstruct_list(obj: PrologList) -> List[Any]:
+    out: List[Any] = []
+    while True:
+        if isinstance(obj.tail, PrologListNull):
+            return out + [deconstruct(obj.head)]
+        if isinstance(obj.head, PrologListNull):
+            return out
+
+        out.append(deconstruct(obj.head))
+        obj = obj.tail
+        if not isinstance(obj, PrologList):
+            return [*out, *deconstruct(obj)]
 
-    return [deconstruct(obj.head), *deconstruct(obj.tail)]
 
+def _deconstruct_null(obj: PrologListNull) -> List[Any]:
+    return []
 
-@dispatch(object)  # type: ignore
-def deconstruct(obj):
+
+def _identity(obj: Any, *args: Any) -> Any:
     return obj
 
 
-@dispatch(dict)
-def construct(obj: Any):
+_DECONSTRUCT: Table = {
+    ImmutableDict: _deconstruct_dict,
+    PrologList: _deconstruct_list,
+    PrologListNull: _deconstruct_null,
+    object: _identity,
+}
+
+
+def construct(obj: Any) -> Any:
+    """turns a json-like object into a term, made of ImmutableDicts and
+    PrologLists, that can be unified
+
+    :examples:
+        >>> construct(dict(a=[1, 2]))
+        {'a': [1, 2]}
+    """
+    kind = type(obj)
+    return (_CONSTRUCT.get(kind) or _resolve(_CONSTRUCT, kind))(obj)
+
+
+def _construct_dict(obj: Dict) -> ImmutableDict:
     return ImmutableDict({key: construct(value) for key, value in obj.items()})
 
 
-@dispatch((list, tuple))  # type: ignore
-def construct(obj: Any):
+def _construct_list(obj: Union[List, tuple]) -> Any:
     if not obj:
         return PrologListNull()
 
@@ -285,70 +770,82 @@ def construct(obj: Any):
     return out
 
 
-@dispatch(  # type: ignore
-    (
-        bool,
-        int,
-        float,
-        str,
-        Variable,
-        ImmutableDict,
-        PrologList,
-        Rule,
-        Assert,
-        Assign,
-        PrologListNull,
-    )
-)
-def construct(obj: Any):
-    return obj
-
-
-@dispatch(object)  # type: ignore
-def construct(obj: Any):
+def _construct_object(obj: Any) -> Any:
     if obj is None:
         return obj
     raise TypeError(f"{obj} is not json serializable")
 
 
-@dispatch(Rule, int)  # type: ignore
-def new_frame(obj, frame: int):
+_CONSTRUCT: Table = {
+    dict: _construct_dict,
+    list: _construct_list,
+    tuple: _construct_list,
+    **{
+        kind: _identity
+        for kind in (
+            bool,
+            int,
+            float,
+            str,
+            Variable,
+            ImmutableDict,
+            PrologList,
+            Rule,
+            Assert,
+            Assign,
+            PrologListNull,
+        )
+    },
+    object: _construct_object,
+}
+
+
+def new_frame(obj: Any, frame: int) -> Any:
+    """
+    moves every Variable in a term into a frame
+
+    :example:
+        >>> A = Variable("A")
+        >>> new_frame(A, 1)
+        A:1
+    """
+    kind = type(obj)
+    return (_NEW_FRAME.get(kind) or _resolve(_NEW_FRAME, kind))(obj, frame)
+
+
+def _new_frame_rule(obj: Rule, frame: int) -> Rule:
     return Rule(
         new_frame(obj.predicate, frame), *(new_frame(o, frame) for o in obj.body),
     )
 
 
-@dispatch(Assign, int)  # type: ignore
-def new_frame(obj, frame: int):
+def _new_frame_assign(obj: Assign, frame: int) -> Assign:
     return Assign(obj.variable, obj.expression, frame)
 
 
-@dispatch(Assert, int)  # type: ignore
-def new_frame(obj, frame: int):
+def _new_frame_assert(obj: Assert, frame: int) -> Assert:
     return Assert(obj.expression, frame)
 
 
-@dispatch(ImmutableDict, int)  # type: ignore
-def new_frame(obj, frame: int):
+def _new_frame_dict(obj: ImmutableDict, frame: int) -> ImmutableDict:
     return ImmutableDict({k: new_frame(v, frame) for k, v in obj.items()})
 
 
-@dispatch(Variable, int)  # type: ignore
-def new_frame(obj, frame: int):
-    """
-    :example:
-        >>> A = Variable("A")
-        >>> new_frame(A, 1)
-        A:1
-    """
+def _new_frame_variable(obj: Variable, frame: int) -> Variable:
     return Variable(obj.name, frame=frame, many=obj.many)
 
 
-@dispatch(PrologList, int)  # type: ignore
-def new_frame(obj, frame: int):
-    return PrologList(new_frame(obj.head, frame), new_frame(obj.tail, frame))
+def _new_frame_list(obj: PrologList, frame: int) -> PrologList:
+    items, end = spine(obj)
+    return from_spine([new_frame(item, frame) for item in items], new_frame(end, frame))
 
 
-@dispatch(object, int)  # type: ignore
-def new_frame(obj, frame: int):
-    return obj
+_NEW_FRAME: Table = {
+    Rule: _new_frame_rule,
+    Assign: _new_frame_assign,
+    Assert: _new_frame_assert,
+    ImmutableDict: _new_frame_dict,
+    Variable: _new_frame_variable,
+    PrologList: _new_frame_list,
+    object: _identity,
+}
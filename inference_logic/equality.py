@@ -1,23 +1,231 @@
 from __future__ import annotations
 
-from copy import deepcopy
 from itertools import product
-from typing import Any, Dict, List, Optional, Sequence, Set
-
-from multipledispatch import dispatch
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 from inference_logic.data_structures import (
     Assert,
     Assign,
     ImmutableDict,
+    PersistentMap,
     PrologList,
     PrologListNull,
     UnificationError,
     Variable,
-    construct,
+    _same_key,
+    check_cycle,
     deconstruct,
+    from_spine,
+    spine,
 )
 
+_FREE = object()
+
+
+class _Class:
+    """the Variables that are equal to each other, kept as a tree of tuples so
+    that two classes can be joined without copying either of them, along with
+    the constant they are all equal to, if any."""
+
+    __slots__ = ("members", "size", "order", "constant")
+
+    def __init__(self, members: Any, size: int, order: int, constant: Any) -> None:
+        self.members = members
+        self.size = size
+        self.order = order
+        self.constant = constant
+
+    @property
+    def is_free(self) -> bool:
+        return self.constant is _FREE
+
+    def variables(self) -> Set[Variable]:
+        out, stack = set(), [self.members]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, tuple):
+                stack.extend(item)
+            else:
+                out.add(item)
+        return out
+
+
+def _plain(variable: Variable) -> Variable:
+    if variable.many:
+        return Variable(variable.name, variable.frame)
+    return variable
+
+
+class _Key:
+    """wraps a constant so that it can key a dict, comparing like the keys of
+    a PersistentMap do"""
+
+    __slots__ = ("value", "_hash")
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        self._hash = hash(value)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        return _same_key(self.value, other.value)
+
+
+class _Scratch:
+    """A mutable overlay on an Equality that bindings are accumulated in, so
+    that any number of them can be made before a single new Equality is
+    materialised. Nothing is shared with the Equality until then, so a failed
+    unification just drops the overlay."""
+
+    __slots__ = ("equality", "parents", "classes", "constants", "counter")
+
+    def __init__(self, equality: Equality) -> None:
+        self.equality = equality
+        self.parents: Dict[Variable, Variable] = {}
+        self.classes: Dict[Variable, _Class] = {}
+        self.constants: Dict[_Key, Variable] = {}
+        self.counter = equality._counter
+
+    def find(self, variable: Variable) -> Variable:
+        parents, base = self.parents, self.equality._parents
+        while True:
+            parent = parents.get(variable)
+            if parent is None:
+                parent = base.get(variable)
+                if parent is None:
+                    return variable
+            variable = parent
+
+    def get_class(self, root: Variable) -> Optional[_Class]:
+        _class = self.classes.get(root)
+        if _class is None:
+            return self.equality._classes.get(root)
+        return _class
+
+    def get_constant(self, constant: Any) -> Optional[Variable]:
+        root = self.constants.get(_Key(constant))
+        if root is None:
+            return self.equality._constants.get(constant)
+        return root
+
+    def join(self, left: Variable, right: Variable) -> None:
+        """merges the classes of two roots, the smaller into the larger"""
+        left_class = self.get_class(left) or _Class(left, 1, 0, _FREE)
+        right_class = self.get_class(right) or _Class(right, 1, 0, _FREE)
+        if left_class.size < right_class.size:
+            left, right = right, left
+            left_class, right_class = right_class, left_class
+
+        if not left_class.is_free:
+            constant, order = left_class.constant, left_class.order
+        elif not right_class.is_free:
+            constant, order = right_class.constant, right_class.order
+        else:
+            constant, order = _FREE, self.counter
+            self.counter += 1
+
+        self.parents[right] = left
+        self.classes[left] = _Class(
+            (left_class.members, right_class.members),
+            left_class.size + right_class.size,
+            order,
+            constant,
+        )
+
+    def bind(self, variable: Variable, constant: Any) -> None:
+        try:
+            hash(constant)
+        except TypeError:
+            raise TypeError(f"{constant} must be hashable")
+
+        variable = _plain(variable)
+        root = self.find(variable)
+        _class = self.get_class(root)
+
+        if _class is not None and not _class.is_free:
+            fixed = _class.constant
+            if constant != fixed:
+                raise UnificationError(
+                    f"{variable} cannot equal {constant} because {constant} != {fixed}"
+                )
+            return
+
+        other = self.get_constant(constant)
+        if other is not None:
+            self.join(root, self.find(other))
+            return
+
+        _class = _class or _Class(root, 1, 0, _FREE)
+        self.classes[root] = _Class(_class.members, _class.size, self.counter, constant)
+        self.constants[_Key(constant)] = root
+        self.counter += 1
+
+    def merge(self, left: Variable, right: Variable) -> None:
+        left, right = _plain(left), _plain(right)
+        left_root, right_root = self.find(left), self.find(right)
+        if left_root == right_root:
+            return
+
+        left_class = self.get_class(left_root)
+        right_class = self.get_class(right_root)
+        if (
+            left_class is not None
+            and not left_class.is_free
+            and right_class is not None
+            and not right_class.is_free
+        ):
+            raise UnificationError(
+                f"{left} cannot equal {right} because "
+                f"{left_class.constant} != {right_class.constant}"
+            )
+        self.join(left_root, right_root)
+
+    def add(self, left: Any, right: Any) -> None:
+        if isinstance(left, Variable):
+            if isinstance(right, Variable):
+                self.merge(left, right)
+            else:
+                self.bind(left, right)
+        elif isinstance(right, Variable):
+            self.bind(right, left)
+        elif left != right:
+            raise UnificationError(f"values dont match: {left} != {right}")
+
+    def unify(self, left: Any, right: Any) -> None:
+        stack = [(left, right)]
+        while stack:
+            left, right = stack.pop()
+            if isinstance(left, ImmutableDict) and isinstance(right, ImmutableDict):
+                if left.keys() != right.keys():
+                    raise UnificationError(
+                        f"keys must match: {tuple(left)} != {tuple(right)}"
+                    )
+                stack.extend((left[key], right[key]) for key in reversed(left.keys()))
+            elif isinstance(left, PrologList) and isinstance(right, PrologList):
+                stack.append((left.tail, right.tail))
+                stack.append((left.head, right.head))
+            elif isinstance(left, PrologList) and isinstance(right, PrologListNull):
+                raise UnificationError("list lengths must be the same")
+            elif isinstance(left, PrologListNull) and isinstance(right, PrologList):
+                raise UnificationError("list lengths must be the same")
+            else:
+                self.add(left, right)
+
+    def materialise(self) -> Equality:
+        equality = self.equality
+        if not (self.parents or self.classes):
+            return equality
+        return equality._evolve(
+            parents=equality._parents.update(self.parents.items()),
+            classes=equality._classes.update(self.classes.items()),
+            constants=equality._constants.update(
+                (key.value, root) for key, root in self.constants.items()
+            ),
+            counter=self.counter,
+        )
+
 
 class Equality:
     """There are two types of equality:
@@ -25,12 +233,20 @@ class Equality:
     1. free, a Variable `X` can be equal to any number of other Variables
     2. fixed, a hashable object `h` can be equal to any number of Variables \
     so long as none of them are equal to any other hashable object.
+
+    Internally this is a persistent union-find: every Variable points at a
+    parent Variable until it reaches the root of its class, and the classes
+    hold their members and constant. All of these live in PersistentMaps, so
+    adding a binding creates a new Equality in O(log n) that shares almost
+    all of its state with the one it was derived from.
     """
 
+    __slots__ = ("_parents", "_classes", "_constants", "_counter")
+
     def __init__(
         self,
-        free: Sequence[Set[Variable]] = None,
-        fixed: Dict[Any, Set[Variable]] = None,
+        free: Optional[Sequence[Set[Variable]]] = None,
+        fixed: Optional[Dict[Any, Set[Variable]]] = None,
     ) -> None:
         """the free and fixed components of and Equality can be passed as
         a List of Variable-Sets and a Dict of Variable-Sets respectively.
@@ -39,12 +255,64 @@ class Equality:
         >>> Equality(free=[{A, B}], fixed={True: {C, D}, False: {E}})
         {A, B}, True: {C, D}, False: {E}
         """
-        self.fixed: Dict[ImmutableDict, Set[Variable]] = {}
+        self._parents = PersistentMap()
+        self._classes = PersistentMap()
+        self._constants = PersistentMap()
+        self._counter = 0
+
+        out = self
+        for variable_set in filter(None, free or []):
+            first, *rest = map(_plain, variable_set)
+            out = out._evolve(
+                classes=out._classes.set(first, _Class(first, 1, out._counter, _FREE)),
+                counter=out._counter + 1,
+            )
+            for variable in rest:
+                out = out.add(first, variable)
         for constant, variable_set in (fixed or {}).items():
-            self.fixed[constant] = variable_set.copy()
-        self.free: List[Set[Variable]] = [
-            variable_set.copy() for variable_set in free or []
-        ]
+            for variable in variable_set:
+                out = out.add(variable, constant)
+
+        self._parents, self._classes = out._parents, out._classes
+        self._constants, self._counter = out._constants, out._counter
+
+    def _evolve(self, parents=None, classes=None, constants=None, counter=None):
+        out = Equality.__new__(Equality)
+        out._parents = self._parents if parents is None else parents
+        out._classes = self._classes if classes is None else classes
+        out._constants = self._constants if constants is None else constants
+        out._counter = self._counter if counter is None else counter
+        return out
+
+    def _find(self, variable: Variable) -> Variable:
+        parents = self._parents
+        while True:
+            parent = parents.get(variable)
+            if parent is None:
+                return variable
+            variable = parent
+
+    def _roots(self) -> List[_Class]:
+        return sorted(
+            (
+                _class
+                for root, _class in self._classes.items()
+                if root not in self._parents
+            ),
+            key=lambda _class: _class.order,
+        )
+
+    @property
+    def free(self) -> List[Set[Variable]]:
+        return [_class.variables() for _class in self._roots() if _class.is_free]
+
+    @property
+    def fixed(self) -> Dict[Any, Set[Variable]]:
+        return {
+            _class.constant: _class.variables()
+            for _class in self._roots()
+            if not _class.is_free
+        }
 
     def __repr__(self) -> str:
         def variable_set_repr(variable_set):
@@ -55,14 +323,12 @@ class Equality:
         return ", ".join(free + fixed) or "."
 
     def __hash__(self) -> int:
-        free = hash(tuple(map(Variable.hash_set, self.free)))
-        fixed = hash(
-            tuple(
-                hash((constant, Variable.hash_set(self.fixed[constant])))
-                for constant in sorted(self.fixed, key=hash)
-            )
+        free = frozenset(map(frozenset, self.free))
+        fixed = frozenset(
+            (hash(constant), frozenset(variables))
+            for constant, variables in self.fixed.items()
         )
-        return free ^ fixed
+        return hash((free, fixed))
 
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Equality):
@@ -72,182 +338,120 @@ class Equality:
     def _get_free(self, variable: Variable) -> Set[Variable]:
         if not isinstance(variable, Variable):
             raise TypeError(f"{variable} must be a Variable")
-        for variables in self.free:
-            if variable in variables:
-                return variables
-        return set()
+        _class = self._classes.get(self._find(variable))
+        if _class is None or not _class.is_free:
+            return set()
+        return _class.variables()
 
     def _get_fixed(self, variable: Variable) -> Any:
         if not isinstance(variable, Variable):
             raise TypeError(f"{variable} must be a Variable")
-        for _variable in self._get_free(variable) | {variable}:
-            for constant, variables in self.fixed.items():
-                if _variable in variables:
-                    return constant
-
-        raise KeyError
-
-    @dispatch(Variable)
-    def get_deep(self, item):
-        return self.get_deep(self._get_fixed(item))
-
-    @dispatch(ImmutableDict)  # type: ignore
-    def get_deep(self, item):
-        return ImmutableDict({key: self.get_deep(value) for key, value in item.items()})
-
-    @dispatch(PrologList)  # type: ignore
-    def get_deep(self, item):
-        try:
-            return PrologList(self.get_deep(item.head), self.get_deep(item.tail))
-        except RecursionError:
-            raise
-
-    @dispatch(object)  # type: ignore
-    def get_deep(self, item):
+        _class = self._classes.get(self._find(variable))
+        if _class is None or _class.is_free:
+            raise KeyError
+        return _class.constant
+
+    def get_deep(self, item: Any) -> Any:
+        if isinstance(item, Variable):
+            return self.get_deep(self._get_fixed(item))
+        if isinstance(item, ImmutableDict):
+            return ImmutableDict(
+                {key: self.get_deep(value) for key, value in item.items()}
+            )
+        if isinstance(item, PrologList):
+            items = []
+            seen: Set[Variable] = set()
+            while isinstance(item, (PrologList, Variable)):
+                if isinstance(item, Variable):
+                    check_cycle(seen, item)
+                    item = self._get_fixed(item)
+                else:
+                    items.append(self.get_deep(item.head))
+                    item = item.tail
+            return from_spine(items, self.get_deep(item))
         return item
 
-    @dispatch(Variable, object)  # type: ignore
-    def add(self, variable: Variable, constant: Any) -> Equality:
-        try:
-            hash(constant)
-        except TypeError:
-            raise TypeError(f"{constant} must be hashable")
+    def substitute(self, item: Any) -> Any:
+        """like get_deep, except that unbound Variables are kept, each
+        replaced by a single representative of the Variables it is equal to
 
-        variable.many = False
-
-        try:
-            fixed = self._get_fixed(variable)
-
-            if constant != fixed:
-                raise UnificationError(
-                    f"{variable} cannot equal {constant} because {constant} != {fixed}"
-                )
-            return self
-        except KeyError:
-            pass
-
-        free = self._get_free(variable)
-        out_free, out_fixed = deepcopy(self.free), deepcopy(self.fixed)
-        if free:
-            out_free.remove(free)
-            if constant not in out_fixed:
-                out_fixed[constant] = set()
-            out_fixed[constant].update(free)
-        else:
-            if constant not in out_fixed:
-                out_fixed[constant] = set()
-            out_fixed[constant].add(variable)
-        return Equality(out_free, out_fixed)
-
-    @dispatch(Variable, Variable)  # type: ignore
-    def add(self, left: Variable, right: Variable) -> Equality:
-
-        try:
-            left_fixed = self._get_fixed(left)
-            is_left_fixed = True
-        except KeyError:
-            is_left_fixed = False
-
-        try:
-            right_fixed = self._get_fixed(right)
-            is_right_fixed = True
-        except KeyError:
-            is_right_fixed = False
-
-        if is_left_fixed and is_right_fixed:
-            raise UnificationError(
-                f"{left} cannot equal {right} because {left_fixed} != {right_fixed}"
+        >>> from inference_logic.data_structures import construct
+        >>> A, B, C = Variable.factory("A", "B", "C")
+        >>> Equality(free=[{B, C}], fixed={1: {A}}).substitute(construct((A, C)))
+        [1, B]
+        """
+        if isinstance(item, Variable):
+            try:
+                fixed = self._get_fixed(item)
+            except KeyError:
+                return min(self._get_free(item) | {item}, key=repr)
+            return self.substitute(fixed)
+        if isinstance(item, ImmutableDict):
+            return ImmutableDict(
+                {key: self.substitute(value) for key, value in item.items()}
             )
+        if isinstance(item, PrologList):
+            items = []
+            seen: Set[Variable] = set()
+            while isinstance(item, PrologList):
+                items.append(self.substitute(item.head))
+                item = item.tail
+                if isinstance(item, Variable):
+                    check_cycle(seen, item)
+                    try:
+                        item = self._get_fixed(item)
+                    except KeyError:
+                        pass
+            return from_spine(items, self.substitute(item))
+        return item
 
-        left_free, right_free = self._get_free(left), self._get_free(right)
-        out_free, out_fixed = deepcopy(self.free), deepcopy(self.fixed)
-
-        if left_free and right_free:
-            out_free.remove(left_free)
-            if right_free != left_free:
-                out_free.remove(right_free)
-            out_free.append(left_free | right_free)
-
-        elif is_left_fixed:
-            if right_free:
-                out_free.remove(right_free)
-                out_fixed[left_fixed].update(right_free)
-            else:
-                out_fixed[left_fixed].add(right)
-
-        elif left_free:
-            if is_right_fixed:
-                out_free.remove(left_free)
-                out_fixed[right_fixed].update(left_free)
-            else:
-                out_free.remove(left_free)
-                out_free.append(left_free | {right})
-
-        else:
-            if is_right_fixed:
-                out_fixed[right_fixed].add(left)
-            elif right_free:
-                out_free.remove(right_free)
-                out_free.append(right_free | {left})
-            else:
-                out_free.append({left, right})
-        return Equality(out_free, out_fixed)
-
-    @dispatch(object, Variable)  # type: ignore
-    def add(self, left: Any, right: Any) -> Equality:
-        return self.add(right, left)
-
-    @dispatch(object, object)  # type: ignore
     def add(self, left: Any, right: Any) -> Equality:
-        if left == right:
-            return self
-        raise UnificationError(f"values dont match: {left} != {right}")
-
-    @dispatch(ImmutableDict, to_solve_for=set)  # type: ignore
-    def inject(self, term: Any, to_solve_for: Set[Variable]) -> Set:
-        term = construct(term)
-        to_solve_for = to_solve_for or set()
-
-        return {
-            ImmutableDict(dict(zip(term.keys(), v)))
-            for v in product(
-                *[self.inject(x, to_solve_for=to_solve_for) for x in term.values()]
-            )
-        }
+        """sets two terms equal to each other without looking inside them"""
+        scratch = _Scratch(self)
+        scratch.add(left, right)
+        return scratch.materialise()
 
-    @dispatch(PrologList, to_solve_for=set)  # type: ignore
     def inject(self, term: Any, to_solve_for: Optional[Set[Variable]] = None) -> Set:
-        return {
-            PrologList(x, y)
-            for x, y in product(
-                self.inject(term.head, to_solve_for=to_solve_for),
-                self.inject(term.tail, to_solve_for=to_solve_for),
-            )
-        }
+        to_solve_for = to_solve_for or set()
 
-    @dispatch(Assign, to_solve_for=set)  # type: ignore
-    def inject(self, term: Any, to_solve_for: Set[Variable]) -> List:
-        free = self._get_free(term.variable) - {term.variable}
-        if free:
-            args_set = list(free)
-        else:
-            args_set = [term.variable]
-        return {
-            Assign(a, term.expression, term.frame, is_injected=True) for a in args_set
-        }
+        if isinstance(term, ImmutableDict):
+            return {
+                ImmutableDict(dict(zip(term.keys(), v)))
+                for v in product(
+                    *[self.inject(x, to_solve_for=to_solve_for) for x in term.values()]
+                )
+            }
+
+        if isinstance(term, PrologList):
+            items, end = spine(term)
+            return {
+                from_spine(list(choice[:-1]), choice[-1])
+                for choice in product(
+                    *[self.inject(x, to_solve_for=to_solve_for) for x in items],
+                    self.inject(end, to_solve_for=to_solve_for),
+                )
+            }
 
-    @dispatch(Variable, to_solve_for=set)  # type: ignore
-    def inject(self, term: Any, to_solve_for: Set[Variable]) -> Set:
-        try:
-            return {self._get_fixed(term)}
-        except KeyError:
-            free = self._get_free(term) & to_solve_for
+        if isinstance(term, Assign):
+            free = self._get_free(term.variable) - {term.variable}
             if free:
-                return free
-            return {term}
+                args_set = list(free)
+            else:
+                args_set = [term.variable]
+            return {
+                Assign(a, term.expression, term.frame, is_injected=True)
+                for a in args_set
+            }
+
+        if isinstance(term, Variable):
+            try:
+                return {self._get_fixed(term)}
+            except KeyError:
+                free = self._get_free(term) & to_solve_for
+                if free:
+                    return free
+                return {term}
 
-    @dispatch(object, to_solve_for=set)  # type: ignore
-    def inject(self, term: Any, to_solve_for: Set[Variable]) -> Set:
         return {term}
 
     def solutions(self, to_solve_for: Set[Variable]) -> Dict[Variable, Any]:
@@ -261,42 +465,15 @@ class Equality:
                 pass
         return out
 
-    @dispatch(Assign)  # type: ignore
-    def evaluate(self, assignment: Assign) -> Equality:
-        value = assignment.expression(*map(self._get_fixed, assignment.variables))
-        return self.add(assignment.variable, value)
-
-    @dispatch(Assert)  # type: ignore
-    def evaluate(self, assertion: Assert) -> Equality:
-        value = assertion.expression(*map(self._get_fixed, assertion.variables))
+    def evaluate(self, term: Union[Assign, Assert]) -> Equality:
+        value = term.expression(*map(self._get_fixed, term.variables))
+        if isinstance(term, Assign):
+            return self.add(term.variable, value)
         if not value:
             raise UnificationError(f"bool({value}) != True")
         return self
 
-    @dispatch(ImmutableDict, ImmutableDict)  # type: ignore
-    def unify(self, left, right) -> Equality:
-        if left.keys() != right.keys():
-            raise UnificationError(f"keys must match: {tuple(left)} != {tuple(right)}")
-
-        equality = self
-        for key in left.keys():
-            equality = equality.unify(left[key], right[key])
-        return equality
-
-    @dispatch(PrologList, PrologList)  # type: ignore
-    def unify(self, left, right) -> Equality:
-        return self.unify(left.head, right.head).unify(left.tail, right.tail)
-
-    @dispatch(PrologList, PrologListNull)  # type: ignore
-    def unify(self, left, right) -> Equality:
-        raise UnificationError("list lengths must be the same")
-
-    @dispatch(PrologListNull, PrologList)  # type: ignore
-    def unify(self, left, right) -> Equality:
-        raise UnificationError("list lengths must be the same")
-
-    @dispatch(object, object)  # type: ignore
-    def unify(self, left, right) -> Equality:
+    def unify(self, left: Any, right: Any) -> Equality:
         """
         Unification is a key idea in declarative programming.
         https://en.wikipedia.org/wiki/Unification_(computer_science)
@@ -305,6 +482,7 @@ class Equality:
 
         1. Unification of values:
 
+            >>> from inference_logic.data_structures import construct
             >>> A, B, C = Variable.factory("A", "B", "C")
 
             When two primitive values are unified it will check that they are
@@ -313,7 +491,7 @@ class Equality:
             >>> Equality().unify(1, 1)
             .
 
-            >>> unify(True, False)
+            >>> Equality().unify(True, False)
             Traceback (most recent call last):
                 ...
             inference_logic.data_structures.UnificationError: values dont match: True != False
@@ -323,34 +501,34 @@ class Equality:
             If a Variable is passed as an argument then this variable will be set
             equal to the other vale which could either be, a primitive:
 
-            >>> unify(True, B)
+            >>> Equality().unify(True, B)
             True: {B}
 
             Or another varible
 
-            >>> unify(A, B)
+            >>> Equality().unify(A, B)
             {A, B}
 
 
         2. Unification against know Equalities:
 
-            Unification operations can be chained together by passing in
-            an optional equality argument.
+            Unification operations can be chained together by unifying
+            against an existing Equality.
 
             This way unified Variables can be assigned to existing
             Variable Sets
 
-            >>> unify(A, C, Equality(free=[{A, B}]))
+            >>> Equality(free=[{A, B}]).unify(A, C)
             {A, B, C}
 
             or constants.
 
-            >>> unify(A, 1, Equality(free=[{A, B}]))
+            >>> Equality(free=[{A, B}]).unify(A, 1)
             1: {A, B}
 
             And we can check for consistencey between uunifications.
 
-            >>> unify(B, False, Equality(fixed={True: {A, B}}))
+            >>> Equality(fixed={True: {A, B}}).unify(B, False)
             Traceback (most recent call last):
                 ...
             inference_logic.data_structures.UnificationError: B cannot equal False because False != True
@@ -362,22 +540,22 @@ class Equality:
             unification first checks that the data-structures have the same type,
             any then is applied pair-wise and recursively to all elements.
 
-            >>> unify(dict(a=A, b=2), dict(a=1, b=B))
+            >>> Equality().unify(construct(dict(a=A, b=2)), construct(dict(a=1, b=B)))
             1: {A}, 2: {B}
 
-            >>> unify((A, B), (1, 2))
+            >>> Equality().unify(construct((A, B)), construct((1, 2)))
             1: {A}, 2: {B}
 
             In the case of dicts the unification will fail if the keys do not match:
 
-            >>> unify(dict(a=1, b=2), dict(a=1, c=2))
+            >>> Equality().unify(construct(dict(a=1, b=2)), construct(dict(a=1, c=2)))
             Traceback (most recent call last):
                 ...
             inference_logic.data_structures.UnificationError: keys must match: ('a', 'b') != ('a', 'c')
 
             And tuple unification will fail if they have different lengths
 
-            >>> unify((A, B), (1, 2, 3))
+            >>> Equality().unify(construct((A, B)), construct((1, 2, 3)))
             Traceback (most recent call last):
                 ...
             inference_logic.data_structures.UnificationError: list lengths must be the same
@@ -385,9 +563,23 @@ class Equality:
             It possible to unify some Variables to the head of a tuple and another to the rest
             using the * syntax
 
-            >>> unify((A, B, *C), (1, 2, 3, 4))
+            >>> Equality().unify(construct((A, B, *C)), construct((1, 2, 3, 4)))
             1: {A}, 2: {B}, [3, 4]: {C}
 
         """
 
-        return self.add(left, right)
+        return self.unify_all([(left, right)])
+
+    def unify_all(self, pairs: Iterable[Tuple[Any, Any]]) -> Equality:
+        """unifies every pair of terms, accumulating their bindings in a
+        scratch overlay and materialising one new Equality at the end.
+
+        >>> from inference_logic.data_structures import construct
+        >>> A, B = Variable.factory("A", "B")
+        >>> Equality().unify_all([(construct([A, B]), construct([1, 2])), (A, 1)])
+        1: {A}, 2: {B}
+        """
+        scratch = _Scratch(self)
+        for left, right in pairs:
+            scratch.unify(left, right)
+        return scratch.materialise()
@@ -0,0 +1,564 @@
+from collections import Counter
+from heapq import merge
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from inference_logic.data_structures import (
+    Assert,
+    Assign,
+    ImmutableDict,
+    PrologList,
+    PrologListNull,
+    Rule,
+    Variable,
+    from_spine,
+    get_variables,
+    new_frame,
+    spine,
+)
+
+Signature = FrozenSet[str]
+
+Renamer = Callable[[List[Variable], int], Any]
+
+# unifies a goal with a head in some Bindings, given the frame to rename the
+# clause into, and returns its renamed Variables or None if they do not unify
+Matcher = Callable[[Any, ImmutableDict, Any, int], Optional[List[Variable]]]
+
+# unifies a value with part of a head in some Bindings, given the renamed
+# Variables of the clause and their frame, and returns whether they unify
+Match = Callable[[Any, Any, List[Variable], int], bool]
+
+INDEXABLE = (bool, int, float, str, type(None))
+
+_WILDCARD = object()
+
+
+def index_key(value: Any) -> Any:
+    """The bucket a head value is filed under: Variables can match anything,
+    primitives are bucketed by value and compound terms by their type.
+
+    >>> index_key("Homer")
+    'Homer'
+    >>> index_key(Variable("X")) is _WILDCARD
+    True
+    """
+    if isinstance(value, Variable):
+        return _WILDCARD
+    if isinstance(value, INDEXABLE):
+        return value
+    return type(value)
+
+
+def _compile(term: Any, table: Dict[Tuple[str, bool], int]) -> Optional[Renamer]:
+    """A function that rebuilds a term with its Variables looked up in a list
+    of renamed Variables, and shares every subterm without Variables as it is.
+    None is returned if the term has no Variables at all.
+
+    Each distinct Variable is given a position in the table, so that it only
+    needs renaming once however often it occurs.
+    """
+    if isinstance(term, Variable):
+        position = table.setdefault((term.name, term.many), len(table))
+        get = itemgetter(position)
+        return lambda names, frame: get(names)
+
+    if isinstance(term, ImmutableDict):
+        items = [(key, value, _compile(value, table)) for key, value in term.items()]
+        if not any(renamer for _, _, renamer in items):
+            return None
+
+        def _dict(names: List[Variable], frame: int) -> ImmutableDict:
+            return ImmutableDict.from_terms(
+                {
+                    key: value if renamer is None else renamer(names, frame)
+                    for key, value, renamer in items
+                }
+            )
+
+        return _dict
+
+    if isinstance(term, PrologList):
+        items, end = spine(term)
+        renamers = [_compile(item, table) for item in items]
+        end_renamer = _compile(end, table)
+        if end_renamer is None and not any(renamers):
+            return None
+
+        def _list(names: List[Variable], frame: int) -> PrologList:
+            return from_spine(
+                [
+                    item if renamer is None else renamer(names, frame)
+                    for item, renamer in zip(items, renamers)
+                ],
+                end if end_renamer is None else end_renamer(names, frame),
+            )
+
+        return _list
+
+    if isinstance(term, (Assign, Assert)):
+        return lambda names, frame: new_frame(term, frame)
+
+    return None
+
+
+def _occurrences(term: Any) -> Iterator[Variable]:
+    """every occurrence of a Variable in a term, however often it occurs"""
+    if isinstance(term, Variable):
+        yield term
+    elif isinstance(term, ImmutableDict):
+        for value in term.values():
+            yield from _occurrences(value)
+    elif isinstance(term, PrologList):
+        items, end = spine(term)
+        for item in items + [end]:
+            yield from _occurrences(item)
+
+
+def _instance(term: Any, renamer: Optional[Renamer]) -> Match:
+    """A function that binds an unbound Variable to a term renamed into the
+    frame of the clause."""
+
+    def _bind(bindings: Any, value: Any, names: List[Variable], frame: int) -> bool:
+        value = bindings.deref(value)
+        bindings.bind(value, term if renamer is None else renamer(names, frame))
+        return True
+
+    return _bind
+
+
+def _match_variable(
+    term: Variable, table: Dict[Tuple[str, bool], int], counts: Counter
+) -> Match:
+    get = itemgetter(table[term.name, term.many])
+    if counts[term.name] > 1:
+        return lambda bindings, value, names, frame: bindings.unify(get(names), value)
+
+    def _single(bindings: Any, value: Any, names: List[Variable], frame: int):
+        bindings.bind(get(names), bindings.deref(value))
+        return True
+
+    return _single
+
+
+def _match_list(
+    term: PrologList, table: Dict[Tuple[str, bool], int], counts: Counter
+) -> Match:
+    items, end = spine(term)
+    steps = []
+    for index, item in enumerate(items):
+        rest = from_spine(items[index:], end)
+        steps.append(
+            (
+                _compile_match(item, table, counts),
+                _instance(rest, _compile(rest, table)),
+            )
+        )
+    last = _compile_match(end, table, counts)
+
+    def _list(bindings: Any, value: Any, names: List[Variable], frame: int):
+        for match, instance in steps:
+            value = bindings.deref(value)
+            if isinstance(value, Variable):
+                return instance(bindings, value, names, frame)
+            if not isinstance(value, PrologList):
+                return False
+            if not match(bindings, value.head, names, frame):
+                return False
+            value = value.tail
+        return last(bindings, value, names, frame)
+
+    return _list
+
+
+def _match_dict(
+    term: ImmutableDict, table: Dict[Tuple[str, bool], int], counts: Counter
+) -> Match:
+    keys = frozenset(term.keys())
+    matches = [
+        (key, _compile_match(value, table, counts)) for key, value in term.items()
+    ]
+    instance = _instance(term, _compile(term, table))
+
+    def _dict(bindings: Any, value: Any, names: List[Variable], frame: int):
+        value = bindings.deref(value)
+        if isinstance(value, Variable):
+            return instance(bindings, value, names, frame)
+        if not isinstance(value, ImmutableDict) or value.data.keys() != keys:
+            return False
+        return all(
+            match(bindings, value.data[key], names, frame) for key, match in matches
+        )
+
+    return _dict
+
+
+def _compile_match(
+    term: Any, table: Dict[Tuple[str, bool], int], counts: Counter
+) -> Match:
+    """A function that unifies a value with a term from a head, in code
+    specialised to that term, given the renamed Variables of the clause.
+
+    A Variable that occurs once in the head is still unbound in its new frame,
+    so it is bound without unifying, and a value that is an unbound Variable
+    is bound to the renamed term. Only repeated Variables are unified as
+    usual.
+    """
+    if isinstance(term, Variable):
+        return _match_variable(term, table, counts)
+    if isinstance(term, PrologList):
+        return _match_list(term, table, counts)
+    if isinstance(term, ImmutableDict):
+        return _match_dict(term, table, counts)
+
+    # otherwise the term is a primitive or the empty list
+    kind = PrologListNull if isinstance(term, PrologListNull) else INDEXABLE
+
+    def _leaf(bindings: Any, value: Any, names: List[Variable], frame: int):
+        value = bindings.deref(value)
+        if isinstance(value, Variable):
+            bindings.bind(value, term)
+            return True
+        return isinstance(value, kind) and value == term
+
+    return _leaf
+
+
+def _match_ground(
+    bindings: Any, head: ImmutableDict, goal: Any, frame: int
+) -> Optional[List[Variable]]:
+    """unifies goals with the head of a clause without Variables, which is how
+    most facts look, so it is shared between them rather than compiled"""
+    if not isinstance(goal, ImmutableDict) or goal.data.keys() != head.data.keys():
+        return None
+    data = goal.data
+    for key, term in head.data.items():
+        value = bindings.deref(data[key])
+        if isinstance(value, Variable):
+            bindings.bind(value, term)
+        elif isinstance(term, INDEXABLE):
+            if not isinstance(value, INDEXABLE) or value != term:
+                return None
+        elif not bindings.unify(value, term):
+            return None
+    return []
+
+
+def _compile_head(head: Any, table: Dict[Tuple[str, bool], int]) -> Optional[Matcher]:
+    """A function that unifies goals with a head of one particular shape in
+    straight-line code, rather than walking both terms as Bindings.unify does.
+
+    The keys are compared at once, and the primitive values before any
+    Variable is renamed, so most goals that do not unify cost little more.
+    A clause without Variables needs nothing renamed, so its head is not
+    compiled, and None is returned for a head that is not an ImmutableDict,
+    which is always unified as usual.
+
+    The table must be the one the rest of the clause was compiled with.
+    """
+    if not isinstance(head, ImmutableDict):
+        return None
+    if not table:
+        return _match_ground
+
+    counts = Counter(variable.name for variable in _occurrences(head))
+    keys = frozenset(head.keys())
+    constants = [(k, v) for k, v in head.items() if isinstance(v, INDEXABLE)]
+    matches = [
+        (key, _compile_match(value, table, counts))
+        for key, value in head.items()
+        if not isinstance(value, INDEXABLE)
+    ]
+    variables = list(table)
+
+    def _match(
+        bindings: Any, head: ImmutableDict, goal: Any, frame: int
+    ) -> Optional[List[Variable]]:
+        if not isinstance(goal, ImmutableDict) or goal.data.keys() != keys:
+            return None
+        data = goal.data
+
+        for key, constant in constants:
+            value = bindings.deref(data[key])
+            if isinstance(value, Variable):
+                bindings.bind(value, constant)
+            elif not isinstance(value, INDEXABLE) or value != constant:
+                return None
+
+        names = [Variable(name, frame=frame, many=many) for name, many in variables]
+        for key, match in matches:
+            if not match(bindings, data[key], names, frame):
+                return None
+        return names
+
+    return _match
+
+
+class Clause:
+    """A Rule that has been constructed once, when it was loaded into a
+    KnowledgeBase, along with the metadata search needs about it.
+
+    >>> X = Variable("X")
+    >>> clause = Clause(Rule(dict(a=X, b=1), dict(c=X)), 0)
+    >>> clause.variables, clause.is_ground, clause.arity
+    (frozenset({X}), False, 2)
+    """
+
+    def __init__(self, rule: Rule, position: int) -> None:
+        self.rule = rule
+        self.position = position
+
+        variables = set(get_variables(rule.predicate))
+        for term in rule.body:
+            if isinstance(term, Assign):
+                variables.add(term.variable)
+                variables.update(term.variables)
+            elif isinstance(term, Assert):
+                variables.update(term.variables)
+            else:
+                variables.update(get_variables(term))
+        self.variables: FrozenSet[Variable] = frozenset(variables)
+
+        self.is_ground = not self.variables
+        self.is_fact = not rule.body
+        self.arity: Optional[int] = (
+            len(rule.predicate) if isinstance(rule.predicate, ImmutableDict) else None
+        )
+
+        self._table: Dict[Tuple[str, bool], int] = {}
+        self._predicate = _compile(rule.predicate, self._table)
+        self._body = [(term, _compile(term, self._table)) for term in rule.body]
+        self._head = _compile_head(rule.predicate, self._table)
+
+    def rename(self, frame: int) -> Rule:
+        """The Rule with every Variable moved into a new frame.
+
+        A ground clause is returned as it is, otherwise only the distinct
+        Variables are renamed and the parts of the Rule without Variables are
+        shared with the original.
+
+        >>> X = Variable("X")
+        >>> Clause(Rule(dict(a=X, b=[1, 2]), dict(c=X)), 0).rename(3)
+        {'a': X:3, 'b': [1, 2]} ¬ {'c': X:3}.
+        """
+        if self.is_ground:
+            return self.rule
+        names = [Variable(name, frame=frame, many=many) for name, many in self._table]
+        predicate = self.rule.predicate
+        if self._predicate is not None:
+            predicate = self._predicate(names, frame)
+        return Rule.from_terms(
+            predicate,
+            tuple(
+                term if renamer is None else renamer(names, frame)
+                for term, renamer in self._body
+            ),
+        )
+
+    def unify(self, bindings: Any, goal: Any, frame: int) -> Optional[Tuple]:
+        """Unifies a goal with the head of the clause renamed into a frame,
+        binding Variables in some Bindings, and returns the renamed body, or
+        None if they do not unify. As with Bindings.unify, the bindings made
+        before a failure are left on the trail.
+
+        >>> from inference_logic.trail import Bindings
+        >>> X, Y = Variable.factory("X", "Y")
+        >>> clause = Clause(Rule(dict(a=X, b=1), dict(c=X)), 0)
+        >>> bindings = Bindings()
+        >>> clause.unify(bindings, ImmutableDict(a=2, b=Y), 3)
+        ({'c': X:3},)
+        >>> bindings.resolve(new_frame(X, 3)), bindings.resolve(Y)
+        (2, 1)
+        >>> clause.unify(bindings, ImmutableDict(a=2, b=2), 4) is None
+        True
+        """
+        if self._head is None:
+            rule = self.rename(frame)
+            return rule.body if bindings.unify(goal, rule.predicate) else None
+        names = self._head(bindings, self.rule.predicate, goal, frame)
+        if names is None:
+            return None
+        return tuple(
+            term if renamer is None else renamer(names, frame)
+            for term, renamer in self._body
+        )
+
+    def __repr__(self) -> str:
+        return repr(self.rule)
+
+
+def _discard(index: Dict[Any, Dict[int, None]], key: Any, position: int) -> None:
+    """removes a position from a bucket, and the bucket once it is empty"""
+    bucket = index[key]
+    del bucket[position]
+    if not bucket:
+        del index[key]
+
+
+class KnowledgeBase:
+    """A database of facts and Rules whose clauses are bucketed by the key
+    signature of their head and the ground value of each key, so that a goal
+    is only unified against the clauses that could possibly match it.
+
+    Every fact and Rule is constructed exactly once, when it is loaded, so a
+    KnowledgeBase can be passed to search in place of a list and queried
+    repeatedly without paying that cost again.
+
+    Facts and Rules can be added and facts retracted at any time, each in
+    constant time, and the version is bumped by every change. Facts that are
+    asserted or retracted are passed on to the views materialised from it.
+    A clause keeps its position for as long as it is in the KnowledgeBase,
+    and the candidates for a goal are always returned in database order.
+
+    >>> X = Variable("X")
+    >>> kb = KnowledgeBase([dict(parent="A", child="B"), dict(parent="B", child="C")])
+    >>> kb.candidates(ImmutableDict(parent="B", child=X))
+    [{'parent': 'B', 'child': 'C'}.]
+    >>> _ = kb.assert_fact(dict(parent="B", child="D"))
+    >>> kb.retract_fact(dict(parent="B", child="C"))
+    True
+    >>> kb.candidates(ImmutableDict(parent="B", child=X)), kb.version
+    ([{'parent': 'B', 'child': 'D'}.], 4)
+    """
+
+    def __init__(self, db: Iterable = ()) -> None:
+        self.clauses: Dict[int, Clause] = {}
+        self.version = 0
+        self.views: List[Any] = []
+        self._next = 0
+        self._facts: Dict[Any, List[int]] = {}
+        self._unindexed: Dict[int, None] = {}
+        self._signatures: Dict[Signature, Dict[int, None]] = {}
+        self._values: Dict[Tuple[Signature, str], Dict[Any, Dict[int, None]]] = {}
+        for clause in db:
+            self._add(clause if isinstance(clause, Rule) else Rule(clause))
+
+    def _add(self, rule: Rule) -> Clause:
+        position = self._next
+        self._next += 1
+        self.version += 1
+        clause = self.clauses[position] = Clause(rule, position)
+        if clause.is_fact:
+            self._facts.setdefault(rule.predicate, []).append(position)
+
+        head = rule.predicate
+        if not isinstance(head, ImmutableDict):
+            self._unindexed[position] = None
+            return clause
+
+        signature = frozenset(head.keys())
+        self._signatures.setdefault(signature, {})[position] = None
+        for key, value in head.items():
+            buckets = self._values.setdefault((signature, key), {})
+            buckets.setdefault(index_key(value), {})[position] = None
+        return clause
+
+    def _remove(self, position: int) -> None:
+        self.version += 1
+        clause = self.clauses.pop(position)
+        if clause.is_fact:
+            positions = self._facts[clause.rule.predicate]
+            positions.remove(position)
+            if not positions:
+                del self._facts[clause.rule.predicate]
+
+        head = clause.rule.predicate
+        if not isinstance(head, ImmutableDict):
+            del self._unindexed[position]
+            return
+
+        signature = frozenset(head.keys())
+        _discard(self._signatures, signature, position)
+        for key, value in head.items():
+            buckets = self._values[signature, key]
+            _discard(buckets, index_key(value), position)
+            if not buckets:
+                del self._values[signature, key]
+
+    def _check_views(self, rule: Rule) -> None:
+        head = rule.predicate
+        if isinstance(head, ImmutableDict) and any(
+            frozenset(head.keys()) in view.derived for view in self.views
+        ):
+            raise ValueError(f"{rule} cannot change, a view is materialised from it")
+
+    def assert_fact(self, fact: Any) -> Clause:
+        """adds a fact after every other clause, and returns its Clause"""
+        if isinstance(fact, Rule):
+            raise TypeError(f"{fact} must be a fact, use add_rule to add a Rule")
+        clause = self._add(Rule(fact))
+        for view in self.views:
+            view.inserted(clause.rule.predicate)
+        return clause
+
+    def add_rule(self, rule: Rule) -> Clause:
+        """adds a Rule after every other clause, and returns its Clause"""
+        if not isinstance(rule, Rule):
+            raise TypeError(f"{rule} must be a Rule, use assert_fact to add a fact")
+        self._check_views(rule)
+        return self._add(rule)
+
+    def retract(self, clause: Clause) -> None:
+        """removes a clause, fact or Rule, that is in the KnowledgeBase"""
+        if not clause.is_fact:
+            self._check_views(clause.rule)
+        elif any(view.owns(clause) for view in self.views):
+            raise ValueError(f"{clause} cannot be retracted, a view derives it")
+        self._remove(clause.position)
+        if clause.is_fact:
+            for view in self.views:
+                view.deleted(clause.rule.predicate)
+
+    def retract_fact(self, fact: Any) -> bool:
+        """removes the first fact that is equal to the one given, and returns
+        whether there was one"""
+        positions = self._facts.get(Rule(fact).predicate)
+        if not positions:
+            return False
+        self.retract(self.clauses[positions[0]])
+        return True
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+    def __iter__(self) -> Iterator[Clause]:
+        return iter(self.clauses.values())
+
+    def _positions(self, goal: Any) -> Iterable[int]:
+        if not isinstance(goal, ImmutableDict):
+            return self.clauses
+
+        signature = frozenset(goal.keys())
+        best: Iterable[int] = self._signatures.get(signature, {})
+        size = len(best)  # type: ignore
+
+        for key, value in goal.items():
+            bucket = index_key(value)
+            if bucket is _WILDCARD:
+                continue
+            buckets = self._values.get((signature, key), {})
+            matches = buckets.get(bucket, {})
+            wildcards = buckets.get(_WILDCARD, {})
+            if len(matches) + len(wildcards) < size:
+                best = merge(matches, wildcards)
+                size = len(matches) + len(wildcards)
+            if not size:
+                break
+
+        if self._unindexed:
+            return merge(best, self._unindexed)
+        return best
+
+    def candidates(self, goal: Any) -> List[Clause]:
+        """all clauses whose head might unify with the goal, in database order"""
+        return [self.clauses[position] for position in self._positions(goal)]
@@ -0,0 +1,287 @@
+import multiprocessing
+import os
+import queue
+from functools import partial
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from inference_logic.data_structures import (
+    Assert,
+    Assign,
+    ImmutableDict,
+    Variable,
+    construct,
+    get_variables,
+    new_frame,
+)
+from inference_logic.knowledge_base import KnowledgeBase
+from inference_logic.trail import Bindings, Goals, resume, solution
+
+Solution = Dict[Variable, Any]
+
+
+class BodyGoal(NamedTuple):
+    """An Assign or Assert from the body of a clause, renamed into a frame.
+
+    These are referred to by their position in the KnowledgeBase rather than
+    sent to other processes, as their expressions are usually lambdas, which
+    cannot be pickled.
+    """
+
+    clause: int
+    term: int
+    frame: int
+
+
+class Branch(NamedTuple):
+    """The state of a trail search, at one of the alternatives for a goal,
+    that can be pickled and resumed in another process: the goals still to
+    be proven, every binding made so far and the last frame used."""
+
+    goals: Tuple[Any, ...]
+    bindings: Tuple[Tuple[Variable, Any], ...]
+    frame: int
+
+
+def _decode(db: KnowledgeBase, goal: Any) -> Any:
+    if isinstance(goal, BodyGoal):
+        return new_frame(db.clauses[goal.clause].rule.body[goal.term], goal.frame)
+    return goal
+
+
+def _restore(branch: Branch) -> Bindings:
+    bindings = Bindings()
+    for variable, value in branch.bindings:
+        bindings.bind(variable, value)
+    return bindings
+
+
+def _export(bindings: Bindings) -> Tuple[Tuple[Variable, Any], ...]:
+    return tuple(
+        (variable, bindings.values[variable.id]) for variable in bindings.trail
+    )
+
+
+Expansion = Generator[Tuple[Bindings, Any], bool, List[Union[Branch, Solution]]]
+
+
+def expansion(db: KnowledgeBase, branch: Branch, to_solve_for: Any) -> Expansion:
+    """Proves the goals of a branch until it either fails, is solved or
+    reaches a goal that more than one clause unifies with, and returns the
+    solution or the branches for each of those clauses in database order.
+
+    Each Assign or Assert is yielded, along with the Bindings to evaluate it
+    with, and whether it held is sent back, so that the caller decides how
+    its expression is run.
+    """
+    bindings = _restore(branch)
+    stack = list(reversed(branch.goals))
+    frame = branch.frame
+
+    while stack:
+        goal = _decode(db, stack.pop())
+        if isinstance(goal, (Assign, Assert)):
+            if not (yield bindings, goal):
+                return []
+            continue
+
+        mark = bindings.mark()
+        matches = []
+        for clause in db.candidates(bindings.shallow_resolve(goal)):
+            frame += 1
+            renamed = clause.unify(bindings, goal, frame)
+            if renamed is not None:
+                body = tuple(
+                    BodyGoal(clause.position, index, frame)
+                    if isinstance(term, (Assign, Assert))
+                    else term
+                    for index, term in enumerate(renamed)
+                )
+                matches.append((clause, frame, body))
+            bindings.undo(mark)
+
+        if len(matches) == 1:
+            clause, match, body = matches[0]
+            clause.unify(bindings, goal, match)
+            stack.extend(reversed(body))
+            continue
+
+        branches: List[Union[Branch, Solution]] = []
+        rest = tuple(reversed(stack))
+        for clause, match, body in matches:
+            clause.unify(bindings, goal, match)
+            branches.append(Branch(body + rest, _export(bindings), frame))
+            bindings.undo(mark)
+        return branches
+
+    found = solution(bindings, to_solve_for)
+    return [] if found is None else [found]
+
+
+def expand(
+    db: KnowledgeBase, branch: Branch, to_solve_for: Any
+) -> List[Union[Branch, Solution]]:
+    """the expansion of a branch, evaluating every Assign and Assert as it
+    goes"""
+    steps = expansion(db, branch, to_solve_for)
+    try:
+        bindings, goal = next(steps)
+        while True:
+            bindings, goal = steps.send(bindings.evaluate(goal))
+    except StopIteration as stop:
+        return stop.value
+
+
+def solve(
+    db: KnowledgeBase, frontier: List[Union[Branch, Solution]], to_solve_for: Any
+) -> Iterator[Solution]:
+    """all the solutions of some branches, in order, found by a trail search,
+    along with any solutions already found between them"""
+    for item in frontier:
+        if not isinstance(item, Branch):
+            yield item
+            continue
+        goals: Goals = None
+        for goal in reversed(item.goals):
+            goals = (_decode(db, goal), 0, goals)
+        yield from resume(db, _restore(item), goals, item.frame, to_solve_for)
+
+
+# how many solutions a worker sends back at once, and how many of those
+# batches it may send ahead of the one being yielded before it waits
+BATCH_SIZE = 64
+BATCHES_AHEAD = 16
+
+
+def _work(
+    db: KnowledgeBase,
+    chunks: List[List[Union[Branch, Solution]]],
+    to_solve_for: Any,
+    output: Any,
+) -> None:
+    """searches some chunks of branches in turn, putting their solutions on
+    the output queue a batch at a time and None once each chunk is finished,
+    or the solutions found so far and then the exception that stopped the
+    search"""
+    batch: List[Solution] = []
+    try:
+        for chunk in chunks:
+            for found in solve(db, chunk, to_solve_for):
+                batch.append(found)
+                if len(batch) == BATCH_SIZE:
+                    output.put(batch)
+                    batch = []
+            output.put(batch)
+            output.put(None)
+            batch = []
+    except Exception as error:
+        output.put(batch)
+        output.put(error)
+
+
+def _receive(output: Any, process: Any) -> Any:
+    """the next item a worker puts on its queue, or a RuntimeError if the
+    worker has exited without putting it there"""
+    while True:
+        try:
+            return output.get(timeout=0.1)
+        except queue.Empty:
+            if process.exitcode is not None and output.empty():
+                raise RuntimeError(f"a worker exited with code {process.exitcode}")
+
+
+def parallel_search(
+    db: KnowledgeBase,
+    query: ImmutableDict,
+    workers: Optional[int] = None,
+    granularity: int = 4,
+) -> Iterator[Solution]:
+    """Answers a query like the trail engine, sharing the alternative branches
+    of its search tree out between a pool of processes.
+
+    The search is expanded one branching goal at a time, breadth first, until
+    there are at least `granularity` open branches for every worker, and is
+    finished in this process if it runs out of branches first, so that small
+    queries never start a pool. The branches are then shared out in
+    `granularity` contiguous chunks per worker, and each worker searches
+    every `workers`th chunk in turn. The solutions are sent back a batch of
+    `BATCH_SIZE` at a time, and yielded as they arrive in the same order as
+    the trail engine finds them, so a query with endless solutions still
+    yields them. A worker that gets `BATCHES_AHEAD` batches ahead of the
+    solutions being yielded waits, and every worker is stopped when the
+    search is closed.
+
+    The workers are forked, so that they inherit the KnowledgeBase and their
+    branches without pickling them. Where fork is not available the branches
+    are searched in this process instead.
+
+    :param workers: how many processes to use, by default one per CPU
+    :param granularity: how many chunks of branches to share out to each worker
+    """
+    query = construct(query)
+    to_solve_for = frozenset(get_variables(query))
+    workers = workers or os.cpu_count() or 1
+
+    frontier: List[Union[Branch, Solution]] = [Branch((query,), (), 0)]
+    while True:
+        solved = next(
+            (i for i, item in enumerate(frontier) if isinstance(item, Branch)),
+            len(frontier),
+        )
+        yield from solve(db, frontier[:solved], to_solve_for)
+        del frontier[:solved]
+        open_branches = sum(isinstance(item, Branch) for item in frontier)
+        if not open_branches:
+            return
+        if open_branches >= workers * granularity:
+            break
+        frontier = [
+            new
+            for item in frontier
+            for new in (
+                expand(db, item, to_solve_for) if isinstance(item, Branch) else [item]
+            )
+        ]
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        yield from solve(db, frontier, to_solve_for)
+        return
+
+    size = -(-len(frontier) // (workers * granularity))
+    chunks = [frontier[start : start + size] for start in range(0, len(frontier), size)]
+    workers = min(workers, len(chunks))
+
+    context = multiprocessing.get_context("fork")
+    outputs = [context.Queue(BATCHES_AHEAD) for _ in range(workers)]
+    processes: List[Any] = []
+    try:
+        for worker, output in enumerate(outputs):
+            process = context.Process(
+                target=_work,
+                args=(db, chunks[worker::workers], to_solve_for, output),
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+
+        for index in range(len(chunks)):
+            output, process = outputs[index % workers], processes[index % workers]
+            for batch in iter(partial(_receive, output, process), None):
+                if isinstance(batch, Exception):
+                    raise batch
+                yield from batch
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+        for output in outputs:
+            output.close()
@@ -0,0 +1,113 @@
+import json
+import os
+from fnmatch import fnmatch
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, List
+
+CHUNK_SIZE = 1 << 20
+
+
+def _check(chunk_size: int) -> None:
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, not {chunk_size}")
+
+
+class FactSource:
+    """Facts that are read afresh each time they are iterated rather than
+    held in memory. A source can be loaded into a KnowledgeBase, or streamed
+    into a fact file with write_facts when there are too many facts to hold
+    in memory, and searched with a MappedKnowledgeBase.
+
+    This source calls a function, such as a generator function, for each
+    pass over its facts.
+
+    >>> source = FactSource(lambda: (dict(n=n) for n in range(2)))
+    >>> list(source), list(source)
+    ([{'n': 0}, {'n': 1}], [{'n': 0}, {'n': 1}])
+    """
+
+    def __init__(self, facts: Callable[[], Iterable[Any]]) -> None:
+        self.facts = facts
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.facts())
+
+
+def _loads(path: str, number: int, line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as error:
+        raise ValueError(f"{path}, line {number}: {error}") from error
+
+
+def _decode(path: str, first: int, lines: List[bytes]) -> List[Any]:
+    """decodes the lines of a chunk, which start at a line number, all at
+    once, or one at a time to find the line at fault when they are not one
+    JSON value each"""
+    values = [line for line in lines if line.strip()]
+    try:
+        facts = json.loads(b"[" + b",".join(values) + b"]")
+    except ValueError:
+        facts = []
+    if len(facts) == len(values):
+        return facts
+    return [
+        _loads(path, number, line)
+        for number, line in enumerate(lines, first)
+        if line.strip()
+    ]
+
+
+class JsonLines(FactSource):
+    """The facts in a JSON Lines file, one JSON value on each line, which is
+    read in chunks of `chunk_size` bytes whose lines are decoded together.
+    Blank lines are skipped.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "family.jsonl")
+    >>> with open(path, "w") as file:
+    ...     _ = file.write('{"parent": "A", "child": "B"}\\n\\n')
+    ...     _ = file.write('{"parent": "B", "child": "C"}\\n')
+    >>> list(JsonLines(path))
+    [{'parent': 'A', 'child': 'B'}, {'parent': 'B', 'child': 'C'}]
+    """
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE) -> None:
+        _check(chunk_size)
+        super().__init__(self._read)
+        self.path = path
+        self.chunk_size = chunk_size
+
+    def _read(self) -> Iterator[Any]:
+        number = 1
+        rest = b""
+        with open(self.path, "rb") as file:
+            for chunk in iter(partial(file.read, self.chunk_size), b""):
+                lines = (rest + chunk).split(b"\n")
+                rest = lines.pop()
+                yield from _decode(self.path, number, lines)
+                number += len(lines)
+        yield from _decode(self.path, number, [rest])
+
+
+class Shards(FactSource):
+    """The facts in every JSON Lines file in a directory whose name matches
+    a pattern, one file after another in the order of their names. The
+    directory is listed again on each pass, so shards that are added
+    between passes are read by the next one.
+    """
+
+    def __init__(
+        self, directory: str, pattern: str = "*.jsonl", chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        _check(chunk_size)
+        super().__init__(self._read)
+        self.directory = directory
+        self.pattern = pattern
+        self.chunk_size = chunk_size
+
+    def _read(self) -> Iterator[Any]:
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if fnmatch(name, self.pattern) and os.path.isfile(path):
+                yield from JsonLines(path, self.chunk_size)
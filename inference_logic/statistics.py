@@ -0,0 +1,90 @@
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Dict, List, Tuple
+
+from inference_logic.knowledge_base import Clause, KnowledgeBase
+
+
+class Statistics:
+    """Counters of the work done by the top down and trail engines, which a
+    search fills in when it is passed one. A Statistics adds up the work of
+    every search it is passed to.
+
+    The counters for each clause are keyed by its position in the
+    KnowledgeBase, and a failure is an attempt whose head did not unify.
+
+    >>> from inference_logic import Rule, Variable, search
+    >>> X, Y = Variable.factory("X", "Y")
+    >>> db = [
+    ...     dict(parent="A", child="B"),
+    ...     Rule(dict(person=X), dict(parent=X, child=Y)),
+    ... ]
+    >>> statistics = Statistics()
+    >>> list(search(db, dict(person=X), statistics=statistics))
+    [{X: 'A'}]
+    >>> statistics
+    Statistics(goals=2, solutions=1, evaluations=0, evaluation_failures=0, peak_stack=1)
+    >>> statistics.attempts
+    Counter({1: 1, 0: 1})
+    """
+
+    __slots__ = (
+        "goals",
+        "solutions",
+        "evaluations",
+        "evaluation_failures",
+        "peak_stack",
+        "attempts",
+        "failures",
+        "seconds",
+    )
+
+    def __init__(self) -> None:
+        self.goals = 0
+        self.solutions = 0
+        self.evaluations = 0
+        self.evaluation_failures = 0
+        self.peak_stack = 0
+        self.attempts: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.seconds: Dict[int, float] = defaultdict(float)
+
+    def expanded(self, stack: int) -> None:
+        """counts a goal being expanded, from a stack of some length"""
+        self.goals += 1
+        if stack > self.peak_stack:
+            self.peak_stack = stack
+
+    def attempted(self, position: int, seconds: float, failed: bool) -> None:
+        """counts an attempt to prove a goal with a clause"""
+        self.attempts[position] += 1
+        self.seconds[position] += seconds
+        if failed:
+            self.failures[position] += 1
+
+    def evaluated(self, holds: bool) -> None:
+        """counts an Assert or Assign being evaluated"""
+        self.evaluations += 1
+        if not holds:
+            self.evaluation_failures += 1
+
+    def clauses(self, db: KnowledgeBase) -> List[Tuple[Clause, int, int, float]]:
+        """each clause that was attempted and is still in the KnowledgeBase,
+        with its attempts, failures and time taken, most time first"""
+        rows = [
+            (
+                db.clauses[position],
+                attempts,
+                self.failures[position],
+                self.seconds[position],
+            )
+            for position, attempts in self.attempts.items()
+            if position in db.clauses
+        ]
+        return sorted(rows, key=itemgetter(3), reverse=True)
+
+    def __repr__(self) -> str:
+        counters = ", ".join(
+            f"{name}={getattr(self, name)}" for name in self.__slots__[:5]
+        )
+        return f"Statistics({counters})"
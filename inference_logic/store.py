@@ -0,0 +1,295 @@
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Set, Tuple
+from weakref import WeakValueDictionary
+
+from inference_logic.data_structures import ImmutableDict, Rule, Variable
+from inference_logic.knowledge_base import Clause, KnowledgeBase, Signature
+
+MAGIC = b"ILFACTS1"
+
+# the magic number, the number of facts, and the offset and length of the
+# directory that locates everything else in a fact file
+_HEADER = struct.Struct("<8sQQQ")
+
+# the value index of each key holds the bucket of a value in the high 32 bits
+# and the ordinal of the fact in the low 32 bits, sorted
+_ORDINAL = (1 << 32) - 1
+
+
+def value_key(value: Any) -> Optional[int]:
+    """The bucket a value is filed under in a fact file: a stable hash of
+    primitives, by value, and of everything else by whether it is a dict or
+    a list, or None for a Variable, which can match anything. Numbers that
+    are equal share a bucket, as they do in a KnowledgeBase.
+
+    >>> value_key(1) == value_key(1.0) == value_key(True)
+    True
+    >>> value_key("1") == value_key(1)
+    False
+    >>> value_key([1, 2]) == value_key([])
+    True
+    >>> value_key(Variable("X")) is None
+    True
+    """
+    if isinstance(value, Variable):
+        return None
+    if isinstance(value, str):
+        data = b"s" + value.encode("utf-8", "surrogatepass")
+    elif value is None:
+        data = b"z"
+    elif isinstance(value, (bool, int, float)):
+        if isinstance(value, bool) or (isinstance(value, float) and value.is_integer()):
+            value = int(value)
+        data = b"n" + repr(value).encode()
+    elif isinstance(value, (dict, ImmutableDict)):
+        data = b"d"
+    else:
+        data = b"l"
+    return zlib.crc32(data)
+
+
+def _align(file: Any) -> int:
+    """pads a file to a multiple of 8 bytes, and returns its length"""
+    position = file.tell()
+    padding = -position % 8
+    file.write(bytes(padding))
+    return position + padding
+
+
+def write_facts(path: str, facts: Iterable[Dict[str, Any]]) -> int:
+    """Writes facts, which must be ground JSON objects, to a fact file that a
+    MappedKnowledgeBase can search without loading, and returns how many
+    there were. The facts are only iterated once.
+
+    The file holds each fact as compact JSON, along with an index of the
+    facts with each key signature and of the values of each of their keys.
+    The index is written in the byte order of the machine.
+    """
+    offsets = array("Q")
+    signatures: Dict[Tuple[str, ...], array] = {}
+    values: Dict[Tuple[Tuple[str, ...], str], array] = {}
+
+    with open(path, "wb") as file:
+        file.write(bytes(_HEADER.size))
+        for ordinal, fact in enumerate(facts):
+            if not isinstance(fact, dict):
+                raise TypeError(f"{fact} must be a dict")
+            if ordinal > _ORDINAL:
+                raise ValueError(f"a fact file holds at most {_ORDINAL + 1} facts")
+            offsets.append(file.tell())
+            file.write(json.dumps(fact, separators=(",", ":")).encode())
+
+            signature = tuple(sorted(fact))
+            signatures.setdefault(signature, array("I")).append(ordinal)
+            for key, value in fact.items():
+                entries = values.setdefault((signature, key), array("Q"))
+                entries.append(value_key(value) << 32 | ordinal)  # type: ignore
+        offsets.append(file.tell())
+
+        directory: Dict[str, Any] = {
+            "byteorder": sys.byteorder,
+            "offsets": _align(file),
+            "signatures": [],
+        }
+        offsets.tofile(file)
+        for signature, ordinals in signatures.items():
+            start = _align(file)
+            ordinals.tofile(file)
+            keys = {}
+            for key in signature:
+                keys[key] = _align(file)
+                array("Q", sorted(values.pop((signature, key)))).tofile(file)
+            directory["signatures"].append(
+                {"keys": signature, "facts": [start, len(ordinals)], "values": keys}
+            )
+
+        start = file.tell()
+        file.write(json.dumps(directory).encode())
+        end = file.tell()
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, len(offsets) - 1, start, end - start))
+    return len(offsets) - 1
+
+
+class _Clauses(dict):
+    """The clauses of a MappedKnowledgeBase that are held in memory, which
+    builds the Clause of a fact in its file when it is looked up."""
+
+    def __init__(self, kb: "MappedKnowledgeBase") -> None:
+        super().__init__()
+        self.kb = kb
+
+    def __missing__(self, position: int) -> Clause:
+        return self.kb._load(position)
+
+    def __contains__(self, position: object) -> bool:
+        return super().__contains__(position) or self.kb._stored(position)
+
+
+class MappedKnowledgeBase(KnowledgeBase):
+    """A KnowledgeBase whose first facts are in a fact file written by
+    write_facts, which is memory-mapped rather than loaded.
+
+    The candidates for a goal are looked up in the index of the file, and a
+    fact is only read and constructed when it is a candidate, so opening a
+    file takes the same time however many facts it holds, and only the
+    facts a search touches are held in memory, for as long as it uses them.
+
+    Any other facts and Rules, passed in `db` or added later, are held in
+    memory after the facts of the file, and any fact can be retracted.
+
+    The file stays mapped until the MappedKnowledgeBase is closed, either by
+    calling close or by using it as a context manager.
+
+    >>> import os, tempfile
+    >>> from inference_logic import search
+    >>> X, Y, Z = Variable.factory("X", "Y", "Z")
+    >>> path = os.path.join(tempfile.mkdtemp(), "family.facts")
+    >>> write_facts(path, [dict(parent="A", child="B"), dict(parent="B", child="C")])
+    2
+    >>> kb = MappedKnowledgeBase(path, [
+    ...     Rule(dict(grandparent=X), dict(parent=X, child=Y), dict(parent=Y, child=Z))
+    ... ])
+    >>> kb.candidates(ImmutableDict(parent="B", child=X))
+    [{'parent': 'B', 'child': 'C'}.]
+    >>> list(search(kb, dict(grandparent=X)))
+    [{X: 'A'}]
+    >>> kb.close()
+    """
+
+    def __init__(self, path: str, db: Iterable = ()) -> None:
+        super().__init__()
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = []
+        try:
+            self._open(path)
+        except BaseException:
+            self.close()
+            raise
+
+        self._retracted: Set[int] = set()
+        self._loaded: WeakValueDictionary = WeakValueDictionary()
+        self.clauses = _Clauses(self)
+        self._next = self._count
+        for clause in db:
+            self._add(clause if isinstance(clause, Rule) else Rule(clause))
+
+    def _open(self, path: str) -> None:
+        """reads the header and directory of the file, and maps its index"""
+        magic, self._count, start, length = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a fact file")
+        directory = json.loads(self._map[start : start + length])
+        if directory["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written in {directory['byteorder']} endian")
+
+        def _cast(start: int, size: int, kind: Literal["I", "Q"]) -> memoryview:
+            with memoryview(self._map) as view:
+                cast = view[start : start + size * struct.calcsize(kind)].cast(kind)
+            self._views.append(cast)
+            return cast
+
+        self._offsets = _cast(directory["offsets"], self._count + 1, "Q")
+        self._index: Dict[Signature, Tuple[memoryview, Dict[str, memoryview]]] = {}
+        for entry in directory["signatures"]:
+            start, size = entry["facts"]
+            self._index[frozenset(entry["keys"])] = (
+                _cast(start, size, "I"),
+                {
+                    key: _cast(start, size, "Q")
+                    for key, start in entry["values"].items()
+                },
+            )
+
+    def close(self) -> None:
+        """releases the fact file, after which its facts cannot be searched"""
+        for view in self._views:
+            view.release()
+        self._map.close()
+
+    def __enter__(self) -> "MappedKnowledgeBase":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _stored(self, position: Any) -> bool:
+        return (
+            isinstance(position, int)
+            and 0 <= position < self._count
+            and position not in self._retracted
+        )
+
+    def _load(self, position: int) -> Clause:
+        """the Clause of a fact in the file, which is only built once for as
+        long as it is in use"""
+        if not self._stored(position):
+            raise KeyError(position)
+        clause = self._loaded.get(position)
+        if clause is None:
+            start, end = self._offsets[position], self._offsets[position + 1]
+            fact = json.loads(self._map[start:end])
+            clause = self._loaded[position] = Clause(Rule(fact), position)
+        return clause
+
+    def _remove(self, position: int) -> None:
+        if position >= self._count:
+            super()._remove(position)
+            return
+        if not self._stored(position):
+            raise KeyError(position)
+        self._retracted.add(position)
+        self.version += 1
+
+    def retract_fact(self, fact: Any) -> bool:
+        predicate = Rule(fact).predicate
+        if isinstance(predicate, ImmutableDict):
+            for position in self._lookup(predicate):
+                clause = self.clauses[position]
+                if clause.rule.predicate == predicate:
+                    self.retract(clause)
+                    return True
+        return super().retract_fact(fact)
+
+    def __len__(self) -> int:
+        return self._count - len(self._retracted) + super().__len__()
+
+    def __iter__(self) -> Iterator[Clause]:
+        return chain(map(self._load, self._lookup(None)), super().__iter__())
+
+    def _lookup(self, goal: Any) -> Iterator[int]:
+        """the positions of the facts in the file that might unify with a
+        goal, in the order they were written"""
+        if not isinstance(goal, ImmutableDict):
+            best: Iterable[int] = range(self._count)
+        elif frozenset(goal.keys()) not in self._index:
+            return iter(())
+        else:
+            best, values = self._index[frozenset(goal.keys())]
+            for key, value in goal.items():
+                bucket = value_key(value)
+                if bucket is None:
+                    continue
+                entries = values[key]
+                low = bisect_left(entries, bucket << 32)
+                high = bisect_left(entries, (bucket + 1) << 32)
+                if high - low < len(best):
+                    best = entries[low:high]
+                if not best:
+                    break
+        return (
+            position & _ORDINAL
+            for position in best
+            if position & _ORDINAL not in self._retracted
+        )
+
+    def _positions(self, goal: Any) -> Iterable[int]:
+        return chain(self._lookup(goal), super()._positions(goal))
@@ -0,0 +1,128 @@
+from collections import deque
+from heapq import heappop, heappush
+from itertools import count
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# a goal, as a Rule whose predicate is proven first, along with the Equality
+# it is proven under and how many resolution steps it is from the query
+Item = Tuple[Any, Any, int]
+
+
+class Stack(list):
+    """the frontier of a depth first search"""
+
+    push = list.append
+
+
+class Queue(deque):
+    """the frontier of a breadth first search"""
+
+    push = deque.append
+    pop = deque.popleft  # type: ignore
+
+
+class PriorityQueue:
+    """the frontier of a best first search, which always pops the goal with
+    the lowest cost, and of those the one that was pushed first"""
+
+    def __init__(self, cost: Callable[[Any, int], float]) -> None:
+        self._cost = cost
+        self._heap: List[Tuple[float, int, Item]] = []
+        self._order = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: Item) -> None:
+        goal, _, depth = item
+        heappush(self._heap, (self._cost(goal, depth), next(self._order), item))
+
+    def pop(self) -> Item:
+        return heappop(self._heap)[2]
+
+
+Frontier = Union[Stack, Queue, PriorityQueue]
+
+
+class Strategy:
+    """The order in which the top down engine proves its goals, given by the
+    frontier it keeps them in, and the depth bounds it searches within.
+
+    The search is run once for each bound, never expanding a goal deeper
+    than it, and stops after a pass that did not reach the bound. Solutions
+    are only yielded the first time they are found.
+    """
+
+    def frontier(self) -> Frontier:
+        return Stack()
+
+    def bounds(self) -> Iterator[Optional[int]]:
+        yield None
+
+
+class DepthFirst(Strategy):
+    """proves the goals from the last clause tried first, which is fast to
+    find a first solution but never returns from infinite descent"""
+
+
+class BreadthFirst(Strategy):
+    """proves every goal at one depth before any deeper one, which finds
+    the shallowest solutions first but keeps every open goal in memory"""
+
+    def frontier(self) -> Frontier:
+        return Queue()
+
+
+class IterativeDeepening(Strategy):
+    """repeats a depth first search with a depth bound that grows by `step`
+    each time, which finds shallow solutions first using the memory of a
+    depth first search, at the cost of repeating the shallow steps
+
+    >>> list(IterativeDeepening(start=2, step=3, limit=9).bounds())
+    [2, 5, 8, 9]
+    """
+
+    def __init__(self, start: int = 1, step: int = 1, limit: Optional[int] = None):
+        if step < 1:
+            raise ValueError(f"step must be positive, not {step}")
+        self.start = start
+        self.step = step
+        self.limit = limit
+
+    def bounds(self) -> Iterator[Optional[int]]:
+        bound = self.start
+        while self.limit is None or bound < self.limit:
+            yield bound
+            bound += self.step
+        yield self.limit
+
+
+class BestFirst(Strategy):
+    """proves the goal with the lowest cost first, given by a function of
+    the goal, a Rule whose predicate is proven first, and its depth"""
+
+    def __init__(self, cost: Callable[[Any, int], float]) -> None:
+        self.cost = cost
+
+    def frontier(self) -> Frontier:
+        return PriorityQueue(self.cost)
+
+
+STRATEGIES: Dict[str, Callable[[], Strategy]] = {
+    "depth_first": DepthFirst,
+    "breadth_first": BreadthFirst,
+    "iterative_deepening": IterativeDeepening,
+}
+
+
+def get_strategy(strategy: Union[str, Strategy]) -> Strategy:
+    """a Strategy, or the Strategy with a name
+
+    >>> get_strategy("breadth_first")  # doctest: +ELLIPSIS
+    <inference_logic.strategies.BreadthFirst object at ...>
+    """
+    if isinstance(strategy, Strategy):
+        return strategy
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy: {strategy}")
+    return STRATEGIES[strategy]()
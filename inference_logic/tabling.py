@@ -0,0 +1,126 @@
+from typing import Any, Dict, Hashable, Iterator, List, Set, Tuple
+
+from inference_logic.data_structures import (
+    Assert,
+    Assign,
+    ImmutableDict,
+    UnificationError,
+    Variable,
+    canonical,
+    construct,
+    get_variables,
+    new_frame,
+    standardise,
+)
+from inference_logic.equality import Equality
+from inference_logic.knowledge_base import KnowledgeBase
+
+
+class Tables:
+    """SLG-style answer tables, one per call variant.
+
+    The first time a variant of a goal is called its clauses are evaluated
+    repeatedly until no new answers are found. Any call to a variant that is
+    already being evaluated higher up is answered from its (incomplete) table
+    instead of being re-entered, which is what makes left recursion terminate.
+    A table is only marked complete once the call that leads its strongly
+    connected component of dependencies has reached its fixpoint.
+    """
+
+    def __init__(self, db: KnowledgeBase) -> None:
+        self.db = db
+        self.answers: Dict[Hashable, Dict[Hashable, Any]] = {}
+        self.complete: Set[Hashable] = set()
+        self._active: Dict[Hashable, int] = {}
+        self._pending: List[Hashable] = []
+        self._low = 0
+        self._added = 0
+        self._frame = 0
+
+    def call(self, goal: ImmutableDict) -> List[Any]:
+        """all the answers to the goal, each with its Variables standardised"""
+        key = canonical(goal)
+        if key in self.complete:
+            return list(self.answers[key].values())
+        if key in self._active:
+            self._low = min(self._low, self._active[key])
+            return list(self.answers[key].values())
+
+        depth = len(self._active)
+        self._active[key] = depth
+        table = self.answers.setdefault(key, {})
+        pending = len(self._pending)
+        outer_low, low = self._low, depth
+
+        while True:
+            self._low = depth
+            added = self._added
+            for answer in self._evaluate(goal):
+                answer_key = canonical(answer)
+                if answer_key not in table:
+                    table[answer_key] = standardise(answer)
+                    self._added += 1
+            low = min(low, self._low)
+            if self._added == added:
+                break
+
+        del self._active[key]
+        if low >= depth:
+            self.complete.add(key)
+            self.complete.update(self._pending[pending:])
+            del self._pending[pending:]
+        else:
+            self._pending.append(key)
+        self._low = min(outer_low, low)
+        return list(table.values())
+
+    def _rename(self, term: Any) -> Any:
+        self._frame += 1
+        return new_frame(term, self._frame)
+
+    def _evaluate(self, goal: ImmutableDict) -> Iterator[Any]:
+        for clause in self.db.candidates(goal):
+            self._frame += 1
+            rule = clause.rename(self._frame)
+            try:
+                equality = Equality().unify(goal, rule.predicate)
+            except UnificationError:
+                continue
+            for solved in self._solve(rule.body, equality):
+                yield solved.substitute(goal)
+
+    def _solve(self, body: Tuple, equality: Equality) -> Iterator[Equality]:
+        if not body:
+            yield equality
+            return
+
+        term, rest = body[0], body[1:]
+        if isinstance(term, (Assign, Assert)):
+            try:
+                equality = equality.evaluate(term)
+            except UnificationError:
+                return
+            yield from self._solve(rest, equality)
+            return
+
+        for answer in self.call(equality.substitute(term)):
+            yield from self._solve(rest, equality.unify(term, self._rename(answer)))
+
+
+def tabled_search(
+    db: KnowledgeBase, query: ImmutableDict
+) -> Iterator[Dict[Variable, Any]]:
+    """Answers a query with tabled resolution: each distinct answer is yielded
+    once, repeated sub-goals are answered from their tables and left recursive
+    Rules terminate. As with the top down engine, only the answers that bind
+    every Variable to a ground term are kept.
+    """
+    query = construct(query)
+    to_solve_for = get_variables(query)
+    tables = Tables(db)
+
+    for answer in tables.call(query):
+        equality = Equality().unify(query, tables._rename(answer))
+        solutions = equality.solutions(to_solve_for)
+        if set(solutions) == to_solve_for:
+            yield solutions
@@ -0,0 +1,250 @@
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from inference_logic.budget import Budget
+from inference_logic.data_structures import (
+    Assert,
+    Assign,
+    ImmutableDict,
+    PrologList,
+    PrologListNull,
+    UnificationError,
+    Variable,
+    check_cycle,
+    construct,
+    deconstruct,
+    from_spine,
+    get_variables,
+)
+from inference_logic.knowledge_base import INDEXABLE, Clause, KnowledgeBase
+from inference_logic.statistics import Statistics
+
+# the goals still to be proven, first to last, as a linked list of nodes
+# holding a goal, how many resolution steps it is from the query and the rest
+Goals = Optional[Tuple[Any, int, Any]]
+
+
+class Bindings:
+    """A single mutable store of Variable bindings, as used by a Prolog engine.
+
+    Every binding is recorded on a trail, so that everything bound since a
+    mark was taken can be undone when the search backtracks to it. Bindings
+    are keyed by the integer ids of their Variables.
+
+    >>> A, B = Variable.factory("A", "B")
+    >>> bindings = Bindings()
+    >>> mark = bindings.mark()
+    >>> bindings.unify(construct(dict(a=A, b=[1, B])), construct(dict(a=B, b=[A, 1])))
+    True
+    >>> bindings.resolve(A)
+    1
+    >>> bindings.undo(mark)
+    >>> bindings.resolve(A)
+    A
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[int, Any] = {}
+        self.trail: List[Variable] = []
+
+    def mark(self) -> int:
+        return len(self.trail)
+
+    def undo(self, mark: int) -> None:
+        values, trail = self.values, self.trail
+        while len(trail) > mark:
+            del values[trail.pop().id]
+
+    def bind(self, variable: Variable, value: Any) -> None:
+        self.values[variable.id] = value
+        self.trail.append(variable)
+
+    def deref(self, term: Any) -> Any:
+        values = self.values
+        while isinstance(term, Variable) and term.id in values:
+            term = values[term.id]
+        return term
+
+    def unify(self, left: Any, right: Any) -> bool:
+        """unifies two terms, binding Variables as it goes, and returns whether
+        it succeeded. Bindings made before a failure are left on the trail."""
+        stack = [(left, right)]
+        while stack:
+            left, right = stack.pop()
+            left, right = self.deref(left), self.deref(right)
+            if left is right:
+                continue
+            if isinstance(left, Variable):
+                if not (isinstance(right, Variable) and left.id == right.id):
+                    self.bind(left, right)
+            elif isinstance(right, Variable):
+                self.bind(right, left)
+            elif isinstance(left, ImmutableDict):
+                if not isinstance(right, ImmutableDict) or left.keys() != right.keys():
+                    return False
+                stack.extend((value, right[key]) for key, value in left.items())
+            elif isinstance(left, PrologList):
+                if not isinstance(right, PrologList):
+                    return False
+                stack.append((left.tail, right.tail))
+                stack.append((left.head, right.head))
+            elif isinstance(left, PrologListNull) or isinstance(right, PrologListNull):
+                if type(left) is not type(right):
+                    return False
+            elif not isinstance(right, INDEXABLE) or left != right:
+                return False
+        return True
+
+    def resolve(self, term: Any) -> Any:
+        """the term with every bound Variable replaced by its value"""
+        term = self.deref(term)
+        if isinstance(term, ImmutableDict):
+            return ImmutableDict(
+                {key: self.resolve(value) for key, value in term.items()}
+            )
+        if isinstance(term, PrologList):
+            items = []
+            seen: Set[Variable] = set()
+            while isinstance(term, PrologList):
+                items.append(self.resolve(term.head))
+                term = term.tail
+                if isinstance(term, Variable):
+                    check_cycle(seen, term)
+                    term = self.deref(term)
+            return from_spine(items, self.resolve(term))
+        return term
+
+    def shallow_resolve(self, goal: Any) -> Any:
+        """a goal with each of its values dereferenced, which is all that is
+        needed to look up its candidates in a KnowledgeBase"""
+        if isinstance(goal, ImmutableDict):
+            return ImmutableDict.from_terms(
+                {key: self.deref(value) for key, value in goal.items()}
+            )
+        return goal
+
+    def arguments(self, variables: List[Variable]) -> List[Any]:
+        """the values of the Variables an expression takes, which must all be
+        bound"""
+        arguments = []
+        for variable in variables:
+            value = self.resolve(variable)
+            if isinstance(value, Variable):
+                raise KeyError(variable)
+            arguments.append(value)
+        return arguments
+
+    def evaluate(self, term: Any) -> bool:
+        """runs an Assert, or an Assign binding its Variable to the result"""
+        try:
+            value = term.expression(*self.arguments(term.variables))
+        except UnificationError:
+            return False
+        return self.conclude(term, value)
+
+    def conclude(self, term: Any, value: Any) -> bool:
+        """whether an Assert held, or an Assign could bind its Variable, given
+        the value its expression returned"""
+        if isinstance(term, Assign):
+            return self.unify(term.variable, construct(value))
+        return bool(value)
+
+
+def _push(body: Tuple, depth: int, goals: Goals) -> Goals:
+    for term in reversed(body):
+        goals = (term, depth, goals)
+    return goals
+
+
+def solution(
+    bindings: Bindings, to_solve_for: Iterable[Variable]
+) -> Optional[Dict[Variable, Any]]:
+    """the values of the Variables being solved for, or None unless they are
+    all bound to ground terms"""
+    values = {variable: bindings.resolve(variable) for variable in to_solve_for}
+    if any(map(get_variables, values.values())):
+        return None
+    return {variable: deconstruct(value) for variable, value in values.items()}
+
+
+def trail_search(
+    db: KnowledgeBase,
+    query: ImmutableDict,
+    budget: Optional[Budget] = None,
+    statistics: Optional[Statistics] = None,
+) -> Iterator[Dict[Variable, Any]]:
+    """Answers a query depth first with a single mutable Bindings store.
+
+    Each goal with alternative clauses leaves a choice point holding the trail
+    mark to undo to before its next clause is tried, and a choice point is
+    dropped as soon as its last clause is tried, so deterministic recursion
+    does not grow the stack. Solutions are found in database order, and as
+    with the top down engine only those that bind every Variable to a ground
+    term are kept.
+    """
+    query = construct(query)
+    return resume(
+        db, Bindings(), (query, 0, None), 0, get_variables(query), budget, statistics
+    )
+
+
+def resume(
+    db: KnowledgeBase,
+    bindings: Bindings,
+    goals: Goals,
+    frame: int,
+    to_solve_for: Iterable[Variable],
+    budget: Optional[Budget] = None,
+    statistics: Optional[Statistics] = None,
+) -> Iterator[Dict[Variable, Any]]:
+    """carries on a trail search from some goals still to be proven, with
+    some Bindings already made and Variables renamed into frames up to frame"""
+    choices: List[Tuple[Any, int, Goals, List[Clause], int, int]] = []
+    if budget is not None:
+        budget.start()
+
+    while True:
+        if goals is None:
+            found = solution(bindings, to_solve_for)
+            if found is not None:
+                if statistics is not None:
+                    statistics.solutions += 1
+                yield found
+        else:
+            goal, depth, rest = goals
+            if isinstance(goal, (Assign, Assert)):
+                holds = bindings.evaluate(goal)
+                if statistics is not None:
+                    statistics.evaluated(holds)
+                if holds:
+                    goals = rest
+                    continue
+            else:
+                if statistics is not None:
+                    statistics.expanded(len(choices) + 1)
+                candidates = db.candidates(bindings.shallow_resolve(goal))
+                choices.append((goal, depth, rest, candidates, 0, bindings.mark()))
+
+        resumed = False
+        while not resumed:
+            if not choices:
+                return
+            goal, depth, rest, candidates, index, mark = choices.pop()
+            bindings.undo(mark)
+            for index in range(index, len(candidates)):
+                if budget is not None and not budget.step(depth, len(choices)):
+                    return
+                frame += 1
+                started = perf_counter() if statistics is not None else 0.0
+                body = candidates[index].unify(bindings, goal, frame)
+                if statistics is not None:
+                    seconds = perf_counter() - started
+                    statistics.attempted(
+                        candidates[index].position, seconds, body is None
+                    )
+                if body is not None:
+                    if index + 1 < len(candidates):
+                        choices.append((goal, depth, rest, candidates, index + 1, mark))
+                    goals, resumed = _push(body, depth + 1, rest), True
+                    break
+                bindings.undo(mark)
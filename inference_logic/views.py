@@ -0,0 +1,239 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from inference_logic.bottom_up import Bindings, Model, _check, instantiate, match
+from inference_logic.data_structures import ImmutableDict, Rule, Variable, construct
+from inference_logic.knowledge_base import Clause, KnowledgeBase, Signature
+
+
+def _derive(
+    body: Tuple[ImmutableDict, ...],
+    sources: List[Model],
+    bindings: Bindings,
+    position: int = 0,
+) -> Iterator[Bindings]:
+    """all the bindings that satisfy a body, where the literal at each
+    position only matches the facts of the Model at the same position"""
+    if position == len(body):
+        yield bindings
+        return
+
+    literal = body[position]
+    for fact, _ in sources[position].lookup(literal, bindings):
+        matched = match(literal, fact, bindings)
+        if matched is not None:
+            yield from _derive(body, sources, matched, position + 1)
+
+
+def _consequences(
+    rules: List[Rule], frontier: Model, model: Model
+) -> Iterator[ImmutableDict]:
+    """every fact that a Rule derives from a Model using at least one fact of
+    the frontier, which is joined first so the rest of the body is looked up
+    with what it binds"""
+    for rule in rules:
+        body = rule.body
+        for position in range(len(body)):
+            ordered = (body[position], *body[:position], *body[position + 1 :])
+            sources = [frontier] + [model] * (len(body) - 1)
+            for bindings in _derive(ordered, sources, {}):
+                yield instantiate(rule.predicate, bindings)
+
+
+class View:
+    """The facts of a derived predicate, computed once bottom up from the
+    Rules that define it and then kept up to date as facts are asserted
+    into and retracted from its KnowledgeBase.
+
+    The facts of the view are asserted into the KnowledgeBase in place of
+    the Rules that define it, so that a query for it is answered by looking
+    them up rather than by searching. An asserted fact is propagated
+    semi-naively, only joining the Rules with what is new in each round, and
+    a retracted one by delete and rederive: every fact derived from it is
+    deleted, and then those that can still be derived some other way are
+    derived again.
+
+    The Rules the view depends on must all be able to be evaluated bottom up,
+    and cannot be changed while it is materialised, nor can the facts it
+    asserts be retracted.
+    """
+
+    def __init__(self, kb: KnowledgeBase, head: Any) -> None:
+        head = construct(head)
+        if not isinstance(head, ImmutableDict):
+            raise TypeError(f"{head} must be a dict")
+        self.kb = kb
+        self.signature: Signature = frozenset(head.keys())
+
+        defined: Dict[Signature, List[Clause]] = {}
+        for clause in kb:
+            predicate = clause.rule.predicate
+            if not clause.is_fact and isinstance(predicate, ImmutableDict):
+                defined.setdefault(frozenset(predicate.keys()), []).append(clause)
+        if self.signature not in defined:
+            raise ValueError(f"no Rules define {head}")
+
+        self.derived: Set[Signature] = set()
+        self.signatures: Set[Signature] = set()
+        self.rules: List[Rule] = []
+        stack = [self.signature]
+        while stack:
+            signature = stack.pop()
+            self.signatures.add(signature)
+            if signature in self.derived:
+                continue
+            self.derived.add(signature)
+            for clause in defined.get(signature, []):
+                _check(clause)
+                self.rules.append(clause.rule)
+                stack.extend(frozenset(term.keys()) for term in clause.rule.body)
+
+        self.model = Model()
+        self._base: Counter = Counter()
+        self._asserted: Dict[ImmutableDict, Clause] = {}
+        self._updating = False
+        for clause in kb:
+            if clause.is_fact and self._relevant(clause.rule.predicate):
+                _check(clause)
+                self._base[clause.rule.predicate] += 1
+                self.model.add(clause.rule.predicate)
+        self._propagate(list(self.model))
+
+        for clause in defined[self.signature]:
+            kb.retract(clause)
+        self._sync(self.model.facts.get(self.signature, {}))
+        kb.views.append(self)
+
+    def _relevant(self, fact: Any) -> bool:
+        return (
+            not self._updating
+            and isinstance(fact, ImmutableDict)
+            and frozenset(fact.keys()) in self.signatures
+        )
+
+    def _sync(self, facts: Iterable[ImmutableDict]) -> None:
+        """asserts the facts of the view that are not in the KnowledgeBase,
+        and retracts those that no longer hold, or that have been asserted
+        since"""
+        self._updating = True
+        try:
+            for fact in facts:
+                if frozenset(fact.keys()) != self.signature:
+                    continue
+                holds = fact in self.model and fact not in self._base
+                clause = self._asserted.get(fact)
+                if holds and clause is None:
+                    self._asserted[fact] = self.kb.assert_fact(fact)
+                elif not holds and clause is not None:
+                    self.kb.retract(self._asserted.pop(fact))
+        finally:
+            self._updating = False
+
+    def owns(self, clause: Clause) -> bool:
+        """whether a clause is one of the facts the view asserted, which only
+        the view can retract"""
+        fact = clause.rule.predicate
+        return (
+            not self._updating
+            and isinstance(fact, ImmutableDict)
+            and self._asserted.get(fact) is clause
+        )
+
+    def inserted(self, fact: Any) -> None:
+        """propagates a fact asserted into the KnowledgeBase"""
+        if not self._relevant(fact):
+            return
+        self._base[fact] += 1
+        if fact in self.model:
+            self._sync([fact])
+            return
+        self.model.add(fact)
+        self._sync([fact, *self._propagate([fact])])
+
+    def deleted(self, fact: Any) -> None:
+        """propagates a fact retracted from the KnowledgeBase"""
+        if not self._relevant(fact) or fact not in self._base:
+            return
+        self._base[fact] -= 1
+        if self._base[fact]:
+            return
+        del self._base[fact]
+
+        deleted = self._overdelete(fact)
+        for removed in deleted:
+            self.model.discard(removed)
+        rederived = [removed for removed in deleted if self._derivable(removed)]
+        for removed in rederived:
+            self.model.add(removed)
+        self._sync([*deleted, *self._propagate(rederived)])
+
+    def _propagate(self, new: List[ImmutableDict]) -> List[ImmutableDict]:
+        """adds everything that follows from some new facts, which are already
+        in the model, and returns what was added"""
+        added: List[ImmutableDict] = []
+        while new:
+            found: Dict[ImmutableDict, None] = {}
+            for fact in _consequences(self.rules, Model(new), self.model):
+                if fact not in self.model:
+                    found[fact] = None
+            new = list(found)
+            for fact in new:
+                self.model.add(fact)
+            added.extend(new)
+        return added
+
+    def _overdelete(self, fact: ImmutableDict) -> List[ImmutableDict]:
+        """a fact along with every fact derived from it that is not also
+        asserted in the KnowledgeBase"""
+        deleted = {fact: None}
+        new = [fact]
+        while new:
+            found: Dict[ImmutableDict, None] = {}
+            for derived in _consequences(self.rules, Model(new), self.model):
+                if derived not in deleted and derived not in self._base:
+                    found[derived] = None
+            new = list(found)
+            deleted.update(found)
+        return list(deleted)
+
+    def _derivable(self, fact: ImmutableDict) -> bool:
+        for rule in self.rules:
+            bindings = match(rule.predicate, fact, {})
+            if bindings is None:
+                continue
+            sources = [self.model] * len(rule.body)
+            if next(_derive(rule.body, sources, bindings), None) is not None:
+                return True
+        return False
+
+    def query(self, query: Any) -> Iterator[Dict[Variable, Any]]:
+        """answers a query for any predicate the view derives by looking it up"""
+        return self.model.query(query)
+
+
+def materialise(kb: KnowledgeBase, head: Any) -> View:
+    """Materialises the predicate with a head, so that its facts are stored
+    in a KnowledgeBase and kept up to date as facts are asserted into and
+    retracted from it. Only the keys of the head matter.
+
+    >>> from inference_logic import search
+    >>> X, Y, Z = Variable.factory("X", "Y", "Z")
+    >>> kb = KnowledgeBase([
+    ...     dict(parent="A", child="B"),
+    ...     dict(parent="B", child="C"),
+    ...     Rule(dict(ancestor=X, descendant=Y), dict(parent=X, child=Y)),
+    ...     Rule(
+    ...         dict(ancestor=X, descendant=Z),
+    ...         dict(parent=X, child=Y),
+    ...         dict(ancestor=Y, descendant=Z),
+    ...     ),
+    ... ])
+    >>> view = materialise(kb, dict(ancestor=X, descendant=Y))
+    >>> _ = kb.assert_fact(dict(parent="C", child="D"))
+    >>> _ = kb.retract_fact(dict(parent="A", child="B"))
+    >>> sorted(solution[Y] for solution in search(kb, dict(ancestor="B", descendant=Y)))
+    ['C', 'D']
+    >>> list(search(kb, dict(ancestor="A", descendant=Y)))
+    []
+    """
+    return View(kb, head)
@@ -0,0 +1,154 @@
+import asyncio
+import time
+
+import pytest
+
+from inference_logic import Rule, Variable, async_search, search
+from inference_logic.data_structures import Assert, Assign, construct
+
+X, Y, Z, P, N, M = Variable.factory("X", "Y", "Z", "P", "N", "M")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="G", child="B"),
+    dict(parent="A", child="O"),
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+
+async def slow_double(X):
+    await asyncio.sleep(0.05)
+    return X * 2
+
+
+async def is_even(N):
+    result = N % 2 == 0
+    return result
+
+
+def collect(db, query, **options):
+    async def _collect():
+        return [solution async for solution in async_search(db, query, **options)]
+
+    return asyncio.run(_collect())
+
+
+@pytest.mark.parametrize(
+    "db, query",
+    [
+        (family, dict(ancestor=P, descendant=Z)),
+        (family, dict(ancestor="O", descendant=Z)),
+        (
+            [
+                dict(count=0),
+                Rule(
+                    dict(count=N),
+                    Assert(lambda N: N > 0),
+                    Assign(M, lambda N: N - 1),
+                    dict(count=M),
+                ),
+            ],
+            dict(count=300),
+        ),
+    ],
+)
+def test_same_as_trail(db, query):
+    expected = list(search(db, query, engine="trail"))
+    solutions = collect(db, query, concurrency=2, yield_every=7)
+    assert sorted(map(repr, solutions)) == sorted(map(repr, expected))
+
+
+def test_awaitable_expressions():
+    db = [dict(number=i) for i in range(10)] + [
+        Rule(
+            dict(even_double=Y),
+            dict(number=N),
+            Assert(is_even),
+            Assign(X, lambda N: N),
+            Assign(Y, slow_double),
+        )
+    ]
+    start = time.perf_counter()
+    solutions = collect(db, dict(even_double=Z))
+    assert time.perf_counter() - start < 0.2
+    assert sorted(solution[Z] for solution in solutions) == [0, 4, 8, 12, 16]
+
+
+def test_other_tasks_run():
+    db = [
+        dict(count=0),
+        Rule(
+            dict(count=N),
+            Assert(lambda N: N > 0),
+            Assign(M, lambda N: N - 1),
+            dict(count=M),
+        ),
+    ]
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        solutions = [s async for s in async_search(db, dict(count=500), yield_every=10)]
+        task.cancel()
+        return solutions
+
+    assert asyncio.run(main()) == [{}]
+    assert len(ticks) >= 50
+
+
+def test_stop_early():
+    async def wait(N):
+        await asyncio.sleep(N / 100)
+        return N
+
+    db = [dict(number=i) for i in range(5)]
+    db += [Rule(dict(waited=Y), dict(number=N), Assign(Y, wait))]
+
+    async def main():
+        solutions = async_search(db, dict(waited=Z))
+        first = await solutions.__anext__()
+        await solutions.aclose()
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+        return first
+
+    start = time.perf_counter()
+    assert asyncio.run(main()) == {Z: 0}
+    assert time.perf_counter() - start < 0.04
+
+
+def test_failing_expression():
+    db = [
+        dict(value=[1]),
+        dict(value=1),
+        Rule(dict(next=Y), dict(value=X), Assign(Y, lambda X: construct([2]) + X)),
+    ]
+    assert collect(db, dict(next=Z)) == [{Z: [2, 1]}]
+
+
+def test_expression_error():
+    with pytest.raises(KeyError):
+        collect([Rule(dict(a=X), Assert(lambda Y: Y))], dict(a=1))
+
+
+@pytest.mark.parametrize(
+    "options, message",
+    [
+        (dict(concurrency=0), "concurrency must be positive, not 0"),
+        (dict(yield_every=0), "yield_every must be positive, not 0"),
+        (dict(yield_every=-1), "yield_every must be positive, not -1"),
+    ],
+)
+def test_invalid_options(options, message):
+    with pytest.raises(ValueError) as error:
+        collect(family, dict(ancestor=P, descendant=Z), **options)
+    assert str(error.value) == message
@@ -0,0 +1,144 @@
+import pytest
+
+from inference_logic import Rule, Variable, search
+from inference_logic.bottom_up import Model, evaluate_fixpoint, instantiate, match
+from inference_logic.data_structures import Assert, construct
+
+X, Y, Z, C, P = Variable.factory("X", "Y", "Z", "C", "P")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="A", child="O"),
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+graph = [
+    dict(edge=1, to=2),
+    dict(edge=2, to=3),
+    dict(edge=3, to=1),
+    dict(edge=3, to=4),
+    Rule(dict(path=X, to=Z), dict(path=X, to=Y), dict(edge=Y, to=Z)),
+    Rule(dict(path=X, to=Z), dict(edge=X, to=Z)),
+]
+
+
+def as_set(solutions):
+    return {repr(sorted(solution.items(), key=repr)) for solution in solutions}
+
+
+def test_search_bottom_up():
+    query = dict(ancestor=P, descendant=C)
+    assert as_set(search(family, query, engine="bottom_up")) == as_set(
+        search(family, query)
+    )
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (dict(path=1, to=C), [{C: 1}, {C: 2}, {C: 3}, {C: 4}]),
+        (dict(path=4, to=C), []),
+        (dict(path=P, to=1), [{P: 1}, {P: 2}, {P: 3}]),
+        (dict(path=2, to=4), [{}]),
+    ],
+)
+def test_recursion(query, expected):
+    assert as_set(search(graph, query, engine="bottom_up")) == as_set(expected)
+
+
+def test_evaluate_fixpoint():
+    model = evaluate_fixpoint(graph)
+    assert len(model) == 4 + 3 * 4
+    assert construct(dict(path=3, to=4)) in model
+    assert construct(dict(path=4, to=3)) not in model
+    assert set(model) >= {construct(fact) for fact in graph[:4]}
+
+
+def test_structures():
+    db = [
+        dict(pair=[1, dict(a=2)]),
+        dict(pair=[3, dict(a=3)]),
+        Rule(dict(first=X, second=Y), dict(pair=[X, dict(a=Y)])),
+        Rule(dict(same=X), dict(first=X, second=X)),
+    ]
+    assert as_set(search(db, dict(first=P, second=C), engine="bottom_up")) == as_set(
+        [{P: 1, C: 2}, {P: 3, C: 3}]
+    )
+    assert list(search(db, dict(same=P), engine="bottom_up")) == [{P: 3}]
+
+
+@pytest.mark.parametrize(
+    "pattern, fact, bindings, expected",
+    [
+        (X, 1, {}, {X: 1}),
+        (X, 1, {X: 1}, {X: 1}),
+        (X, 1, {X: True}, {X: True}),
+        (X, 1, {X: "1"}, None),
+        (X, construct([1]), {X: 1}, None),
+        (X, 1, {X: construct([1])}, None),
+        (X, construct([1]), {X: construct([1])}, {X: construct([1])}),
+        (dict(a=X), dict(a=1), {}, {X: 1}),
+        (dict(a=X), dict(b=1), {}, None),
+        (dict(a=X), 1, {}, None),
+        (dict(a=1, b=X), dict(a=2, b=1), {}, None),
+        ([X, *Y], [1, 2, 3], {}, {X: 1, Y: construct([2, 3])}),
+        ([X, Y], [1], {}, None),
+        ([X], 1, {}, None),
+        ([], [], {}, {}),
+        ([], [1], {}, None),
+        ([2, X], [1, 2], {}, None),
+    ],
+)
+def test_match(pattern, fact, bindings, expected):
+    assert match(construct(pattern), construct(fact), bindings) == expected
+
+
+def test_instantiate():
+    term = construct(dict(a=X, b=[Y, *Z], c=True))
+    bindings = {X: 1, Y: 2, Z: construct([3])}
+    assert instantiate(term, bindings) == construct(dict(a=1, b=[2, 3], c=True))
+
+
+def test_model():
+    model = Model([dict(a=1, b=[1]), dict(a=2, b=[2])])
+    assert list(model.query(dict(a=1, b=C))) == [{C: [1]}]
+    assert model.add(construct(dict(a=3, b=3)), 1)
+    assert not model.add(construct(dict(a=3, b=3)), 2)
+    assert list(model.query(dict(a=P, b=3))) == [{P: 3}]
+    assert list(model.lookup(construct(dict(a=3, b=C)), {})) == [
+        (construct(dict(a=3, b=3)), 1)
+    ]
+    assert len(model) == 3
+
+
+@pytest.mark.parametrize(
+    "clause, message",
+    [
+        (
+            Rule(dict(a=X), Assert(lambda X: X)),
+            "{'a': X} ¬ <inference_logic.data_structures.Assert object",
+        ),
+        (
+            Rule([1]),  # type: ignore
+            "[1]. cannot be evaluated bottom up: only dicts are supported",
+        ),
+        (
+            dict(a=X),
+            "{'a': X}. cannot be evaluated bottom up: facts must be ground",
+        ),
+        (
+            Rule(dict(a=X, b=Y), dict(a=X)),
+            "{'a': X, 'b': Y} ¬ {'a': X}. cannot be evaluated bottom up: "
+            "every Variable in the head must appear in the body",
+        ),
+    ],
+)
+def test_evaluate_fixpoint_fail(clause, message):
+    with pytest.raises(ValueError) as error:
+        evaluate_fixpoint([clause])
+    assert str(error.value).startswith(message)
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from inference_logic import Budget, BudgetExceededError, Rule, Variable, search
+
+X, Y = Variable.factory("X", "Y")
+
+loop = [Rule(dict(loop=X), dict(loop=X))]
+
+# the recursive clause comes first, so that each level leaves a choice point
+naturals = [Rule(dict(nat=[X]), dict(nat=X)), dict(nat=0), dict(nat="end")]
+
+wide = [Rule(dict(n=i), dict(m=i)) for i in range(100)] + [dict(m=1)]
+
+ENGINES = ["top_down", "trail"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize(
+    "db, query, budget, limit",
+    [
+        (loop, dict(loop=1), Budget(steps=1000), "steps"),
+        (loop, dict(loop=1), Budget(depth=100), "depth"),
+        (loop, dict(loop=1), Budget(seconds=0.05), "seconds"),
+    ],
+)
+def test_raises(engine, db, query, budget, limit):
+    with pytest.raises(BudgetExceededError) as error:
+        list(search(db, query, engine=engine, budget=budget))
+    assert error.value.limit == limit
+    assert budget.exceeded == limit
+    assert str(error.value).startswith("search exceeded its budget of")
+
+
+@pytest.mark.parametrize(
+    "engine, db, query",
+    [("top_down", wide, dict(n=X)), ("trail", naturals, dict(nat=X))],
+)
+def test_stack(engine, db, query):
+    budget = Budget(stack=50, truncate=True)
+    list(search(db, query, engine=engine, budget=budget))
+    assert budget.exceeded == "stack"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_truncate(engine):
+    budget = Budget(depth=3, truncate=True)
+    db = [dict(nat=0), Rule(dict(nat=[X]), dict(nat=X))]
+    solutions = list(search(db, dict(nat=Y), engine=engine, budget=budget))
+    assert budget.exceeded == "depth"
+    assert {Y: [[0]]} in solutions and {Y: [[[[0]]]]} not in solutions
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_within_budget(engine):
+    budget = Budget(steps=100, depth=10, seconds=10, stack=10)
+    assert list(search(wide, dict(n=1), engine=engine, budget=budget)) == [{}]
+    assert budget.exceeded is None
+    assert 0 < budget.used <= 100
+
+
+def test_restarts():
+    budget = Budget(seconds=0.01, truncate=True)
+    list(search(loop, dict(loop=1), budget=budget))
+    time.sleep(0.02)
+    assert budget.exceeded == "seconds"
+    assert list(search(wide, dict(n=1), budget=budget)) == [{}]
+    assert budget.exceeded is None
@@ -0,0 +1,134 @@
+import pytest
+
+from inference_logic import KnowledgeBase, QueryCache, Rule, Variable, search
+
+X, Y, Z, P, C = Variable.factory("X", "Y", "Z", "P", "C")
+
+family = [
+    dict(parent="A", child="B"),
+    dict(parent="B", child="C"),
+    dict(parent="C", child="D"),
+    Rule(dict(ancestor=X, descendant=Y), dict(parent=X, child=Y)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+
+def pairs(solutions, first, second):
+    return sorted((solution[first], solution[second]) for solution in solutions)
+
+
+@pytest.mark.parametrize("engine", ["top_down", "tabled", "trail", "parallel"])
+def test_variants_share_an_entry(engine):
+    cache = QueryCache(family)
+    first = list(cache.search(dict(ancestor=P, descendant=C), engine=engine))
+    second = list(cache.search(dict(descendant=Y, ancestor=X), engine=engine))
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert pairs(first, P, C) == pairs(second, X, Y)
+    assert pairs(first, P, C) == pairs(
+        search(family, dict(ancestor=X, descendant=Y), engine=engine), X, Y
+    )
+    assert [list(solution) for solution in second] == [[Y, X]] * len(second)
+
+
+@pytest.mark.parametrize(
+    "first, second, shared",
+    [
+        (dict(ancestor=X, descendant=Y), dict(ancestor=Y, descendant=X), True),
+        (dict(ancestor=X, descendant=Y), dict(ancestor=X, descendant=X), False),
+        (dict(ancestor="A", descendant=Y), dict(ancestor="B", descendant=Y), False),
+        (dict(a=[X, *Y]), dict(a=[Z, *X]), True),
+        (dict(a=[X, *Y]), dict(a=[X, Y]), False),
+    ],
+)
+def test_keys(first, second, shared):
+    cache = QueryCache([dict(a=[1, 2]), dict(a=[3, 3])])
+    list(cache.search(first))
+    list(cache.search(second))
+    assert cache.hits == int(shared)
+
+
+def test_engines_do_not_share():
+    cache = QueryCache(family)
+    list(cache.search(dict(parent=X, child=Y)))
+    list(cache.search(dict(parent=X, child=Y), engine="trail"))
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_unbound_variables():
+    cache = QueryCache([dict(a=1, b=X)])
+    for variable in (Y, Z):
+        assert list(cache.search(dict(a=variable, b=P), engine="tabled")) == []
+    assert cache.hits == 1
+
+
+def test_copies():
+    cache = QueryCache([dict(a=dict(b=[1, 2]))])
+    list(cache.search(dict(a=X)))
+    for _ in range(2):
+        solution = next(cache.search(dict(a=X)))
+        assert solution == {X: {"b": [1, 2]}}
+        solution[X]["b"].append(3)
+
+
+def test_partial_search_is_not_stored():
+    cache = QueryCache(family)
+    next(cache.search(dict(parent=X, child=Y)))
+    list(cache.search(dict(parent=X, child=Y)))
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 1)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda kb: kb.assert_fact(dict(parent="D", child="E")),
+        lambda kb: kb.retract_fact(dict(parent="C", child="D")),
+        lambda kb: kb.add_rule(Rule(dict(parent=X, child=Y), dict(mother=X, child=Y))),
+    ],
+)
+def test_invalidation(change):
+    kb = KnowledgeBase(family)
+    cache = QueryCache(kb)
+    query = dict(ancestor=X, descendant=Y)
+    list(cache.search(query))
+    change(kb)
+    assert pairs(cache.search(query), X, Y) == pairs(search(kb, query), X, Y)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 1)
+
+
+def test_change_during_search_is_not_stored():
+    kb = KnowledgeBase(family)
+    cache = QueryCache(kb)
+    for _ in cache.search(dict(parent=X, child=Y)):
+        kb.assert_fact(dict(parent="E", child="F"))
+    assert len(cache) == 0
+
+
+def test_maxsize():
+    cache = QueryCache(family, maxsize=2)
+    for parent in ["A", "B", "A", "C", "A", "B"]:
+        list(cache.search(dict(parent=parent, child=Y)))
+    # B is evicted by C, as A was used more recently
+    assert (cache.hits, cache.misses, len(cache)) == (2, 4, 2)
+
+
+def test_maxbytes():
+    cache = QueryCache(family, maxbytes=None)
+    list(cache.search(dict(ancestor="A", descendant=Y)))
+    size = cache.bytes
+    assert size > 0
+
+    cache = QueryCache(family, maxbytes=size)
+    list(cache.search(dict(ancestor="A", descendant=Y)))
+    list(cache.search(dict(parent="A", child=Y)))
+    assert len(cache) == 1 and cache.bytes < size
+
+    cache = QueryCache(family, maxbytes=size - 1)
+    list(cache.search(dict(ancestor="A", descendant=Y)))
+    assert len(cache) == cache.bytes == 0
+
+    cache.clear()
+    assert len(cache) == cache.bytes == 0
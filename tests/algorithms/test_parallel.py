@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import pickle
+import queue
+import time
+from itertools import islice
+
+import pytest
+
+from inference_logic import KnowledgeBase, Rule, Variable, search
+from inference_logic.data_structures import Assert, Assign, construct
+from inference_logic.parallel import Branch, _work, expand
+
+X, Y, Z, C, P, N, M, L = Variable.factory("X", "Y", "Z", "C", "P", "N", "M", "L")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="G", child="B"),
+    dict(parent="A", child="O"),
+    dict(parent="B", child="R"),
+    dict(parent="O", child="S"),
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+primes = [
+    dict(is_prime=2),
+    Rule(
+        dict(is_prime=P),
+        Assert(lambda P: P > 2),
+        Assign(N, lambda P: P % 2),
+        dict(odd=N),
+    ),
+    dict(odd=1),
+    *(dict(number=i) for i in range(2, 30)),
+    Rule(dict(prime=P), dict(number=P), dict(is_prime=P)),
+]
+
+
+@pytest.mark.parametrize(
+    "db, query",
+    [
+        (family, dict(ancestor=P, descendant=C)),
+        (family, dict(ancestor="G", descendant=C)),
+        (family, dict(ancestor="S", descendant=C)),
+        (primes, dict(prime=P)),
+        ([dict(a=1, b=X), dict(a=2, b=2)], dict(a=P, b=Y)),
+    ],
+)
+@pytest.mark.parametrize("workers, granularity", [(1, 100), (2, 1), (3, 2)])
+def test_same_as_trail(db, query, workers, granularity):
+    expected = list(search(db, query, engine="trail"))
+    assert expected == list(
+        search(db, query, engine="parallel", workers=workers, granularity=granularity)
+    )
+
+
+def test_without_fork(monkeypatch):
+    monkeypatch.setattr(
+        "multiprocessing.get_all_start_methods", lambda: ["spawn"],
+    )
+    expected = list(search(primes, dict(prime=P), engine="trail"))
+    assert list(search(primes, dict(prime=P), engine="parallel", workers=2)) == expected
+
+
+def test_stop_early():
+    solutions = search(family, dict(ancestor=P, descendant=C), engine="parallel")
+    assert next(solutions) == {P: "G", C: "A"}
+    solutions.close()
+
+
+def test_endless_solutions():
+    naturals = [dict(nat=0), Rule(dict(nat=[X]), dict(nat=X))]
+    expected = list(islice(search(naturals, dict(nat=P), engine="trail"), 200))
+    solutions = search(
+        naturals, dict(nat=P), engine="parallel", workers=2, granularity=1
+    )
+    assert list(islice(solutions, 200)) == expected
+    start = time.perf_counter()
+    solutions.close()
+    assert time.perf_counter() - start < 2
+    assert multiprocessing.active_children() == []
+
+
+def test_expression_error():
+    db = primes + [Rule(dict(fails=P), dict(number=P), Assert(lambda P: 1 / (P - 20)))]
+    with pytest.raises(ZeroDivisionError):
+        list(search(db, dict(fails=P), engine="parallel", workers=2))
+
+
+def test_worker_exits():
+    parent = os.getpid()
+
+    def check(P):
+        if os.getpid() != parent and P == 20:
+            time.sleep(0.2)
+            os._exit(3)
+        return True
+
+    db = primes + [Rule(dict(exits=P), dict(number=P), Assert(check))]
+    with pytest.raises(RuntimeError) as error:
+        list(search(db, dict(exits=P), engine="parallel", workers=2))
+    assert str(error.value) == "a worker exited with code 3"
+
+
+def test_expand():
+    kb = KnowledgeBase(primes)
+    query = construct(dict(prime=P))
+    branches = expand(kb, Branch((query,), (), 0), {P})
+    assert len(branches) == 28
+    two, two_is_odd = expand(kb, branches[0], {P})
+    assert expand(kb, two, {P}) == [{P: 2}]
+    assert expand(kb, two_is_odd, {P}) == []
+    assert expand(kb, branches[2], {P}) == []
+
+
+def test_branches_pickle():
+    kb = KnowledgeBase(primes)
+    branches = expand(kb, Branch((construct(dict(prime=P)),), (), 0), {P})
+    branch = expand(kb, branches[1], {P})[0]
+    assert pickle.loads(pickle.dumps(branch)) == branch
+
+    output: queue.Queue = queue.Queue()
+    _work(kb, [[pickle.loads(pickle.dumps(branch)), {P: 5}], []], {P}, output)
+    assert list(output.queue) == [[{P: 3}, {P: 5}], None, [], None]
+
+
+def test_work_in_batches(monkeypatch):
+    monkeypatch.setattr("inference_logic.parallel.BATCH_SIZE", 2)
+    output: queue.Queue = queue.Queue()
+    _work(KnowledgeBase([]), [[{P: 1}, {P: 2}, {P: 3}]], {P}, output)
+    assert list(output.queue) == [[{P: 1}, {P: 2}], [{P: 3}], None]
+
+
+def test_work_error():
+    kb = KnowledgeBase([Rule(dict(a=X), Assert(lambda Y: Y))])
+    output: queue.Queue = queue.Queue()
+    _work(kb, [[{P: 1}, Branch((construct(dict(a=1)),), (), 0)]], {P}, output)
+    found, error = output.queue
+    assert found == [{P: 1}]
+    assert isinstance(error, KeyError)
@@ -0,0 +1,92 @@
+import pytest
+
+from inference_logic import KnowledgeBase, Rule, Statistics, Variable, search
+from inference_logic.data_structures import Assert, Assign
+
+X, Y, Z, P, C, N, M = Variable.factory("X", "Y", "Z", "P", "C", "N", "M")
+
+family = KnowledgeBase(
+    [
+        dict(parent="G", child="A"),
+        dict(parent="A", child="O"),
+        Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+        Rule(
+            dict(ancestor=X, descendant=Z),
+            dict(parent=X, child=Y),
+            dict(ancestor=Y, descendant=Z),
+        ),
+    ]
+)
+
+countdown = KnowledgeBase(
+    [
+        dict(count=0),
+        Rule(
+            dict(count=N),
+            Assert(lambda N: N > 0),
+            Assign(M, lambda N: N - 1),
+            dict(count=M),
+        ),
+    ]
+)
+
+ENGINES = ["top_down", "trail"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_family(engine):
+    statistics = Statistics()
+    solutions = list(
+        search(
+            family,
+            dict(ancestor="G", descendant=C),
+            engine=engine,
+            statistics=statistics,
+        )
+    )
+    assert statistics.solutions == len(solutions) == 2
+    assert statistics.goals >= 3
+    assert statistics.peak_stack >= 1
+    assert set(statistics.attempts) == {0, 1, 2, 3}
+    rows = statistics.clauses(family)
+    assert [row[0].position for row in rows] == sorted(
+        statistics.attempts, key=lambda position: -statistics.seconds[position]
+    )
+    assert all(attempts >= failures for _, attempts, failures, _ in rows)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_failures(engine):
+    statistics = Statistics()
+    query = dict(parent=X, child=X)
+    assert list(search(family, query, engine=engine, statistics=statistics)) == []
+    assert statistics.attempts == statistics.failures == {0: 1, 1: 1}
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_evaluations(engine):
+    statistics = Statistics()
+    assert list(
+        search(countdown, dict(count=3), engine=engine, statistics=statistics)
+    ) == [{}]
+    # Assert and Assign at 3, 2 and 1, and the Assert that fails at 0
+    assert statistics.evaluations == 7
+    assert statistics.evaluation_failures == 1
+
+
+def test_accumulates():
+    statistics = Statistics()
+    for _ in range(2):
+        list(search(countdown, dict(count=1), statistics=statistics))
+    assert statistics.solutions == 2
+    assert repr(statistics).startswith("Statistics(goals=")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_solution_after_evaluation(engine):
+    statistics = Statistics()
+    db = [Rule(dict(positive=N), Assert(lambda N: N > 0))]
+    assert list(search(db, dict(positive=3), engine=engine, statistics=statistics)) == [
+        {}
+    ]
+    assert (statistics.solutions, statistics.evaluations) == (1, 1)
@@ -0,0 +1,100 @@
+import pytest
+
+from inference_logic import Budget, BudgetExceededError, Rule, Variable, search
+from inference_logic.strategies import (
+    BestFirst,
+    BreadthFirst,
+    DepthFirst,
+    IterativeDeepening,
+    get_strategy,
+)
+
+X, Y, Z, P, C = Variable.factory("X", "Y", "Z", "P", "C")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="G", child="B"),
+    dict(parent="A", child="O"),
+    dict(parent="O", child="S"),
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+# depth first tries the recursive clause, which never ends, before the base
+descent = [
+    Rule(dict(q=0), dict(base=0)),
+    Rule(dict(q=X), dict(q=[X])),
+    dict(base=0),
+]
+
+naturals = [dict(nat=0), Rule(dict(nat=[X]), dict(nat=X))]
+
+STRATEGIES = [
+    "depth_first",
+    "breadth_first",
+    "iterative_deepening",
+    DepthFirst(),
+    BreadthFirst(),
+    IterativeDeepening(start=2, step=2),
+    BestFirst(lambda goal, depth: depth),
+    BestFirst(lambda goal, depth: len(goal.body)),
+]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize(
+    "query", [dict(ancestor=P, descendant=C), dict(ancestor="G", descendant="S")]
+)
+def test_same_solutions(strategy, query):
+    expected = list(search(family, query))
+    solutions = list(search(family, query, strategy=strategy))
+    assert sorted(map(repr, solutions)) == sorted(map(repr, expected))
+
+
+def test_depth_first_descends_forever():
+    with pytest.raises(BudgetExceededError):
+        next(search(descent, dict(q=Y), budget=Budget(steps=1000)))
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    ["breadth_first", "iterative_deepening", BestFirst(lambda goal, depth: depth)],
+)
+def test_first_solution(strategy):
+    budget = Budget(steps=1000)
+    assert next(search(descent, dict(q=Y), budget=budget, strategy=strategy)) == {Y: 0}
+
+
+def test_breadth_first_order():
+    solutions = search(naturals, dict(nat=Y), strategy="breadth_first")
+    assert [next(solutions) for _ in range(3)] == [{Y: 0}, {Y: [0]}, {Y: [[0]]}]
+
+
+def test_iterative_deepening_limit():
+    strategy = IterativeDeepening(start=1, step=2, limit=4)
+    solutions = list(search(naturals, dict(nat=Y), strategy=strategy))
+    assert solutions == [{Y: 0}, {Y: [0]}, {Y: [[0]]}, {Y: [[[0]]]}, {Y: [[[[0]]]]}]
+
+
+@pytest.mark.parametrize("step", [0, -1])
+def test_iterative_deepening_step(step):
+    with pytest.raises(ValueError) as error:
+        IterativeDeepening(step=step)
+    assert str(error.value) == f"step must be positive, not {step}"
+
+
+def test_best_first_cost():
+    q_first = BestFirst(lambda goal, depth: 0 if "q" in goal.predicate else 1)
+    solutions = search(descent, dict(q=Y), strategy=q_first, budget=Budget(steps=100))
+    with pytest.raises(BudgetExceededError):
+        next(solutions)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError) as error:
+        get_strategy("sideways")
+    assert str(error.value) == "unknown strategy: sideways"
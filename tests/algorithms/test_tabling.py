@@ -0,0 +1,135 @@
+import pytest
+
+from inference_logic import Rule, Variable, search
+from inference_logic.data_structures import Assert, Assign, construct
+from inference_logic.knowledge_base import KnowledgeBase
+from inference_logic.tabling import Tables
+
+X, Y, Z, C, P = Variable.factory("X", "Y", "Z", "C", "P")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="A", child="O"),
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+left_recursive = [
+    dict(edge=1, to=2),
+    dict(edge=2, to=3),
+    dict(edge=3, to=1),
+    dict(edge=3, to=4),
+    Rule(dict(path=X, to=Z), dict(path=X, to=Y), dict(edge=Y, to=Z)),
+    Rule(dict(path=X, to=Z), dict(edge=X, to=Z)),
+]
+
+
+def as_set(solutions):
+    return {repr(sorted(solution.items(), key=repr)) for solution in solutions}
+
+
+def test_search_tabled():
+    query = dict(ancestor=P, descendant=C)
+    assert as_set(search(family, query, engine="tabled")) == as_set(
+        search(family, query)
+    )
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (dict(path=1, to=C), [{C: 1}, {C: 2}, {C: 3}, {C: 4}]),
+        (dict(path=4, to=C), []),
+        (dict(path=P, to=1), [{P: 1}, {P: 2}, {P: 3}]),
+        (dict(path=2, to=4), [{}]),
+    ],
+)
+def test_left_recursion(query, expected):
+    assert as_set(search(left_recursive, query, engine="tabled")) == as_set(expected)
+
+
+def test_mutual_recursion():
+    db = [
+        dict(even=0),
+        Rule(
+            dict(even=X),
+            Assert(lambda X: 0 < X < 6),
+            Assign(Y, lambda X: X - 1),
+            dict(odd=Y),
+        ),
+        Rule(dict(odd=X), Assign(Y, lambda X: X - 1), dict(even=Y)),
+    ]
+    assert list(search(db, dict(even=4), engine="tabled")) == [{}]
+    assert list(search(db, dict(odd=4), engine="tabled")) == []
+
+
+def test_dependent_call():
+    db = [
+        dict(q=1),
+        Rule(dict(p=X), dict(q=X)),
+        Rule(dict(q=X), dict(p=X)),
+        Rule(dict(r=X), dict(q=X)),
+    ]
+    tables = Tables(KnowledgeBase(db))
+    assert tables.call(construct(dict(p=C))) == [construct(dict(p=1))]
+    assert set(tables.answers) == tables.complete
+    assert list(search(db, dict(r=C), engine="tabled")) == [{C: 1}]
+
+
+def test_lists():
+    H, T, L, R = Variable.factory("H", "T", "L", "R")
+    db = [
+        dict(append=[], to=L, gives=L),
+        Rule(
+            dict(append=[H, *T], to=L, gives=[H, *R]),
+            dict(append=T, to=L, gives=R),
+        ),
+    ]
+    query = dict(append=P, to=C, gives=[1, 2])
+    assert as_set(search(db, query, engine="tabled")) == as_set(
+        [{P: [], C: [1, 2]}, {P: [1], C: [2]}, {P: [1, 2], C: []}]
+    )
+
+
+def test_non_ground_answers():
+    db = [
+        dict(same=X, as_=X),
+        Rule(dict(pair=X, of=Y), dict(same=X, as_=Y)),
+    ]
+    assert list(search(db, dict(pair=1, of=C), engine="tabled")) == [{C: 1}]
+    assert list(search(db, dict(pair=P, of=C), engine="tabled")) == []
+
+
+@pytest.mark.parametrize(
+    "db, query",
+    [
+        ([dict(a=1), dict(a=X)], dict(a=P)),
+        ([dict(a=[1, Y])], dict(a=P)),
+        ([dict(a=X, b=1)], dict(a=P, b=C)),
+        ([dict(a=[1, X])], dict(a=[1, 2])),
+        (family, dict(ancestor=P, descendant=C)),
+    ],
+)
+@pytest.mark.parametrize("engine", ["top_down", "trail"])
+def test_same_as_other_engines(db, query, engine):
+    assert as_set(search(db, query, engine="tabled")) == as_set(
+        search(db, query, engine=engine)
+    )
+
+
+def test_tables_complete():
+    tables = Tables(KnowledgeBase(left_recursive))
+    query = construct(dict(path=1, to=C))
+    assert len(tables.call(query)) == 4
+    assert set(tables.answers) == tables.complete
+    assert len(tables.call(query)) == 4
+
+
+def test_search_unknown_engine():
+    with pytest.raises(ValueError) as error:
+        search(family, dict(ancestor=P, descendant=C), engine="magic")
+    assert str(error.value) == "unknown engine: magic"
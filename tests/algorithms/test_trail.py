@@ -0,0 +1,158 @@
+import time
+
+import pytest
+
+from inference_logic import Budget, Rule, Variable, search
+from inference_logic.data_structures import Assert, Assign, construct
+from inference_logic.trail import Bindings
+
+X, Y, Z, C, P, N, M = Variable.factory("X", "Y", "Z", "C", "P", "N", "M")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="A", child="O"),
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+
+def test_search_trail():
+    assert list(search(family, dict(ancestor=P, descendant=C), engine="trail")) == [
+        {P: "G", C: "A"},
+        {P: "A", C: "O"},
+        {P: "G", C: "O"},
+    ]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (dict(ancestor="G", descendant="O"), [{}]),
+        (dict(ancestor="O", descendant="G"), []),
+        (dict(ancestor="G", descendant=C), [{C: "A"}, {C: "O"}]),
+    ],
+)
+def test_queries(query, expected):
+    assert list(search(family, query, engine="trail")) == expected
+
+
+def test_arithmetic():
+    db = [
+        dict(count=0, total=[]),
+        Rule(
+            dict(count=N, total=[N, *Y]),
+            Assert(lambda N: N > 0),
+            Assign(M, lambda N: N - 1),
+            dict(count=M, total=Y),
+        ),
+    ]
+    assert list(search(db, dict(count=3, total=Z), engine="trail")) == [{Z: [3, 2, 1]}]
+
+
+def test_failing_expression():
+    db = [
+        dict(value=[1]),
+        dict(value=1),
+        Rule(dict(next=Y), dict(value=X), Assign(Y, lambda X: construct([2]) + X)),
+    ]
+    assert list(search(db, dict(next=Z), engine="trail")) == [{Z: [2, 1]}]
+
+
+def test_list_goals():
+    db = [[1, 2], [3, 4], Rule(dict(second=Y), [X, Y])]
+    assert list(search(db, dict(second=Z), engine="trail")) == [{Z: 2}, {Z: 4}]
+
+
+def test_deep_recursion():
+    db = [
+        dict(count=0),
+        Rule(
+            dict(count=N),
+            Assert(lambda N: N > 0),
+            Assign(M, lambda N: N - 1),
+            dict(count=M),
+        ),
+    ]
+    assert list(search(db, dict(count=5000), engine="trail")) == [{}]
+
+
+@pytest.mark.parametrize(
+    "left, right, expected",
+    [
+        (X, 1, True),
+        (1, X, True),
+        (X, X, True),
+        (X, Y, True),
+        (1, 1, True),
+        (1, True, True),
+        (1, "1", False),
+        (dict(a=X), dict(a=1), True),
+        (dict(a=X), dict(b=1), False),
+        (dict(a=X), 1, False),
+        (1, dict(a=X), False),
+        ([X, *Y], [1, 2], True),
+        ([X], 1, False),
+        ([], [], True),
+        ([], [1], False),
+        ([X, X], [1, 2], False),
+    ],
+)
+def test_unify(left, right, expected):
+    assert Bindings().unify(construct(left), construct(right)) is expected
+
+
+def test_undo():
+    bindings = Bindings()
+    bindings.unify(X, Y)
+    mark = bindings.mark()
+    bindings.unify(construct(dict(a=X, b=Z)), construct(dict(a=1, b=[Y])))
+    assert bindings.resolve(construct([X, Y, Z])) == construct([1, 1, [1]])
+    assert bindings.resolve(construct(dict(a=X))) == construct(dict(a=1))
+    bindings.undo(mark)
+    assert bindings.resolve(construct([X, Y, Z])) == construct([Y, Y, Z])
+
+
+def test_evaluate():
+    bindings = Bindings()
+    assert bindings.evaluate(Assign(Y, lambda: 1))
+    assert bindings.evaluate(Assert(lambda Y: Y == 1))
+    assert not bindings.evaluate(Assign(Y, lambda Y: Y + 1))
+    with pytest.raises(KeyError):
+        bindings.evaluate(Assert(lambda X: X))
+
+
+Xs, A = Variable.factory("Xs", "A")
+reverse = [
+    dict(my_rev=[], list_in=Y, list_out=Y),
+    Rule(
+        dict(my_rev=[X, *Xs], list_in=Y, list_out=A),
+        dict(my_rev=Xs, list_in=Y, list_out=[X, *A]),
+    ),
+]
+
+
+def test_long_lists():
+    query = dict(my_rev=list(range(3000)), list_in=Z, list_out=[])
+    assert list(search(reverse, query, engine="trail")) == [
+        {Z: list(range(3000))[::-1]}
+    ]
+
+
+def test_long_lists_scale_linearly():
+    seconds = []
+    for size in (2000, 8000):
+        query = dict(my_rev=list(range(size)), list_in=Z, list_out=[])
+        start = time.perf_counter()
+        list(search(reverse, query, engine="trail"))
+        seconds.append(time.perf_counter() - start)
+    assert seconds[1] / seconds[0] < 8
+
+
+def test_lists_of_100000():
+    query = dict(my_rev=list(range(10 ** 5)), list_in=Z, list_out=[])
+    solutions = search(reverse, query, engine="trail", budget=Budget(seconds=60))
+    assert list(solutions) == [{Z: list(range(10 ** 5))[::-1]}]
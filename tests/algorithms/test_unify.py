@@ -62,3 +62,20 @@ def test_unify_fail(left, right, initial, message):
     with pytest.raises(UnificationError) as error:
         initial.unify(left, right)
     assert str(error.value) == message
+
+
+def test_unify_all():
+    initial = Equality(free=[{A, C}])
+    pairs = [(construct(dict(a=A, b=[B, 2])), construct(dict(a=1, b=[2, B]))), (C, 1)]
+    assert initial.unify_all(pairs) == Equality(fixed={1: {A, C}, 2: {B}})
+    assert initial == Equality(free=[{A, C}])
+    assert initial.unify_all([]) is initial
+    assert initial.unify_all([(A, C), (1, 1)]) is initial
+
+
+def test_unify_all_fail():
+    initial = Equality(free=[{A, C}])
+    with pytest.raises(UnificationError) as error:
+        initial.unify_all([(A, 1), (construct([B, C]), construct([2, 2]))])
+    assert str(error.value) == "C cannot equal 2 because 2 != 1"
+    assert initial == Equality(free=[{A, C}])
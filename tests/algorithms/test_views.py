@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from inference_logic import KnowledgeBase, Rule, Variable, search
+from inference_logic.bottom_up import evaluate_fixpoint
+from inference_logic.views import materialise
+
+X, Y, Z, P, C = Variable.factory("X", "Y", "Z", "P", "C")
+
+ancestor = [
+    Rule(dict(ancestor=X, descendant=Y), dict(parent=X, child=Y)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+query = dict(ancestor=P, descendant=C)
+
+
+def pairs(solutions):
+    return sorted((solution[P], solution[C]) for solution in solutions)
+
+
+def test_lookup():
+    kb = KnowledgeBase([dict(parent="A", child="B"), dict(parent="B", child="C")])
+    for rule in ancestor:
+        kb.add_rule(rule)
+    view = materialise(kb, query)
+    assert all(clause.is_fact for clause in kb)
+    expected = [("A", "B"), ("A", "C"), ("B", "C")]
+    assert pairs(search(kb, query)) == pairs(view.query(query)) == expected
+
+
+def test_incremental():
+    rng = random.Random(0)
+    edges = [(rng.randrange(8), rng.randrange(8)) for _ in range(200)]
+    kb = KnowledgeBase(ancestor)
+    view = materialise(kb, query)
+    facts = []
+    for parent, child in edges:
+        if facts and rng.random() < 0.4:
+            fact = facts.pop(rng.randrange(len(facts)))
+            assert kb.retract_fact(fact)
+        else:
+            fact = dict(parent=parent, child=child)
+            facts.append(fact)
+            kb.assert_fact(fact)
+        model = evaluate_fixpoint(facts + ancestor)
+        assert pairs(search(kb, query)) == pairs(model.query(query))
+        assert sorted(map(repr, view.model)) == sorted(map(repr, model))
+
+
+def test_asserted_view_facts():
+    kb = KnowledgeBase([dict(parent="A", child="B"), *ancestor])
+    view = materialise(kb, query)
+    kb.assert_fact(dict(ancestor="A", descendant="B"))
+    kb.assert_fact(dict(ancestor="B", descendant="Z"))
+    expected = [("A", "B"), ("A", "Z"), ("B", "Z")]
+    assert pairs(search(kb, query)) == expected
+
+    kb.retract_fact(dict(ancestor="A", descendant="B"))
+    assert pairs(search(kb, query)) == expected
+    kb.retract_fact(dict(parent="A", child="B"))
+    kb.retract_fact(dict(ancestor="B", descendant="Z"))
+    assert pairs(search(kb, query)) == []
+    assert len(view.model) == 0
+
+
+def test_duplicates():
+    kb = KnowledgeBase([dict(parent="A", child="B"), *ancestor])
+    materialise(kb, query)
+    kb.assert_fact(dict(parent="A", child="B"))
+    kb.retract_fact(dict(parent="A", child="B"))
+    assert pairs(search(kb, query)) == [("A", "B")]
+
+
+def test_dependencies():
+    kb = KnowledgeBase(
+        [
+            dict(mother="M", child="A"),
+            Rule(dict(parent=X, child=Y), dict(mother=X, child=Y)),
+            *ancestor,
+            Rule(dict(related=X, to=Y), dict(ancestor=X, descendant=Y)),
+        ]
+    )
+    materialise(kb, query)
+    related = materialise(kb, dict(related=X, to=Y))
+    kb.assert_fact(dict(mother="A", child="B"))
+    assert pairs(search(kb, query)) == [("A", "B"), ("M", "A"), ("M", "B")]
+    assert sorted(s[Y] for s in search(kb, dict(related="M", to=Y))) == ["A", "B"]
+    assert sorted(s[Y] for s in related.query(dict(related="M", to=Y))) == ["A", "B"]
+    assert list(search(kb, dict(parent="A", child=Y))) == [{Y: "B"}]
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda kb: kb.add_rule(Rule(dict(parent=X, child=Y), dict(father=X, child=Y))),
+        lambda kb: kb.add_rule(ancestor[0]),
+        lambda kb: kb.retract(next(clause for clause in kb if not clause.is_fact)),
+    ],
+)
+def test_frozen_rules(change):
+    kb = KnowledgeBase(
+        [Rule(dict(parent=X, child=Y), dict(mother=X, child=Y)), *ancestor]
+    )
+    materialise(kb, query)
+    with pytest.raises(ValueError) as error:
+        change(kb)
+    assert str(error.value).endswith("cannot change, a view is materialised from it")
+
+
+def test_derived_facts_cannot_be_retracted():
+    kb = KnowledgeBase([dict(parent="A", child="B"), *ancestor])
+    materialise(kb, query)
+    with pytest.raises(ValueError) as error:
+        kb.retract_fact(dict(ancestor="A", descendant="B"))
+    assert str(error.value).endswith("cannot be retracted, a view derives it")
+    assert pairs(search(kb, query)) == [("A", "B")]
+
+    assert kb.retract_fact(dict(parent="A", child="B"))
+    assert pairs(search(kb, query)) == []
+
+
+@pytest.mark.parametrize(
+    "db, head, error, message",
+    [
+        (ancestor, [X], TypeError, "[X] must be a dict"),
+        (ancestor, dict(parent=X, child=Y), ValueError, "no Rules define"),
+        (
+            [dict(parent=X, child="A"), *ancestor],
+            query,
+            ValueError,
+            "facts must be ground",
+        ),
+    ],
+)
+def test_errors(db, head, error, message):
+    with pytest.raises(error) as raised:
+        materialise(KnowledgeBase(db), head)
+    assert message in str(raised.value)
@@ -1,3 +1,7 @@
+import pickle
+from collections import OrderedDict
+from collections.abc import Mapping
+
 import pytest
 
 from inference_logic import Variable
@@ -68,3 +72,43 @@ def test_get_variables():
 @pytest.mark.parametrize("term", [None, 1, [2, 3, 4], {"a": False}, [{"hello": None}]])
 def test_construct(term):
     assert deconstruct(construct(term)) == term
+
+
+class Ordered(OrderedDict):
+    pass
+
+
+def test_construct_subclass():
+    term = construct(Ordered(a=[1, True]))
+    assert isinstance(term, ImmutableDict)
+    assert deconstruct(term) == {"a": [1, True]}
+
+
+def test_construct_fail():
+    with pytest.raises(TypeError) as error:
+        construct(object)
+    assert str(error.value) == f"{object} is not json serializable"
+
+
+def test_interned():
+    A = Variable("A")
+    assert ImmutableDict(a=1, b=[A]) is ImmutableDict({"a": 1, "b": (A,)})
+    assert ImmutableDict(a=1) is not ImmutableDict(a=True)
+    assert ImmutableDict(a=1) != ImmutableDict(a=True)
+    assert ImmutableDict(a=1, b=2) is not ImmutableDict(b=2, a=1)
+    assert ImmutableDict(a=A) is not ImmutableDict(a=Variable("A", frame=1))
+
+
+def test_pickle():
+    term = ImmutableDict(a=1, b=[2, dict(c=None)])
+    assert pickle.loads(pickle.dumps(term)) is term
+
+
+def test_mapping():
+    im = ImmutableDict(a=1, b=2)
+    assert isinstance(im, Mapping)
+    assert "a" in im and "c" not in im
+    assert list(im) == ["a", "b"] and len(im) == 2
+    assert im.get("b") == 2 and im.get("c") is None
+    assert dict(im) == {"a": 1, "b": 2}
+    assert not hasattr(im, "__dict__")
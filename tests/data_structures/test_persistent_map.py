@@ -0,0 +1,73 @@
+import pytest
+
+from inference_logic import Variable
+from inference_logic.data_structures import PersistentMap, construct
+
+
+def test_set_get():
+    a = PersistentMap()
+    b = a.set("x", 1)
+    c = b.set("x", 2)
+    assert (len(a), len(b), len(c)) == (0, 1, 1)
+    assert (a.get("x"), b.get("x"), c.get("x")) == (None, 1, 2)
+    assert a.get("x", 3) == 3
+
+
+def test_many():
+    maps, expected = [PersistentMap()], [{}]
+    for i in range(1000):
+        maps.append(maps[-1].set(str(i), i))
+        expected.append({**expected[-1], str(i): i})
+    for persistent_map, values in list(zip(maps, expected))[::50]:
+        assert len(persistent_map) == len(values)
+        assert dict(persistent_map.items()) == values
+        assert set(persistent_map) == set(values)
+        assert "1000" not in persistent_map
+        assert all(persistent_map.get(key) == value for key, value in values.items())
+
+
+def test_collisions():
+    # hash(-1) == hash(-2) so these can only be told apart by equality
+    persistent_map = PersistentMap().set(-1, "a").set(-2, "b").set(-1, "c")
+    assert len(persistent_map) == 2
+    assert (persistent_map.get(-1), persistent_map.get(-2)) == ("c", "b")
+    assert persistent_map.get(-3) is None
+    assert -2 in persistent_map
+    assert dict(persistent_map.items()) == {-1: "c", -2: "b"}
+
+
+class Colliding:
+    def __hash__(self):
+        return hash(-1)
+
+
+def test_collisions_missing():
+    persistent_map = PersistentMap().set(-1, "a").set(-2, "b")
+    assert persistent_map.get(Colliding()) is None
+
+
+@pytest.mark.parametrize(
+    "key, other",
+    [
+        (Variable("A"), construct([1])),
+        (construct(dict(a=1)), 1),
+        (Variable("A"), Variable("A").id),
+    ],
+)
+def test_mixed_keys(key, other):
+    persistent_map = PersistentMap().set(key, 1).set(other, 2)
+    assert (persistent_map.get(key), persistent_map.get(other)) == (1, 2)
+    assert persistent_map.get("missing") is None
+
+
+def test_update():
+    base = PersistentMap().update((str(i), i) for i in range(100))
+    updated = base.update([(str(i), -i) for i in range(50, 150)] + [(-1, 0), (-2, 0)])
+    assert dict(base.items()) == {str(i): i for i in range(100)}
+    assert dict(updated.items()) == {
+        **{str(i): i for i in range(50)},
+        **{str(i): -i for i in range(50, 150)},
+        -1: 0,
+        -2: 0,
+    }
+    assert len(updated) == 152
@@ -1,10 +1,22 @@
+import gc
+import pickle
+
 import pytest
 
+from inference_logic import Variable
 from inference_logic.data_structures import (
+    _INTERNED,
     PrologList,
     PrologListNull,
     UnificationError,
+    canonical,
     construct,
+    deconstruct,
+    from_spine,
+    get_variables,
+    new_frame,
+    spine,
+    standardise,
 )
 
 
@@ -58,3 +70,62 @@ def test_list__iter__():
 def test_list_null_in():
     a = construct([])
     assert 1 not in a
+
+
+def test_interned():
+    assert construct([1, [2, 3]]) is construct((1, (2, 3)))
+    assert construct([1, 2]).tail is construct([2])
+    assert PrologListNull() is PrologListNull()
+    assert construct([1]) is not construct([True])
+    assert construct([1]) is not construct([1.0])
+    assert construct([1]) != construct([True])
+
+
+def test_interned_many():
+    X = Variable("X")
+    starred, plain = construct([1, *X]), PrologList(1, X)
+    assert starred is not plain
+    assert starred.tail.many and not plain.tail.many
+
+
+def test_interned_collected():
+    term = construct([object.__name__, "collected"])
+    key = id(term)
+    del term
+    gc.collect()
+    assert all(id(value) != key for value in _INTERNED.values())
+
+
+@pytest.mark.parametrize("term", [[], [1, [2, 3]], [1, dict(a=[True])]])
+def test_pickle(term):
+    term = construct(term)
+    assert pickle.loads(pickle.dumps(term)) is term
+
+
+LONG = 10 ** 4
+
+
+def test_long_lists():
+    X = Variable("X")
+    closed, opened = construct(list(range(LONG))), construct([*range(LONG), *X])
+    assert len(closed) == LONG
+    assert deconstruct(closed) == list(range(LONG))
+    assert deconstruct(opened) == [*range(LONG), *X]
+    assert repr(opened).endswith(f"{LONG - 1}, ]")
+    assert list(opened)[-2:] == [LONG - 1, X]
+    assert get_variables(construct(dict(a=opened))) == {X}
+    assert canonical(opened) != canonical(closed)
+    assert spine(standardise(opened))[0] == list(range(LONG))
+    assert spine(new_frame(opened, 1))[1] == Variable("X", frame=1, many=True)
+
+
+def test_len_open():
+    X = Variable("X")
+    assert len(PrologListNull()) == 0
+    with pytest.raises(TypeError):
+        len(construct([1, *X]))
+
+
+@pytest.mark.parametrize("items, end", [([], PrologListNull()), ([1, 2], "end")])
+def test_spine(items, end):
+    assert spine(from_spine(items, end)) == (items, end)
@@ -1,6 +1,8 @@
 import pytest
 
-from inference_logic import Rule
+from inference_logic import Rule, Variable
+from inference_logic.data_structures import Assert, Assign, PrologListNull, construct
+from inference_logic.equality import Equality
 
 
 @pytest.mark.parametrize(
@@ -26,3 +28,19 @@ def test__eq__fail():
     with pytest.raises(TypeError) as error:
         Rule(dict()) == 1
     assert str(error.value) == "1 must be a Rule"
+
+
+@pytest.mark.parametrize(
+    "term",
+    [
+        Rule(dict(a=1), dict(b=2)),
+        Assign(Variable("X"), lambda: 1),
+        Assert(lambda: True),
+        Variable("X"),
+        PrologListNull(),
+        construct([1, 2]),
+        Equality(),
+    ],
+)
+def test_slots(term):
+    assert not hasattr(term, "__dict__")
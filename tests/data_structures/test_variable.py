@@ -1,3 +1,6 @@
+import gc
+import pickle
+
 import pytest
 
 from inference_logic import Variable
@@ -30,3 +33,28 @@ def test__eq__():
 
 def test_new_frame():
     assert new_frame(Variable("A", 3), 4) == Variable("A", 4)
+
+
+def test_hash_set():
+    A, B = Variable.factory("A", "B")
+    assert Variable.hash_set({A, B}) == Variable.hash_set({B, A})
+
+
+def test_interned():
+    A = Variable("A", 1)
+    assert Variable("A", 1) is A
+    assert Variable("A", 1, many=True) is not A
+    assert Variable("A", 1, many=True) == A
+    assert Variable("A", 2) != A and Variable("A", 2).id != A.id
+    assert isinstance(hash(A), int) and hash(A) == A.id
+
+
+def test_many_keeps_its_twin():
+    many = Variable("B", 7, many=True)
+    gc.collect()
+    assert Variable("B", 7).id == many.id
+
+
+def test_pickle():
+    for variable in (Variable("A"), Variable("A", 3, many=True)):
+        assert pickle.loads(pickle.dumps(variable)) is variable
@@ -756,7 +756,8 @@ def test_20():
     assert list(search(db, query)) == [{Q: "b", R: ["a", "c", "d"]}]
 
 
-def test_21():
+@pytest.mark.parametrize("engine", ["top_down", "tabled", "trail"])
+def test_21(engine):
     """
     P21 (*): Insert an element at a given position into a list
     The first element in the list is number 1.
@@ -784,7 +785,7 @@ def test_21():
         dict(item=X, list=R, position=K, result=L),
     ]
     query = dict(item="alfa", result=["a", "b", "c", "d"], position=2, list=Q)
-    assert list(search(db_20 + db_21, query)) == [
+    assert list(search(db_20 + db_21, query, engine=engine)) == [
         {Q: ["a", "alfa", "b", "c", "d"]},
     ]
 
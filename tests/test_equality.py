@@ -1,7 +1,13 @@
 import pytest
 
-from inference_logic import Variable
-from inference_logic.data_structures import ImmutableDict, UnificationError, construct
+from inference_logic import Variable, search
+from inference_logic.data_structures import (
+    ImmutableDict,
+    PrologList,
+    UnificationError,
+    construct,
+    deconstruct,
+)
 from inference_logic.equality import Equality
 
 A, B, C, D = Variable.factory("A", "B", "C", "D")
@@ -170,3 +176,71 @@ def test_recursions_error():
     with pytest.raises(RecursionError) as error:
         equality.get_deep(a)
     assert str(error.value).startswith("maximum recursion depth exceeded")
+
+
+@pytest.mark.parametrize("method", ["get_deep", "substitute"])
+def test_cyclic_list_recursion_error(method):
+    a = construct([1, *B])
+    equality = Equality(fixed={a: {B}})
+    with pytest.raises(RecursionError) as error:
+        getattr(equality, method)(a)
+    assert str(error.value).startswith("maximum recursion depth exceeded")
+
+
+@pytest.mark.parametrize("engine", ["top_down", "tabled", "trail"])
+def test_cyclic_list_search(engine):
+    P = Variable("P")
+    with pytest.raises(RecursionError):
+        list(search([dict(a=[1, *A], b=A)], dict(a=P, b=P), engine=engine))
+
+
+def test_persistence():
+    initial = Equality(free=[{A, B}])
+    fixed = initial.add(A, 1)
+    joined = fixed.add(C, D)
+    assert initial == Equality(free=[{A, B}])
+    assert fixed == Equality(fixed={1: {A, B}})
+    assert joined == Equality(free=[{C, D}], fixed={1: {A, B}})
+
+
+def test_free_fixed():
+    equality = Equality(free=[{A}, set(), {B, C}], fixed={True: {D}})
+    assert equality.free == [{A}, {B, C}]
+    assert equality.fixed == {True: {D}}
+
+
+def test_add_same_constant():
+    equality = Equality(fixed={1: {A}}).add(B, 1)
+    assert equality == Equality(fixed={1: {A, B}})
+    assert equality.add(A, B) is equality
+
+
+def test_add_many():
+    (many,) = B
+    equality = Equality().add(many, construct([1]))
+    assert repr(equality) == "[1]: {B}"
+    assert equality._get_fixed(B) == construct([1])
+
+
+@pytest.mark.parametrize(
+    "equality, term, expected",
+    [
+        (Equality(), [A, *B], [A, *B]),
+        (Equality(free=[{A, C}]), [C, *B], [A, *B]),
+        (Equality(fixed={construct([2, *C]): {B}}), [A, *B], [A, 2, *C]),
+        (Equality(fixed={construct([2]): {B}, 3: {A}}), [A, *B], [3, 2]),
+        (Equality(fixed={1: {B}}), dict(a=[A, *B]), dict(a=PrologList(A, 1))),
+    ],
+)
+def test_substitute(equality, term, expected):
+    assert equality.substitute(construct(term)) == construct(expected)
+
+
+def test_get_deep_long():
+    equality = Equality()
+    tail = construct([])
+    for i in range(3000):
+        variable = Variable("T", frame=i)
+        equality = equality.add(variable, PrologList(i, tail))
+        tail = variable
+    assert deconstruct(equality.get_deep(tail)) == list(range(3000))[::-1]
@@ -0,0 +1,291 @@
+import pytest
+
+from inference_logic import KnowledgeBase, Rule, Variable
+from inference_logic.algorithms import search
+from inference_logic.data_structures import (
+    Assert,
+    Assign,
+    ImmutableDict,
+    PrologList,
+    construct,
+    new_frame,
+)
+from inference_logic.knowledge_base import Clause
+from inference_logic.trail import Bindings
+
+X, Y, Z, C, P = Variable.factory("X", "Y", "Z", "C", "P")
+
+db = [
+    dict(parent="G", child="A"),
+    dict(parent="A", child="O"),
+    dict(parent=X, child="X"),
+    dict(parent=[1, 2], child="L"),
+    dict(name="A"),
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "goal, expected",
+    [
+        (dict(parent=P, child=C), [0, 1, 2, 3]),
+        (dict(parent="A", child=C), [1, 2]),
+        (dict(parent=P, child="O"), [1]),
+        (dict(parent="A", child="A"), [0]),
+        (dict(parent="O", child="O"), [2]),
+        (dict(parent="O", child="G"), []),
+        (dict(parent=[P], child=C), [2, 3]),
+        (dict(ancestor="A", descendant=C), [5, 6]),
+        (dict(name=True), []),
+        (dict(unknown=P), []),
+    ],
+)
+def test_candidates(goal, expected):
+    kb = KnowledgeBase(db)
+    assert kb.candidates(construct(goal)) == [kb.clauses[i] for i in expected]
+
+
+@pytest.mark.parametrize(
+    "rule, variables, is_ground, is_fact, arity",
+    [
+        (Rule(dict(a=1, b="c")), set(), True, True, 2),
+        (Rule(dict(a=X, b=[Y, *Z])), {X, Y, Z}, False, True, 2),
+        (Rule(dict(a=X), dict(b=Y)), {X, Y}, False, False, 1),
+        (Rule(dict(a=X), Assign(Y, lambda Z: Z + 1)), {X, Y, Z}, False, False, 1),
+        (Rule(dict(a=1), Assert(lambda X: X)), {X}, False, False, 1),
+        (Rule([1, 2]), set(), True, True, None),  # type: ignore
+    ],
+)
+def test_clause(rule, variables, is_ground, is_fact, arity):
+    clause = Clause(rule, 3)
+    assert clause.rule is rule
+    assert clause.position == 3
+    assert clause.variables == variables
+    assert clause.is_ground is is_ground
+    assert clause.is_fact is is_fact
+    assert clause.arity == arity
+    assert repr(clause) == repr(rule)
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        Rule(dict(a=1, b="c")),
+        Rule(dict(a=X, b=[Y, *Z])),
+        Rule(dict(a=X, b=[1, X], c=dict(d=[2])), dict(b=X, c=Y)),
+        Rule(dict(a=[1, *X]), dict(b=1)),
+        Rule(dict(a=X), Assign(Y, lambda X: X + 1), dict(b=Y)),
+        Rule(dict(a=1), Assert(lambda X: X), dict(b=X)),
+        Rule([X, 2]),  # type: ignore
+    ],
+)
+def test_rename(rule):
+    renamed, expected = Clause(rule, 0).rename(7), new_frame(rule, 7)
+    assert renamed.predicate == expected.predicate
+    for term, other in zip(renamed.body, expected.body):
+        if isinstance(term, (Assign, Assert)):
+            assert term.variables == other.variables
+            assert term.frame == other.frame
+        else:
+            assert term == other
+
+
+def test_rename_shares_ground_terms():
+    ground = Rule(dict(a=[1, 2]))
+    assert Clause(ground, 0).rename(1) is ground
+
+    rule = Rule(dict(a=X, b=dict(c=[1, 2])), dict(d=[3]), dict(e=[X, *Y]))
+    renamed = Clause(rule, 0).rename(1)
+    assert renamed.predicate["b"] is rule.predicate["b"]
+    assert renamed.body[0] is rule.body[0]
+    assert renamed.body[1]["e"].tail == new_frame(Y, 1)
+    assert renamed.body[1]["e"].tail.many
+
+
+heads = [
+    Rule(dict(a=X, b=1), dict(c=X)),
+    Rule(dict(a=X, b=X)),
+    Rule(dict(a=[X, *Y], b=Y)),
+    Rule(dict(a=[1, X], b=[])),
+    Rule(dict(a=dict(b=X, c=2), d=[[X]])),
+    Rule(dict(a=1, b=[2, 3])),
+    Rule(dict(a=1, b=2, c=X)),
+    Rule(dict(a=1), dict(b=X)),
+    Rule([X, 1]),  # type: ignore
+]
+
+goals = [
+    dict(a=2, b=1),
+    dict(a=P, b=C),
+    dict(a=[1, 2], b=[2]),
+    dict(a=[1, *P], b=C),
+    dict(a=[P, *C], b=[]),
+    dict(a=[1], b=P),
+    dict(a="x", b=[]),
+    dict(a=dict(b=3, c=2), d=P),
+    dict(a=dict(b=P, c=C), d=[[4]]),
+    dict(a=dict(b=3, d=2), d=P),
+    dict(a=P, d=[[4]]),
+    dict(a=[2, 3], b=[]),
+    dict(a=1, b=[2, 3]),
+    dict(a=1, b=[2, P]),
+    dict(a=1, b=dict(c=1)),
+    dict(a=P, b=P, c=C),
+    dict(a=1),
+    dict(a=P),
+    dict(b=1),
+    [P, C],
+]
+
+
+def variant(left, right, renaming):
+    """whether two terms are the same but for the names of their Variables"""
+    if isinstance(left, Variable) and isinstance(right, Variable):
+        return (
+            renaming.setdefault(("left", left.id), right.id) == right.id
+            and renaming.setdefault(("right", right.id), left.id) == left.id
+        )
+    if type(left) is not type(right):
+        return False
+    if isinstance(left, ImmutableDict):
+        return left.keys() == right.keys() and all(
+            variant(left[key], right[key], renaming) for key in left
+        )
+    if isinstance(left, PrologList):
+        return variant(left.head, right.head, renaming) and variant(
+            left.tail, right.tail, renaming
+        )
+    return left == right
+
+
+@pytest.mark.parametrize("rule", heads)
+@pytest.mark.parametrize("goal", goals)
+def test_unify(rule, goal):
+    goal, clause = construct(goal), Clause(rule, 0)
+    renamed = clause.rename(5)
+    expected, bindings = Bindings(), Bindings()
+    unifies = expected.unify(goal, renamed.predicate)
+    body = clause.unify(bindings, goal, 5)
+    assert (body is not None) is unifies
+    if unifies:
+        assert body == renamed.body
+        renaming: dict = {}
+        for term in (goal, renamed.predicate):
+            assert bindings.resolve(term) == bindings.resolve(goal)
+            assert variant(bindings.resolve(term), expected.resolve(term), renaming)
+
+
+def test_unify_binds_values():
+    bindings = Bindings()
+    bindings.unify(P, construct([1]))
+    clause = Clause(Rule(dict(a=X, b=[Y]), dict(c=X)), 0)
+    assert clause.unify(bindings, construct(dict(a=P, b=C)), 5) is not None
+    assert bindings.values[new_frame(X, 5).id] == construct([1])
+    assert bindings.values[C.id] == construct([new_frame(Y, 5)])
+
+
+def test_candidates_unindexed():
+    kb = KnowledgeBase([dict(a=1), Rule([X]), dict(a=2)])  # type: ignore
+    assert kb.candidates(construct(dict(a=2))) == [kb.clauses[1], kb.clauses[2]]
+    assert kb.candidates(construct([1])) == list(kb)
+
+
+def test_candidates_numbers():
+    kb = KnowledgeBase([dict(a=1), dict(a=True), dict(a=1.0), dict(a="1")])
+    assert kb.candidates(construct(dict(a=1))) == list(kb)[:3]
+
+
+def test__len__iter__():
+    kb = KnowledgeBase(db)
+    assert len(kb) == len(db)
+    assert [clause.rule for clause in kb] == [
+        Rule(clause) if isinstance(clause, dict) else clause for clause in db
+    ]
+    assert [clause.position for clause in kb] == list(range(len(db)))
+
+
+def test_construct_once():
+    kb = KnowledgeBase([dict(a=[1, 2])])
+    [clause] = kb.candidates(construct(dict(a=X)))
+    assert (
+        kb.candidates(construct(dict(a=X)))[0].rule.predicate is clause.rule.predicate
+    )
+
+
+def test_search():
+    family = db[:2] + db[-2:]
+    query = dict(ancestor=P, descendant=C)
+    kb = KnowledgeBase(family)
+    for _ in range(2):
+        assert list(search(kb, query)) == [
+            {P: "G", C: "O"},
+            {P: "G", C: "A"},
+            {P: "A", C: "O"},
+        ]
+
+
+def test_assert_retract():
+    kb = KnowledgeBase(db[:2] + db[-2:])
+
+    def descendants():
+        query = dict(ancestor="G", descendant=C)
+        return sorted(solution[C] for solution in search(kb, query))
+
+    assert descendants() == ["A", "O"]
+
+    clause = kb.assert_fact(dict(parent="O", child="S"))
+    assert clause.position == 4 and kb.clauses[4] is clause
+    assert descendants() == ["A", "O", "S"]
+
+    assert kb.retract_fact(dict(parent="A", child="O"))
+    assert not kb.retract_fact(dict(parent="A", child="O"))
+    assert descendants() == ["A"]
+    assert [clause.position for clause in kb] == [0, 2, 3, 4]
+    assert kb.version == 6
+
+
+def test_add_rule():
+    kb = KnowledgeBase([dict(parent="G", child="A")])
+    kb.add_rule(Rule(dict(grandparent=X, grandchild=Z), dict(parent=X, child=Z)))
+    assert list(search(kb, dict(grandparent=P, grandchild=C))) == [{P: "G", C: "A"}]
+
+
+def test_retract_first():
+    kb = KnowledgeBase()
+    for fact in [dict(a=1), [X, 1], dict(a=1)]:
+        kb.assert_fact(fact)
+    assert kb.retract_fact(dict(a=1))
+    assert [clause.position for clause in kb.candidates(construct(dict(a=1)))] == [
+        1,
+        2,
+    ]
+    assert kb.retract_fact([X, 1])
+    assert kb.retract_fact(dict(a=1))
+    assert len(kb) == 0
+    assert not (kb._facts or kb._unindexed or kb._signatures or kb._values)
+
+
+@pytest.mark.parametrize(
+    "method, clause, message",
+    [
+        (
+            "assert_fact",
+            Rule(dict(a=X), dict(b=X)),
+            "{'a': X} ¬ {'b': X}. must be a fact, use add_rule to add a Rule",
+        ),
+        (
+            "add_rule",
+            dict(a=1),
+            "{'a': 1} must be a Rule, use assert_fact to add a fact",
+        ),
+    ],
+)
+def test_add_type_error(method, clause, message):
+    with pytest.raises(TypeError) as error:
+        getattr(KnowledgeBase(), method)(clause)
+    assert str(error.value) == message
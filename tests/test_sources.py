@@ -0,0 +1,105 @@
+import pytest
+
+from inference_logic import (
+    FactSource,
+    JsonLines,
+    KnowledgeBase,
+    MappedKnowledgeBase,
+    Rule,
+    Shards,
+    Variable,
+    write_facts,
+)
+from inference_logic.algorithms import search
+
+X, Y, Z = Variable.factory("X", "Y", "Z")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="A", child="O"),
+    dict(parent="A", child="B"),
+    dict(parent="B", child="C"),
+]
+
+text = (
+    '{"parent": "G", "child": "A"}\n'
+    "\n"
+    '{"parent": "A", "child": "O"}\r\n'
+    '  {"parent": "A",   "child": "B"}  \n'
+    '{"parent": "B", "child": "C"}'
+)
+
+
+def write(path, content):
+    with open(path, "w") as file:
+        file.write(content)
+    return str(path)
+
+
+def test_fact_source():
+    source = FactSource(lambda: iter(family))
+    assert list(source) == list(source) == family
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_json_lines(tmp_path, chunk_size):
+    source = JsonLines(write(tmp_path / "family.jsonl", text), chunk_size)
+    assert list(source) == list(source) == family
+
+
+@pytest.mark.parametrize(
+    "content, line",
+    [
+        ('{"a": 1}\n\n{"a": \n{"a": 3}\n', 3),
+        ('{"a": 1}\n{"a": [1\n2]}\n', 2),
+        ('{"a": 1}, {"a": 2}\n', 1),
+        ('{"a": 1}\n{"a": 2', 2),
+    ],
+)
+def test_json_lines_errors(tmp_path, content, line):
+    source = JsonLines(write(tmp_path / "bad.jsonl", content), chunk_size=4)
+    with pytest.raises(ValueError) as error:
+        list(source)
+    assert f"bad.jsonl, line {line}: " in str(error.value)
+
+
+@pytest.mark.parametrize("source", [JsonLines, Shards])
+def test_chunk_size(tmp_path, source):
+    with pytest.raises(ValueError) as error:
+        source(str(tmp_path), chunk_size=0)
+    assert str(error.value) == "chunk_size must be positive, not 0"
+
+
+def test_shards(tmp_path):
+    write(tmp_path / "b.jsonl", '{"parent": "A", "child": "B"}\n')
+    write(
+        tmp_path / "a.jsonl",
+        '{"parent": "G", "child": "A"}\n{"parent": "A", "child": "O"}',
+    )
+    write(tmp_path / "notes.txt", "not json")
+    (tmp_path / "c.jsonl").mkdir()
+    source = Shards(str(tmp_path), chunk_size=16)
+    assert list(source) == family[:3]
+
+    write(tmp_path / "d.jsonl", '{"parent": "B", "child": "C"}\n')
+    assert list(source) == family
+
+
+def test_search(tmp_path):
+    write(tmp_path / "0.jsonl", text)
+    ancestor = [
+        Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+        Rule(
+            dict(ancestor=X, descendant=Z),
+            dict(parent=X, child=Y),
+            dict(ancestor=Y, descendant=Z),
+        ),
+    ]
+    path = str(tmp_path / "family.facts")
+    assert write_facts(path, Shards(str(tmp_path))) == 4
+    query = dict(ancestor="A", descendant=Y)
+    for kb in [
+        KnowledgeBase([*JsonLines(str(tmp_path / "0.jsonl")), *ancestor]),
+        MappedKnowledgeBase(path, ancestor),
+    ]:
+        assert sorted(solution[Y] for solution in search(kb, query)) == ["B", "C", "O"]
@@ -0,0 +1,195 @@
+import random
+
+import pytest
+
+from inference_logic import (
+    KnowledgeBase,
+    MappedKnowledgeBase,
+    Rule,
+    Statistics,
+    Variable,
+    materialise,
+    write_facts,
+)
+from inference_logic.algorithms import search
+from inference_logic.data_structures import ImmutableDict
+from inference_logic.store import value_key
+
+X, Y, Z, C, P = Variable.factory("X", "Y", "Z", "C", "P")
+
+family = [
+    dict(parent="G", child="A"),
+    dict(parent="A", child="O"),
+    dict(parent="A", child="B"),
+    dict(parent="B", child="C"),
+]
+
+ancestor = [
+    Rule(dict(ancestor=X, descendant=Z), dict(parent=X, child=Z)),
+    Rule(
+        dict(ancestor=X, descendant=Z),
+        dict(parent=X, child=Y),
+        dict(ancestor=Y, descendant=Z),
+    ),
+]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "test.facts")
+
+
+def pairs(solutions):
+    return sorted((solution[P], solution[C]) for solution in solutions)
+
+
+@pytest.mark.parametrize(
+    "engine", ["top_down", "tabled", "bottom_up", "trail", "parallel"]
+)
+def test_engines(path, engine):
+    assert write_facts(path, family) == 4
+    with MappedKnowledgeBase(path, ancestor) as kb:
+        query = dict(ancestor=P, descendant=C)
+        expected = pairs(search(family + ancestor, query, engine=engine))
+        assert pairs(search(kb, query, engine=engine)) == expected
+        assert len(expected) == 8
+
+
+def test_parity(path):
+    rng = random.Random(0)
+    values = [0, 1, 1.0, 1.5, True, False, None, "a", "b", "", [], [1], [1, "a"]]
+    values += [{}, dict(a=1), dict(a=[None])]
+    facts = [
+        {key: rng.choice(values) for key in rng.sample("abc", rng.randint(0, 3))}
+        for _ in range(300)
+    ]
+    write_facts(path, facts)
+    kb = KnowledgeBase(facts)
+    with MappedKnowledgeBase(path) as mapped:
+        goals = [
+            {
+                key: rng.choice(values + [X, Y, [X, *Y]])
+                for key in rng.sample("abc", size)
+            }
+            for size in [0, 1, 2, 3] * 25
+        ] + [["a"]]
+        for goal in goals:
+            expected = list(search(kb, goal, engine="trail"))
+            assert list(search(mapped, goal, engine="trail")) == expected
+        assert [clause.rule for clause in mapped] == [clause.rule for clause in kb]
+
+
+def test_lookup_is_indexed(path):
+    write_facts(path, [dict(n=n, square=n * n) for n in range(1000)])
+    with MappedKnowledgeBase(path) as kb:
+        [clause] = kb.candidates(ImmutableDict(n=X, square=81))
+        assert clause.rule == Rule(dict(n=9, square=81))
+        assert kb.candidates(ImmutableDict(n=X)) == []
+        assert len(kb.candidates(ImmutableDict(n=X, square=Y))) == len(kb) == 1000
+
+
+def test_clauses(path):
+    write_facts(path, family)
+    with MappedKnowledgeBase(path, [dict(parent="C", child="D")]) as kb:
+        assert kb.clauses[1] is kb.clauses[1]
+        assert kb.clauses[4].rule == Rule(dict(parent="C", child="D"))
+        assert 3 in kb.clauses and 4 in kb.clauses
+        assert 5 not in kb.clauses and -1 not in kb.clauses and "0" not in kb.clauses
+        with pytest.raises(KeyError):
+            kb.clauses[5]
+
+
+def test_assert_retract(path):
+    write_facts(path, family)
+    with MappedKnowledgeBase(path) as kb:
+        version = kb.version
+        assert kb.retract_fact(dict(parent="A", child="O"))
+        assert not kb.retract_fact(dict(parent="A", child="O"))
+        assert not kb.retract_fact("A")
+        kb.assert_fact(dict(parent="A", child="O"))
+        assert kb.retract_fact(dict(parent="A", child="O"))
+        assert kb.version == version + 3
+        assert len(kb) == 3
+        assert 1 not in kb.clauses
+        with pytest.raises(KeyError):
+            kb._remove(1)
+
+        query = dict(parent="A", child=C)
+        assert list(search(kb, query, engine="trail")) == [{C: "B"}]
+        assert [clause.position for clause in kb] == [0, 2, 3]
+
+
+def test_statistics(path):
+    write_facts(path, family)
+    with MappedKnowledgeBase(path, ancestor) as kb:
+        statistics = Statistics()
+        list(search(kb, dict(ancestor="G", descendant=C), statistics=statistics))
+        positions = {clause.position for clause, *_ in statistics.clauses(kb)}
+        assert positions == set(statistics.attempts) == {0, 1, 2, 3, 4, 5}
+
+
+def test_materialise(path):
+    write_facts(path, family)
+    with MappedKnowledgeBase(path, ancestor) as kb:
+        materialise(kb, dict(ancestor=X, descendant=Y))
+        kb.retract_fact(dict(parent="A", child="B"))
+        assert pairs(search(kb, dict(ancestor=P, descendant=C))) == [
+            ("A", "O"),
+            ("B", "C"),
+            ("G", "A"),
+            ("G", "O"),
+        ]
+
+
+def test_value_key():
+    assert value_key(dict(a=1)) == value_key(ImmutableDict(b=2)) != value_key([])
+
+
+def test_not_a_dict(path):
+    with pytest.raises(TypeError) as error:
+        write_facts(path, [Rule(dict(a=X))])
+    assert str(error.value).endswith("must be a dict")
+
+
+def test_too_many_facts(path, monkeypatch):
+    monkeypatch.setattr("inference_logic.store._ORDINAL", 1)
+    with pytest.raises(ValueError) as error:
+        write_facts(path, family)
+    assert str(error.value) == "a fact file holds at most 2 facts"
+
+
+def test_not_a_fact_file(path):
+    with open(path, "wb") as file:
+        file.write(bytes(64))
+    with pytest.raises(ValueError) as error:
+        MappedKnowledgeBase(path)
+    assert str(error.value).endswith("is not a fact file")
+
+
+def test_byte_order(path, monkeypatch):
+    write_facts(path, family)
+    monkeypatch.setattr("inference_logic.store.sys.byteorder", "middle")
+    with pytest.raises(ValueError) as error:
+        MappedKnowledgeBase(path)
+    assert "endian" in str(error.value)
+
+
+def test_close(path):
+    write_facts(path, family)
+    with MappedKnowledgeBase(path) as kb:
+        assert len(kb.candidates(ImmutableDict(parent="A", child=C))) == 2
+    with pytest.raises(ValueError):
+        kb.candidates(ImmutableDict(parent="A", child=C))
+
+
+def test_failed_open_is_closed(path, monkeypatch):
+    closed = []
+    close = MappedKnowledgeBase.close
+    monkeypatch.setattr(
+        MappedKnowledgeBase, "close", lambda kb: closed.append(close(kb))
+    )
+    with open(path, "wb") as file:
+        file.write(bytes(64))
+    with pytest.raises(ValueError):
+        MappedKnowledgeBase(path)
+    assert closed == [None]